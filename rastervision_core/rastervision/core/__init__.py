@@ -10,6 +10,7 @@ def register_plugin(registry):
 
 import rastervision.pipeline
 from rastervision.core.box import *
+from rastervision.core.box_array import *
 from rastervision.core.data_sample import *
 from rastervision.core.predictor import *
 from rastervision.core.raster_stats import *
@@ -10,14 +10,21 @@ class StatsAnalyzer(Analyzer):
 
     def __init__(self,
                  stats_uri: Optional[str] = None,
-                 sample_prob: float = 0.1):
+                 sample_prob: float = 0.1,
+                 num_workers: int = 1,
+                 compute_histograms: bool = False):
         self.stats_uri = stats_uri
         self.sample_prob = sample_prob
+        self.num_workers = num_workers
+        self.compute_histograms = compute_histograms
 
     def compute_stats(self, scenes: Iterable[Scene]) -> RasterStats:
         stats = RasterStats()
         stats.compute(
-            [s.raster_source for s in scenes], sample_prob=self.sample_prob)
+            [s.raster_source for s in scenes],
+            sample_prob=self.sample_prob,
+            num_workers=self.num_workers,
+            compute_histograms=self.compute_histograms)
         return stats
 
     def process(self, scenes: Iterable[Scene], tmp_dir: str) -> None:
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, Iterable, Optional, Tuple
 from os.path import join
 
 from rastervision.pipeline.config import register_config, ConfigError, Field
+from rastervision.core.box import PosInt
 from rastervision.core.analyzer import AnalyzerConfig, StatsAnalyzer
 
 if TYPE_CHECKING:
@@ -23,6 +24,14 @@ class StatsAnalyzerConfig(AnalyzerConfig):
         description=(
             'The probability of using a random window for computing statistics. '
             'If None, will use a sliding window.'))
+    num_workers: PosInt = Field(
+        1,
+        description='Number of scenes to compute statistics for concurrently.')
+    compute_histograms: bool = Field(
+        False,
+        description='If True, also compute a histogram of pixel values for '
+        'each band, in the same pass as the means and stds, and save it in '
+        'the stats file. Only supported for integer data of up to 16 bits.')
 
     def update(self, pipeline: Optional['RVPipelineConfig'] = None) -> None:
         if pipeline is not None and self.output_uri is None:
@@ -39,7 +48,11 @@ class StatsAnalyzerConfig(AnalyzerConfig):
         else:
             group_name, _ = scene_group
             output_uri = join(self.output_uri, group_name, f'stats.json')
-        return StatsAnalyzer(output_uri, sample_prob=self.sample_prob)
+        return StatsAnalyzer(
+            output_uri,
+            sample_prob=self.sample_prob,
+            num_workers=self.num_workers,
+            compute_histograms=self.compute_histograms)
 
     def get_bundle_filenames(self):
         return ['stats.json']
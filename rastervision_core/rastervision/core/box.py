@@ -6,6 +6,7 @@ import random
 
 import numpy as np
 from shapely.geometry import Polygon
+from shapely.prepared import prep
 from rasterio.windows import Window as RioWindow
 
 NonNegInt = conint(ge=0)
@@ -375,53 +376,10 @@ class Box():
         Returns:
             List[Box]: List of Box objects.
         """
-        if not isinstance(size, tuple):
-            size = (size, size)
-
-        if not isinstance(stride, tuple):
-            stride = (stride, stride)
-
-        if size[0] <= 0 or size[1] <= 0 or stride[0] <= 0 or stride[1] <= 0:
-            raise ValueError('size and stride must be positive.')
-
-        if padding is None:
-            padding = (size[0] // 2, size[1] // 2)
-
-        if not isinstance(padding, tuple):
-            padding = (padding, padding)
-
-        if padding[0] < 0 or padding[1] < 0:
-            raise ValueError('padding must be non-negative.')
-
-        if padding != (0, 0):
-            h_pad, w_pad = padding
-            if pad_direction == 'both':
-                padded_box = self.pad(
-                    ymin=h_pad, xmin=w_pad, ymax=h_pad, xmax=w_pad)
-            elif pad_direction == 'end':
-                padded_box = self.pad(ymin=0, xmin=0, ymax=h_pad, xmax=w_pad)
-            elif pad_direction == 'start':
-                padded_box = self.pad(ymin=h_pad, xmin=w_pad, ymax=0, xmax=0)
-            else:
-                raise ValueError('pad_directions must be one of: '
-                                 '"both", "start", "end".')
-            return padded_box.get_windows(
-                size=size, stride=stride, padding=(0, 0))
-
-        # padding is necessarily (0, 0) at this point, so we ignore it
-        h, w = size
-        h_step, w_step = stride
-        # lb = lower bound, ub = upper bound
-        ymin_lb = self.ymin
-        xmin_lb = self.xmin
-        ymin_ub = self.ymax - h
-        xmin_ub = self.xmax - w
-
-        windows = []
-        for ymin in range(ymin_lb, ymin_ub + 1, h_step):
-            for xmin in range(xmin_lb, xmin_ub + 1, w_step):
-                windows.append(Box(ymin, xmin, ymin + h, xmin + w))
-        return windows
+        from rastervision.core.box_array import BoxArray
+        windows = BoxArray.get_windows(
+            self, size, stride, padding=padding, pad_direction=pad_direction)
+        return windows.to_boxes()
 
     def to_dict(self) -> Dict[str, int]:
         return {
@@ -446,22 +404,113 @@ class Box():
                 AOI polygon. Otherwise, windows are kept if they intersect an AOI
                 polygon.
         """
-        result = []
-        for window in windows:
-            w = window.to_shapely()
-            for polygon in aoi_polygons:
-                if ((within and w.within(polygon))
-                        or ((not within) and w.intersects(polygon))):
-                    result.append(window)
-                    break
-
-        return result
+        mask = Box.get_aoi_mask(windows, aoi_polygons, within=within)
+        return [w for w, keep in zip(windows, mask) if keep]
 
     @staticmethod
     def within_aoi(window: 'Box', aoi_polygons: List[Polygon]) -> bool:
         """Check if window is within a list of AOI polygons."""
-        w = window.to_shapely()
+        return bool(Box.get_aoi_mask([window], aoi_polygons, within=True)[0])
+
+    @staticmethod
+    def get_aoi_mask(windows: Union[List['Box'], np.ndarray],
+                     aoi_polygons: List[Polygon],
+                     within: bool = True,
+                     use_raster_mask: bool = False) -> np.ndarray:
+        """Check which windows are within (or intersect) any AOI polygon.
+
+        Windows are first checked against the bounding box of each polygon
+        in bulk, and only the remaining candidates are checked exactly
+        against a prepared version of the polygon.
+
+        If use_raster_mask is True, the polygons are instead rasterized to a
+        mask covering the windows and each window is checked by counting the
+        AOI cells it contains, using a summed-area table. The mask has the
+        resolution of the grid the windows lie on (the greatest common
+        divisor of their coordinates relative to the top-left window). This
+        is much faster for large numbers of windows, but approximate: a cell
+        counts as being in the AOI if its center is within a polygon, and a
+        window counts as within the AOI if it is within the union of the
+        polygons. The mask covers the bounding box of the windows, so this is
+        only suitable if that fits in memory.
+
+        Args:
+            windows (Union[List[Box], np.ndarray]): Boxes or an (N, 4) array
+                of boxes in (ymin, xmin, ymax, xmax) format.
+            aoi_polygons (List[Polygon]): AOI polygons.
+            within (bool): If True, check if windows lie fully within an AOI
+                polygon. Otherwise, check if they intersect an AOI polygon.
+                Defaults to True.
+            use_raster_mask (bool): Use a rasterized AOI mask. Defaults to
+                False.
+
+        Returns:
+            np.ndarray: Boolean array of length N.
+        """
+        if isinstance(windows, np.ndarray):
+            npboxes = windows.reshape(-1, 4)
+        else:
+            npboxes = np.array(
+                [w.tuple_format() for w in windows], dtype=float).reshape(
+                    -1, 4)
+        if use_raster_mask:
+            return _get_aoi_mask_rasterized(npboxes, aoi_polygons, within)
+
+        ymin, xmin, ymax, xmax = npboxes.T
+        mask = np.zeros(len(npboxes), dtype=bool)
         for polygon in aoi_polygons:
-            if w.within(polygon):
-                return True
-        return False
+            pxmin, pymin, pxmax, pymax = polygon.bounds
+            if within:
+                candidates = ((ymin >= pymin) & (xmin >= pxmin)
+                              & (ymax <= pymax) & (xmax <= pxmax))
+            else:
+                candidates = ((ymax >= pymin) & (xmax >= pxmin)
+                              & (ymin <= pymax) & (xmin <= pxmax))
+            candidates = np.flatnonzero(candidates & ~mask)
+            if len(candidates) == 0:
+                continue
+            prepared = prep(polygon)
+            predicate = prepared.contains if within else prepared.intersects
+            for i in candidates:
+                y0, x0, y1, x1 = npboxes[i]
+                mask[i] = predicate(Polygon.from_bounds(x0, y0, x1, y1))
+        return mask
+
+
+def _get_aoi_mask_rasterized(npboxes: np.ndarray, aoi_polygons: List[Polygon],
+                             within: bool) -> np.ndarray:
+    """Raster implementation of Box.get_aoi_mask() for integer windows."""
+    from rasterio.features import rasterize
+    from rasterio.transform import Affine
+
+    if len(npboxes) == 0 or len(aoi_polygons) == 0:
+        return np.zeros(len(npboxes), dtype=bool)
+    npboxes = npboxes.astype(np.int64)
+    ymin, xmin = npboxes[:, :2].min(axis=0)
+    ymax, xmax = npboxes[:, 2:].max(axis=0)
+    height, width = ymax - ymin, xmax - xmin
+    if height <= 0 or width <= 0:
+        return np.zeros(len(npboxes), dtype=bool)
+    # windows usually lie on a grid (e.g. sliding windows with a stride), in
+    # which case the mask only needs the resolution of that grid
+    offsets = npboxes - [ymin, xmin, ymin, xmin]
+    res = max(int(np.gcd.reduce(offsets, axis=None)), 1)
+    offsets //= res
+    height, width = -(-height // res), -(-width // res)
+    aoi = rasterize(
+        aoi_polygons,
+        out_shape=(height, width),
+        fill=0,
+        default_value=1,
+        transform=Affine(res, 0, xmin, 0, res, ymin),
+        dtype=np.uint8)
+    # summed-area table with a leading row and column of zeros
+    dtype = np.int32 if aoi.size < np.iinfo(np.int32).max else np.int64
+    sat = np.zeros((height + 1, width + 1), dtype=dtype)
+    np.cumsum(aoi, axis=0, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    r0, c0, r1, c1 = offsets.T
+    counts = sat[r1, c1] - sat[r0, c1] - sat[r1, c0] + sat[r0, c0]
+    if within:
+        return counts == (r1 - r0) * (c1 - c0)
+    return counts > 0
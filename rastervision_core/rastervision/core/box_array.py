@@ -0,0 +1,221 @@
+from typing import (TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple,
+                    Union)
+from typing_extensions import Literal
+
+import numpy as np
+
+from rastervision.core.box import Box, NonNegInt, PosInt
+
+if TYPE_CHECKING:
+    from shapely.geometry import Polygon
+
+__all__ = ['BoxArray']
+
+
+class BoxArray():
+    """A compact, array-backed sequence of boxes.
+
+    Stores N boxes as an (N, 4) integer array in (ymin, xmin, ymax, xmax)
+    format and provides vectorized versions of the Box methods used on large
+    sets of windows. It can be used anywhere a sequence of Boxes is expected:
+    indexing with an int and iterating yield Box objects, which are only
+    created on demand.
+    """
+
+    def __init__(self,
+                 npboxes: Union[np.ndarray, Iterable[Iterable[int]]],
+                 dtype: np.dtype = np.int32):
+        """Constructor.
+
+        Args:
+            npboxes (Union[np.ndarray, Iterable[Iterable[int]]]): (N, 4) array
+                of boxes in (ymin, xmin, ymax, xmax) format.
+            dtype (np.dtype): dtype of the array. Defaults to np.int32.
+        """
+        self.npboxes = np.asarray(npboxes, dtype=dtype).reshape(-1, 4)
+
+    @classmethod
+    def from_boxes(cls, boxes: Iterable[Box],
+                   dtype: np.dtype = np.int32) -> 'BoxArray':
+        """Create a BoxArray from Box objects."""
+        return cls([b.tuple_format() for b in boxes], dtype=dtype)
+
+    @classmethod
+    def get_windows(cls,
+                    extent: Box,
+                    size: Union[PosInt, Tuple[PosInt, PosInt]],
+                    stride: Union[PosInt, Tuple[PosInt, PosInt]],
+                    padding: Optional[Union[NonNegInt, Tuple[
+                        NonNegInt, NonNegInt]]] = None,
+                    pad_direction: Literal['both', 'start', 'end'] = 'end'
+                    ) -> 'BoxArray':
+        """Vectorized version of Box.get_windows().
+
+        See Box.get_windows() for a description of the arguments. The windows
+        are in the same (row-major) order.
+
+        Returns:
+            BoxArray: The windows.
+        """
+        if not isinstance(size, tuple):
+            size = (size, size)
+        if not isinstance(stride, tuple):
+            stride = (stride, stride)
+        if size[0] <= 0 or size[1] <= 0 or stride[0] <= 0 or stride[1] <= 0:
+            raise ValueError('size and stride must be positive.')
+        if padding is None:
+            padding = (size[0] // 2, size[1] // 2)
+        if not isinstance(padding, tuple):
+            padding = (padding, padding)
+        if padding[0] < 0 or padding[1] < 0:
+            raise ValueError('padding must be non-negative.')
+
+        h_pad, w_pad = padding
+        if pad_direction == 'both':
+            extent = extent.pad(ymin=h_pad, xmin=w_pad, ymax=h_pad, xmax=w_pad)
+        elif pad_direction == 'end':
+            extent = extent.pad(ymin=0, xmin=0, ymax=h_pad, xmax=w_pad)
+        elif pad_direction == 'start':
+            extent = extent.pad(ymin=h_pad, xmin=w_pad, ymax=0, xmax=0)
+        else:
+            raise ValueError('pad_directions must be one of: '
+                             '"both", "start", "end".')
+
+        h, w = size
+        h_step, w_step = stride
+        ymins = np.arange(extent.ymin, extent.ymax - h + 1, h_step)
+        xmins = np.arange(extent.xmin, extent.xmax - w + 1, w_step)
+        ymins, xmins = np.meshgrid(ymins, xmins, indexing='ij')
+        ymins, xmins = ymins.ravel(), xmins.ravel()
+        return cls(np.stack([ymins, xmins, ymins + h, xmins + w], axis=1))
+
+    @property
+    def ymin(self) -> np.ndarray:
+        return self.npboxes[:, 0]
+
+    @property
+    def xmin(self) -> np.ndarray:
+        return self.npboxes[:, 1]
+
+    @property
+    def ymax(self) -> np.ndarray:
+        return self.npboxes[:, 2]
+
+    @property
+    def xmax(self) -> np.ndarray:
+        return self.npboxes[:, 3]
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.ymax - self.ymin
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.xmax - self.xmin
+
+    @property
+    def area(self) -> np.ndarray:
+        return self.height * self.width
+
+    def translate(self, dy: int, dx: int) -> 'BoxArray':
+        """Translate all boxes by (dy, dx)."""
+        return BoxArray(
+            self.npboxes + [dy, dx, dy, dx], dtype=self.npboxes.dtype)
+
+    def shift_origin(self, extent: Box) -> 'BoxArray':
+        """Shift origin of coords to (extent.xmin, extent.ymin)."""
+        return self.translate(dy=extent.ymin, dx=extent.xmin)
+
+    def to_offsets(self, container: Box) -> 'BoxArray':
+        """Convert coords to offsets from (container.xmin, container.ymin)."""
+        return self.translate(dy=-container.ymin, dx=-container.xmin)
+
+    def intersection(self, other: Box) -> 'BoxArray':
+        """Return the intersection of each box with other.
+
+        Same as Box.intersection(): boxes that do not intersect other are
+        replaced with Box(0, 0, 0, 0).
+        """
+        ymin, xmin, ymax, xmax = other
+        out = np.stack(
+            [
+                np.maximum(self.ymin, ymin),
+                np.maximum(self.xmin, xmin),
+                np.minimum(self.ymax, ymax),
+                np.minimum(self.xmax, xmax)
+            ],
+            axis=1)
+        no_overlap = (out[:, 2] <= out[:, 0]) | (out[:, 3] <= out[:, 1])
+        out[no_overlap] = 0
+        return BoxArray(out, dtype=self.npboxes.dtype)
+
+    def intersects(self, other: Box) -> np.ndarray:
+        """Return a boolean mask of the boxes that intersect other."""
+        ymin, xmin, ymax, xmax = other
+        return ((self.ymax > ymin) & (self.ymin < ymax)
+                & (self.xmax > xmin) & (self.xmin < xmax))
+
+    def center_crop(self, edge_offset_y: int,
+                    edge_offset_x: int) -> 'BoxArray':
+        """Erode the sides of all boxes by the given offsets."""
+        offsets = [
+            edge_offset_y, edge_offset_x, -edge_offset_y, -edge_offset_x
+        ]
+        return BoxArray(self.npboxes + offsets, dtype=self.npboxes.dtype)
+
+    def buffer(self, buffer_sz: float, max_extent: Box) -> 'BoxArray':
+        """Vectorized version of Box.buffer()."""
+        buffer_sz = max(0., buffer_sz)
+        if buffer_sz < 1.:
+            delta_height = np.round(buffer_sz * self.height).astype(int)
+            delta_width = np.round(buffer_sz * self.width).astype(int)
+        else:
+            delta_height = delta_width = int(round(buffer_sz))
+        out = np.stack(
+            [
+                np.maximum(0, self.ymin - delta_height),
+                np.maximum(0, self.xmin - delta_width),
+                np.minimum(max_extent.height, self.ymax + delta_height),
+                np.minimum(max_extent.width, self.xmax + delta_width)
+            ],
+            axis=1)
+        return BoxArray(out, dtype=self.npboxes.dtype)
+
+    def filter_by_aoi(self,
+                      aoi_polygons: List['Polygon'],
+                      within: bool = True,
+                      **kwargs) -> 'BoxArray':
+        """Vectorized version of Box.filter_by_aoi().
+
+        Keyword args are passed to Box.get_aoi_mask().
+        """
+        mask = Box.get_aoi_mask(
+            self.npboxes, aoi_polygons, within=within, **kwargs)
+        return self[mask]
+
+    def to_boxes(self) -> List[Box]:
+        """Convert to a list of Box objects."""
+        return [Box(*b) for b in self.npboxes.tolist()]
+
+    def __array__(self, dtype: Optional[np.dtype] = None) -> np.ndarray:
+        return self.npboxes if dtype is None else self.npboxes.astype(dtype)
+
+    def __len__(self) -> int:
+        return len(self.npboxes)
+
+    def __iter__(self) -> Iterator[Box]:
+        for b in self.npboxes.tolist():
+            yield Box(*b)
+
+    def __getitem__(self, key) -> Union[Box, 'BoxArray']:
+        if isinstance(key, (int, np.integer)):
+            return Box(*self.npboxes[key].tolist())
+        return BoxArray(self.npboxes[key], dtype=self.npboxes.dtype)
+
+    def __eq__(self, other: 'BoxArray') -> bool:
+        if not isinstance(other, BoxArray):
+            return NotImplemented
+        return np.array_equal(self.npboxes, other.npboxes)
+
+    def __repr__(self) -> str:
+        return f'BoxArray(num_boxes={len(self)})'
@@ -4,6 +4,9 @@ from rastervision.core.data.label.labels import *
 from rastervision.core.data.label.chip_classification_labels import *
 from rastervision.core.data.label.full_chip_classification_labels import *
 from rastervision.core.data.label.semantic_segmentation_labels import *
+from rastervision.core.data.label.semantic_segmentation_tiled_labels import *
+from rastervision.core.data.label.box_grid_index import *
+from rastervision.core.data.label.nms import *
 from rastervision.core.data.label.object_detection_labels import *
 from rastervision.core.data.label.utils import *
 
@@ -12,7 +15,11 @@ __all__ = [
     SemanticSegmentationLabels.__name__,
     SemanticSegmentationDiscreteLabels.__name__,
     SemanticSegmentationSmoothLabels.__name__,
+    SemanticSegmentationTiledLabels.__name__,
+    SemanticSegmentationTiledDiscreteLabels.__name__,
+    SemanticSegmentationTiledSmoothLabels.__name__,
     ObjectDetectionLabels.__name__,
+    BoxGridIndex.__name__,
     ChipClassificationLabels.__name__,
     ClassificationLabel.__name__,
     FullWindowClassificationLabels.__name__,
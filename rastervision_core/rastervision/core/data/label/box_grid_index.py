@@ -0,0 +1,170 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ['BoxGridIndex']
+
+
+class BoxGridIndex():
+    """A uniform-grid spatial index over axis-aligned boxes.
+
+    Each box is registered in every grid cell it touches. The (cell, box)
+    pairs are stored sorted by cell so that the boxes in a row of cells can
+    be found with a binary search. A query therefore costs
+    O(num_rows * log(N) + k) instead of O(N). Boxes that span more than
+    max_cells_per_box cells are not registered in the grid and are instead
+    returned as candidates for every query.
+
+    Queries return candidates, i.e. a superset of the boxes that intersect
+    the window (including boxes that merely touch it). Callers are expected
+    to apply their own exact overlap test to the candidates.
+    """
+
+    def __init__(self,
+                 npboxes: np.ndarray,
+                 cell_size: Optional[float] = None,
+                 max_cells_per_box: int = 64):
+        """Constructor.
+
+        Args:
+            npboxes (np.ndarray): (N, 4) array of boxes in
+                (ymin, xmin, ymax, xmax) format.
+            cell_size (Optional[float]): Size of the grid cells. If None,
+                4 times the median of the larger side of the boxes is used.
+                Defaults to None.
+            max_cells_per_box (int): Boxes spanning more cells than this are
+                always returned as candidates instead of being added to the
+                grid. Defaults to 64.
+        """
+        npboxes = np.asarray(npboxes, dtype=float).reshape(-1, 4)
+        self.num_boxes = len(npboxes)
+
+        if cell_size is None:
+            cell_size = self._get_default_cell_size(npboxes)
+        self.cell_size = cell_size
+
+        r0, c0, r1, c1 = self._to_cells(npboxes).T
+        nrows = r1 - r0 + 1
+        ncols = c1 - c0 + 1
+        ncells = nrows * ncols
+        # malformed boxes (e.g. ymax < ymin) are also treated as large
+        is_large = (ncells > max_cells_per_box) | (nrows < 1) | (ncols < 1)
+        self._large_box_ids = np.flatnonzero(is_large)
+
+        small_ids = np.flatnonzero(~is_large)
+        r0, c0, ncols, ncells = (r0[small_ids], c0[small_ids],
+                                 ncols[small_ids], ncells[small_ids])
+        # expand each box into the cells it covers
+        box_ids = np.repeat(small_ids, ncells)
+        rep_ncols = np.repeat(ncols, ncells)
+        starts = np.cumsum(ncells) - ncells
+        offsets = np.arange(len(box_ids)) - np.repeat(starts, ncells)
+        rows = np.repeat(r0, ncells) + offsets // rep_ncols
+        cols = np.repeat(c0, ncells) + offsets % rep_ncols
+
+        if len(rows) > 0:
+            self._row_origin, self._col_origin = rows.min(), cols.min()
+            self._num_rows = rows.max() - self._row_origin + 1
+            self._num_cols = cols.max() - self._col_origin + 1
+        else:
+            self._row_origin, self._col_origin = 0, 0
+            self._num_rows, self._num_cols = 0, 1
+        keys = self._to_keys(rows, cols)
+        order = np.argsort(keys, kind='stable')
+        self._keys = keys[order]
+        self._box_ids = box_ids[order]
+
+    @staticmethod
+    def _get_default_cell_size(npboxes: np.ndarray) -> float:
+        if len(npboxes) == 0:
+            return 1.
+        sides = np.maximum(npboxes[:, 2] - npboxes[:, 0],
+                           npboxes[:, 3] - npboxes[:, 1])
+        return max(float(np.median(sides)) * 4, 1.)
+
+    def _to_cells(self, npboxes: np.ndarray) -> np.ndarray:
+        """Convert boxes to inclusive (row0, col0, row1, col1) cell ranges."""
+        return np.floor(npboxes / self.cell_size).astype(np.int64)
+
+    def _to_keys(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        row_keys = (rows - self._row_origin) * self._num_cols
+        return row_keys + (cols - self._col_origin)
+
+    def query(self, window: Sequence[float]) -> np.ndarray:
+        """Return the indices of candidate boxes intersecting the window.
+
+        Args:
+            window (Sequence[float]): Window in (ymin, xmin, ymax, xmax)
+                format.
+
+        Returns:
+            np.ndarray: Sorted, unique indices of candidate boxes.
+        """
+        r0, c0, r1, c1 = self._to_cells(np.asarray(window, dtype=float))
+        # clip to the grid so that the keys of the cells in a row are
+        # contiguous and so that the loop below is over non-empty rows only
+        r0 = max(r0, self._row_origin)
+        r1 = min(r1, self._row_origin + self._num_rows - 1)
+        c0 = max(c0, self._col_origin)
+        c1 = min(c1, self._col_origin + self._num_cols - 1)
+        hits = [self._large_box_ids]
+        if r0 <= r1 and c0 <= c1:
+            key0s = self._to_keys(np.arange(r0, r1 + 1), c0)
+            key1s = key0s + (c1 - c0)
+            i0s = np.searchsorted(self._keys, key0s, side='left')
+            i1s = np.searchsorted(self._keys, key1s, side='right')
+            hits.extend(
+                self._box_ids[i0:i1] for i0, i1 in zip(i0s, i1s) if i1 > i0)
+        return np.unique(np.concatenate(hits))
+
+    def query_batch(self, windows: np.ndarray) -> List[np.ndarray]:
+        """Return candidate box indices for each of a batch of windows.
+
+        Args:
+            windows (np.ndarray): (M, 4) array of windows in
+                (ymin, xmin, ymax, xmax) format.
+
+        Returns:
+            List[np.ndarray]: For each window, the sorted, unique indices of
+            candidate boxes.
+        """
+        return [self.query(window) for window in np.asarray(windows)]
+
+    def query_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return all pairs of boxes that are candidates for intersecting.
+
+        Two boxes are candidates if they are registered in a common grid cell
+        or if either of them is a large box.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Arrays (i, j) of box indices, with
+            i < j, of the unique candidate pairs.
+        """
+        keys, box_ids = self._keys, self._box_ids
+        # all pairs of entries within each cell: entry p is paired with all
+        # entries after it in the same cell
+        _, group_starts, group_sizes = np.unique(
+            keys, return_index=True, return_counts=True)
+        group_ends = np.repeat(group_starts + group_sizes, group_sizes)
+        counts = group_ends - np.arange(len(keys)) - 1
+        left = np.repeat(np.arange(len(keys)), counts)
+        offsets = np.arange(len(left)) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        right = left + 1 + offsets
+        ii, jj = [box_ids[left]], [box_ids[right]]
+
+        # large boxes are paired with every other box
+        for large_id in self._large_box_ids:
+            others = np.arange(self.num_boxes)
+            others = others[others != large_id]
+            ii.append(np.full(len(others), large_id))
+            jj.append(others)
+
+        ii, jj = np.concatenate(ii), np.concatenate(jj)
+        ii, jj = np.minimum(ii, jj), np.maximum(ii, jj)
+        # a pair of boxes can share more than one cell
+        pair_keys = np.unique(ii * self.num_boxes + jj)
+        return pair_keys // self.num_boxes, pair_keys % self.num_boxes
+
+    def __len__(self) -> int:
+        return self.num_boxes
@@ -0,0 +1,109 @@
+from typing import Optional
+
+import numpy as np
+
+from rastervision.core.data.label.box_grid_index import BoxGridIndex
+from rastervision.core.data.label.tfod_utils.np_box_list import BoxList
+from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
+    filter_scores_greater_than, gather, sort_by_field)
+from rastervision.core.data.label.tfod_utils.np_box_ops import paired_iou
+
+__all__ = ['non_max_suppression_tiled']
+
+
+def _greedy_select(num_boxes: int, src: np.ndarray,
+                   dst: np.ndarray) -> np.ndarray:
+    """Resolve greedy NMS on a suppression graph.
+
+    Boxes are assumed to be sorted by descending score and each edge
+    (src[k], dst[k]), with src[k] < dst[k], means that box src[k] suppresses
+    box dst[k] if selected. A box is selected iff none of the boxes that can
+    suppress it is selected, which is exactly what greedy NMS computes.
+
+    Rather than visiting the boxes one by one, all boxes whose fate is
+    determined are resolved at once in each round. The number of rounds is
+    bounded by the length of the longest suppression chain, which is small
+    in practice (e.g. the number of overlapping duplicates of an object).
+
+    Returns:
+        np.ndarray: Boolean mask of selected boxes.
+    """
+    UNDECIDED, SELECTED, SUPPRESSED = 0, 1, 2
+    state = np.full(num_boxes, UNDECIDED, dtype=np.uint8)
+    while True:
+        # a box with no undecided or selected suppressors is selected
+        blocked = np.zeros(num_boxes, dtype=bool)
+        blocked[dst] = True
+        state[(state == UNDECIDED) & ~blocked] = SELECTED
+        # a box with a selected suppressor is suppressed
+        suppressed = dst[state[src] == SELECTED]
+        state[suppressed] = SUPPRESSED
+        # edges from suppressed boxes and into decided boxes are irrelevant
+        keep = (state[src] == UNDECIDED) & (state[dst] == UNDECIDED)
+        src, dst = src[keep], dst[keep]
+        if len(src) == 0:
+            state[state == UNDECIDED] = SELECTED
+            break
+    return state == SELECTED
+
+
+def non_max_suppression_tiled(boxlist: BoxList,
+                              iou_threshold: float = 1.0,
+                              score_threshold: float = -10.0,
+                              max_output_size: Optional[int] = None,
+                              class_agnostic: bool = True) -> BoxList:
+    """Non maximum suppression for large, spatially spread-out sets of boxes.
+
+    Produces the same result as
+    :func:`.np_box_list_ops.non_max_suppression`, but instead of comparing
+    each selected box with all remaining boxes, boxes are bucketed into the
+    cells of a :class:`.BoxGridIndex` and IOUs are only computed between
+    boxes that share a cell. This makes it suitable for scene-level
+    predictions with hundreds of thousands of boxes.
+
+    Args:
+        boxlist (BoxList): BoxList holding N boxes. Must contain a 'scores'
+            field.
+        iou_threshold (float): Boxes with an IOU greater than this with a
+            higher scoring selected box are suppressed. Defaults to 1.0.
+        score_threshold (float): Boxes with scores less than this are
+            removed. Defaults to -10.0.
+        max_output_size (Optional[int]): Maximum number of retained boxes.
+            If None, all selected boxes are returned. Defaults to None.
+        class_agnostic (bool): If False, boxes only suppress boxes of the
+            same class. Requires a 'classes' field. Defaults to True.
+
+    Returns:
+        BoxList: The selected boxes, sorted by descending score.
+
+    Raises:
+        ValueError: If 'scores' field does not exist.
+        ValueError: If threshold is not in [0, 1].
+    """
+    if not boxlist.has_field('scores'):
+        raise ValueError('Field scores does not exist')
+    if iou_threshold < 0. or iou_threshold > 1.0:
+        raise ValueError('IOU threshold must be in [0, 1]')
+
+    boxlist = filter_scores_greater_than(boxlist, score_threshold)
+    if boxlist.num_boxes() == 0:
+        return boxlist
+    boxlist = sort_by_field(boxlist, 'scores')
+
+    num_boxes = boxlist.num_boxes()
+    if iou_threshold < 1.0:
+        boxes = boxlist.get()
+        src, dst = BoxGridIndex(boxes).query_pairs()
+        if not class_agnostic:
+            class_ids = boxlist.get_field('classes')
+            same_class = class_ids[src] == class_ids[dst]
+            src, dst = src[same_class], dst[same_class]
+        overlapping = paired_iou(boxes[src], boxes[dst]) > iou_threshold
+        src, dst = src[overlapping], dst[overlapping]
+        selected = np.flatnonzero(_greedy_select(num_boxes, src, dst))
+    else:
+        selected = np.arange(num_boxes)
+
+    if max_output_size is not None:
+        selected = selected[:max_output_size]
+    return gather(boxlist, selected)
@@ -6,8 +6,9 @@ from rastervision.core.box import Box
 from rastervision.core.data.label.labels import Labels
 from rastervision.core.data.label.tfod_utils.np_box_list import BoxList
 from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
-    prune_non_overlapping_boxes, clip_to_window, concatenate,
-    non_max_suppression)
+    prune_non_overlapping_boxes, clip_to_window, concatenate, gather)
+from rastervision.core.data.label.box_grid_index import BoxGridIndex
+from rastervision.core.data.label.nms import non_max_suppression_tiled
 
 if TYPE_CHECKING:
     from rastervision.core.data import (ClassConfig, CRSTransformer)
@@ -42,6 +43,19 @@ class ObjectDetectionLabels(Labels):
         if scores is None:
             scores = np.ones(class_ids.shape)
         self.boxlist.add_field('scores', scores)
+        self._index: Optional[BoxGridIndex] = None
+        self._index_boxlist: Optional[BoxList] = None
+
+    def get_index(self) -> BoxGridIndex:
+        """Return a spatial index of the boxes.
+
+        The index is built on first use and rebuilt if self.boxlist is
+        replaced.
+        """
+        if self._index is None or self._index_boxlist is not self.boxlist:
+            self._index = BoxGridIndex(self.boxlist.get())
+            self._index_boxlist = self.boxlist
+        return self._index
 
     def __add__(self,
                 other: 'ObjectDetectionLabels') -> 'ObjectDetectionLabels':
@@ -236,6 +250,9 @@ class ObjectDetectionLabels(Labels):
                         clip: bool = False) -> 'ObjectDetectionLabels':
         """Return subset of labels that overlap with window.
 
+        Candidate boxes are looked up in the spatial index of the labels
+        (see get_index()), so only boxes near the window are checked.
+
         Args:
             labels: ObjectDetectionLabels
             window: Box
@@ -243,14 +260,49 @@ class ObjectDetectionLabels(Labels):
                 overlapping
             clip: if True, clip label boxes to the window
         """
-        window_npbox = window.npbox_format()
-        window_boxlist = BoxList(np.expand_dims(window_npbox, axis=0))
-        boxlist = prune_non_overlapping_boxes(
-            labels.boxlist, window_boxlist, minoverlap=ioa_thresh)
-        if clip:
-            boxlist = clip_to_window(boxlist, window_npbox)
+        return ObjectDetectionLabels.get_overlapping_batch(
+            labels, [window], ioa_thresh=ioa_thresh, clip=clip)[0]
+
+    @staticmethod
+    def get_overlapping_batch(
+            labels: 'ObjectDetectionLabels',
+            windows: Iterable[Box],
+            ioa_thresh: float = 0.000001,
+            clip: bool = False) -> List['ObjectDetectionLabels']:
+        """Return the subset of labels that overlap with each window.
+
+        Same as calling get_overlapping() for each window.
+
+        Args:
+            labels: ObjectDetectionLabels
+            windows: Boxes
+            ioa_thresh: the minimum IOA for a box to be considered as
+                overlapping
+            clip: if True, clip label boxes to the window
 
-        return ObjectDetectionLabels.from_boxlist(boxlist)
+        Returns:
+            List[ObjectDetectionLabels]: Labels for each window.
+        """
+        window_npboxes = np.array(
+            [window.npbox_format() for window in windows],
+            dtype=float).reshape(-1, 4)
+        if ioa_thresh > 0:
+            candidates = labels.get_index().query_batch(window_npboxes)
+        else:
+            # even boxes that don't intersect the window pass the IOA test
+            all_inds = np.arange(len(labels))
+            candidates = [all_inds] * len(window_npboxes)
+
+        out = []
+        for window_npbox, inds in zip(window_npboxes, candidates):
+            boxlist = gather(labels.boxlist, inds)
+            window_boxlist = BoxList(window_npbox[np.newaxis])
+            boxlist = prune_non_overlapping_boxes(
+                boxlist, window_boxlist, minoverlap=ioa_thresh)
+            if clip:
+                boxlist = clip_to_window(boxlist, window_npbox)
+            out.append(ObjectDetectionLabels.from_boxlist(boxlist))
+        return out
 
     @staticmethod
     def concatenate(
@@ -266,28 +318,33 @@ class ObjectDetectionLabels(Labels):
         return ObjectDetectionLabels.from_boxlist(new_boxlist)
 
     @staticmethod
-    def prune_duplicates(labels: 'ObjectDetectionLabels', score_thresh: float,
-                         merge_thresh: float) -> 'ObjectDetectionLabels':
+    def prune_duplicates(
+            labels: 'ObjectDetectionLabels',
+            score_thresh: float,
+            merge_thresh: float,
+            class_agnostic: bool = True) -> 'ObjectDetectionLabels':
         """Remove duplicate boxes.
 
         Runs non-maximum suppression to remove duplicate boxes that result from
-        sliding window prediction algorithm.
+        sliding window prediction algorithm. Only boxes that are near each
+        other are compared (see :func:`.non_max_suppression_tiled`), so this
+        scales to scene-level predictions.
 
         Args:
             labels: ObjectDetectionLabels
             score_thresh: the minimum allowed score of boxes
             merge_thresh: the minimum IOA allowed when merging two boxes
                 together
+            class_agnostic: if False, only boxes of the same class are merged
 
         Returns:
             ObjectDetectionLabels
         """
-        max_output_size = 1000000
-        pruned_boxlist = non_max_suppression(
+        pruned_boxlist = non_max_suppression_tiled(
             labels.boxlist,
-            max_output_size=max_output_size,
             iou_threshold=merge_thresh,
-            score_threshold=score_thresh)
+            score_threshold=score_thresh,
+            class_agnostic=class_agnostic)
         return ObjectDetectionLabels.from_boxlist(pruned_boxlist)
 
     def save(self, uri: str, class_config: 'ClassConfig',
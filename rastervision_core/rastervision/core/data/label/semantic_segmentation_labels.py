@@ -1,6 +1,8 @@
 from typing import (TYPE_CHECKING, Any, Iterable, List, Optional, Sequence,
                     Tuple, Union)
 from abc import abstractmethod
+from contextlib import nullcontext
+import logging
 
 import numpy as np
 from rasterio.features import rasterize
@@ -9,10 +11,15 @@ from shapely.ops import transform
 from rastervision.core.box import Box
 from rastervision.core.data.label import Labels
 from rastervision.core.data.label.utils import discard_prediction_edges
+from rastervision.core.utils.pipelining import (BackgroundConsumer, StageStats)
 
 if TYPE_CHECKING:
     from rastervision.core.data import (ClassConfig, CRSTransformer,
                                         VectorOutputConfig)
+    from rastervision.core.data.label.semantic_segmentation_tiled_labels import (  # noqa
+        SemanticSegmentationTiledLabels)
+
+log = logging.getLogger(__name__)
 
 
 class SemanticSegmentationLabels(Labels):
@@ -28,7 +35,7 @@ class SemanticSegmentationLabels(Labels):
         """
         self.extent = extent
         self.num_classes = num_classes
-        self.ymin, self.xmin, self.width, self.height = extent.to_xywh()
+        self.xmin, self.ymin, self.width, self.height = extent.to_xywh()
         self.dtype = dtype
 
     def _to_local_coords(self,
@@ -78,6 +85,20 @@ class SemanticSegmentationLabels(Labels):
         """Set labels for the given window."""
         pass
 
+    def add_windows(self, windows: Sequence[Box],
+                    values: Sequence[np.ndarray]) -> None:
+        """Set labels for a batch of windows.
+
+        Equivalent to calling add_window() for each window, but subclasses
+        may override this to process the whole batch at once.
+
+        Args:
+            windows (Sequence[Box]): Windows in global coordinates.
+            values (Sequence[np.ndarray]): Values for each window.
+        """
+        for window, window_values in zip(windows, values):
+            self.add_window(window, window_values)
+
     @abstractmethod
     def get_label_arr(self, window: Box,
                       null_class_id: int = -1) -> np.ndarray:
@@ -152,9 +173,15 @@ class SemanticSegmentationLabels(Labels):
             del self[window]
 
     @classmethod
-    def make_empty(cls, extent: Box, num_classes: int, smooth: bool = False
+    def make_empty(cls,
+                   extent: Box,
+                   num_classes: int,
+                   smooth: bool = False,
+                   tile_size: Optional[int] = None,
+                   spill_dir: Optional[str] = None
                    ) -> Union['SemanticSegmentationDiscreteLabels',
-                              'SemanticSegmentationSmoothLabels']:
+                              'SemanticSegmentationSmoothLabels',
+                              'SemanticSegmentationTiledLabels']:
         """Instantiate an empty instance.
 
         Args:
@@ -164,17 +191,37 @@ class SemanticSegmentationLabels(Labels):
             smooth (bool, optional): If True, creates a
                 SemanticSegmentationSmoothLabels object. If False, creates a
                 SemanticSegmentationDiscreteLabels object. Defaults to False.
+            tile_size (Optional[int], optional): If specified, creates tiled
+                labels (SemanticSegmentationTiledDiscreteLabels or
+                SemanticSegmentationTiledSmoothLabels) that only allocate
+                memory for tiles of this size that are written to.
+                Defaults to None.
+            spill_dir (Optional[str], optional): Only used with tile_size. If
+                specified, the tiles are stored as memory-mapped files in this
+                directory. Defaults to None.
 
         Returns:
             Union[SemanticSegmentationDiscreteLabels,
             SemanticSegmentationSmoothLabels]: If smooth=True, returns a
                 SemanticSegmentationSmoothLabels. Otherwise, a
-                SemanticSegmentationDiscreteLabels.
+                SemanticSegmentationDiscreteLabels. Or their tiled versions if
+                tile_size is specified.
 
         Raises:
             ValueError: if num_classes and extent are not specified, but
                 smooth=True.
         """
+        if tile_size is not None:
+            from rastervision.core.data.label.semantic_segmentation_tiled_labels import (  # noqa
+                SemanticSegmentationTiledDiscreteLabels,
+                SemanticSegmentationTiledSmoothLabels)
+            tiled_cls = (SemanticSegmentationTiledSmoothLabels if smooth else
+                         SemanticSegmentationTiledDiscreteLabels)
+            return tiled_cls.make_empty(
+                extent=extent,
+                num_classes=num_classes,
+                tile_size=tile_size,
+                spill_dir=spill_dir)
         if not smooth:
             return SemanticSegmentationDiscreteLabels.make_empty(
                 extent=extent, num_classes=num_classes)
@@ -189,9 +236,14 @@ class SemanticSegmentationLabels(Labels):
                          extent: Box,
                          num_classes: int,
                          smooth: bool = False,
-                         crop_sz: Optional[int] = None
+                         crop_sz: Optional[int] = None,
+                         tile_size: Optional[int] = None,
+                         spill_dir: Optional[str] = None,
+                         batch_size: int = 16,
+                         accumulate_in_background: bool = False
                          ) -> Union['SemanticSegmentationDiscreteLabels',
-                                    'SemanticSegmentationSmoothLabels']:
+                                    'SemanticSegmentationSmoothLabels',
+                                    'SemanticSegmentationTiledLabels']:
         """Instantiate from windows and their corresponding predictions.
 
         Args:
@@ -209,22 +261,66 @@ class SemanticSegmentationLabels(Labels):
                 only be used if the given windows represent a sliding-window
                 grid over the scene extent with overlap between adjacent
                 windows. Defaults to None.
+            tile_size (Optional[int]): If specified, predictions are
+                accumulated in tiled labels. See make_empty(). Defaults to
+                None.
+            spill_dir (Optional[str]): Directory in which to store the tiles
+                of tiled labels as memory-mapped files. See make_empty().
+                Defaults to None.
+            batch_size (int): Number of predictions to accumulate before
+                adding them to the labels in a single add_windows() call.
+                Defaults to 16.
+            accumulate_in_background (bool): If True, batches are added to
+                the labels in a background thread, so that producing the
+                predictions (e.g. running a model) is not blocked while they
+                are being accumulated. The throughput of the accumulation is
+                logged at the end. Defaults to False.
 
         Returns:
             Union[SemanticSegmentationDiscreteLabels,
             SemanticSegmentationSmoothLabels]: If smooth=True, returns a
                 SemanticSegmentationSmoothLabels. Otherwise, a
-                SemanticSegmentationDiscreteLabels.
+                SemanticSegmentationDiscreteLabels. Or their tiled versions if
+                tile_size is specified.
         """
         if crop_sz is not None:
             windows, predictions = discard_prediction_edges(
                 windows, predictions, crop_sz)
 
-        labels = cls.make_empty(extent, num_classes, smooth=smooth)
-        # If predictions is tqdm-wrapped, it needs to be the first arg to zip()
-        # or the progress bar won't terminate with the correct count.
-        for prediction, window in zip(predictions, windows):
-            labels[window] = prediction
+        labels = cls.make_empty(
+            extent,
+            num_classes,
+            smooth=smooth,
+            tile_size=tile_size,
+            spill_dir=spill_dir)
+
+        def add_batch(batch: Tuple[List[Box], List[Any]]) -> None:
+            labels.add_windows(*batch)
+
+        accumulator = nullcontext()
+        if accumulate_in_background:
+            stats = StageStats('accumulate')
+            accumulator = BackgroundConsumer(
+                add_batch,
+                stats=stats,
+                num_items_fn=lambda batch: len(batch[0]))
+            add_batch = accumulator.put
+
+        with accumulator:
+            # If predictions is tqdm-wrapped, it needs to be the first arg to
+            # zip() or the progress bar won't terminate with the correct count.
+            batch_windows, batch_predictions = [], []
+            for prediction, window in zip(predictions, windows):
+                batch_windows.append(window)
+                batch_predictions.append(prediction)
+                if len(batch_windows) >= batch_size:
+                    add_batch((batch_windows, batch_predictions))
+                    batch_windows, batch_predictions = [], []
+            if len(batch_windows) > 0:
+                add_batch((batch_windows, batch_predictions))
+
+        if accumulate_in_background:
+            log.info('Label accumulation throughput: %s', stats)
         return labels
 
 
@@ -283,16 +379,54 @@ class SemanticSegmentationDiscreteLabels(SemanticSegmentationLabels):
         return self.get_label_arr(window)
 
     def add_window(self, window: Box, pixel_class_ids: np.ndarray) -> None:
-        window_local = self._to_local_coords(window)
-        dst_yslice, dst_xslice = window_local.to_slices()
-        src_yslice, src_xslice = window_local.to_offsets(window).to_slices()
+        self.add_windows([window], [pixel_class_ids])
+
+    def add_windows(self, windows: Sequence[Box],
+                    values: Sequence[np.ndarray]) -> None:
+        """Add votes for a batch of windows using flat-index scatters.
 
-        pixel_class_ids = pixel_class_ids.astype(self.dtype)
-        pixel_class_ids = pixel_class_ids[..., src_yslice, src_xslice]
-        window_pixel_counts = self.pixel_counts[:, dst_yslice, dst_xslice]
-        for ch_class_id, ch in enumerate(window_pixel_counts):
-            ch[pixel_class_ids == ch_class_id] += 1
-        self.hit_mask[dst_yslice, dst_xslice] = True
+        Instead of doing one pass over each window per class, the flat index
+        of each pixel's vote in pixel_counts (i.e. of (class_id, row, col))
+        is computed and the votes are added in a single scatter. Windows are
+        grouped so that no two windows in a group overlap, which guarantees
+        that the indices within a scatter are unique. Pixels with class IDs
+        outside [0, num_classes) are ignored.
+
+        Args:
+            windows (Sequence[Box]): Windows in global coordinates.
+            values (Sequence[np.ndarray]): Arrays of class IDs, one per
+                window.
+        """
+        # pixel_counts is always C-contiguous, so this is a view
+        pixel_counts_flat = self.pixel_counts.reshape(-1)
+        num_classes, height, width = self.pixel_counts.shape
+        group_windows: List[Box] = []
+        group_inds: List[np.ndarray] = []
+        for window, pixel_class_ids in zip(windows, values):
+            window_local = self._to_local_coords(window)
+            y0, x0, y1, x1 = window_local
+            if y1 <= y0 or x1 <= x0:
+                continue
+            if any(window_local.intersects(w) for w in group_windows):
+                pixel_counts_flat[np.concatenate(group_inds)] += 1
+                group_windows, group_inds = [], []
+
+            src_yslice, src_xslice = window_local.shift_origin(
+                self.extent).to_offsets(window).to_slices()
+            pixel_class_ids = pixel_class_ids[..., src_yslice, src_xslice]
+            pixel_class_ids = pixel_class_ids.astype(np.intp).ravel()
+            pixel_inds = (np.arange(y0, y1)[:, None] * width + np.arange(
+                x0, x1)[None, :]).ravel()
+            valid = (pixel_class_ids >= 0) & (pixel_class_ids < num_classes)
+            if not valid.all():
+                pixel_class_ids = pixel_class_ids[valid]
+                pixel_inds = pixel_inds[valid]
+            group_inds.append(pixel_class_ids * (height * width) + pixel_inds)
+            group_windows.append(window_local)
+            self.hit_mask[y0:y1, x0:x1] = True
+
+        if len(group_inds) > 0:
+            pixel_counts_flat[np.concatenate(group_inds)] += 1
 
     def get_label_arr(self, window: Box,
                       null_class_id: int = -1) -> np.ndarray:
@@ -442,7 +576,8 @@ class SemanticSegmentationSmoothLabels(SemanticSegmentationLabels):
     def add_window(self, window: Box, pixel_class_scores: np.ndarray) -> None:
         window_local = self._to_local_coords(window)
         dst_yslice, dst_xslice = window_local.to_slices()
-        src_yslice, src_xslice = window_local.to_offsets(window).to_slices()
+        src_yslice, src_xslice = window_local.shift_origin(
+            self.extent).to_offsets(window).to_slices()
 
         pixel_class_scores = pixel_class_scores.astype(self.dtype)
         pixel_class_scores = pixel_class_scores[..., src_yslice, src_xslice]
@@ -0,0 +1,453 @@
+from typing import (TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple,
+                    Type)
+from os.path import join
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data.label.semantic_segmentation_labels import (
+    SemanticSegmentationLabels, SemanticSegmentationDiscreteLabels,
+    SemanticSegmentationSmoothLabels)
+
+if TYPE_CHECKING:
+    from rastervision.core.data import (ClassConfig, CRSTransformer,
+                                        VectorOutputConfig)
+
+TileKey = Tuple[int, int]
+
+
+class SemanticSegmentationTiledLabels(SemanticSegmentationLabels):
+    """Base class for tiled, sparse semantic segmentation labels.
+
+    The extent is divided into a grid of square tiles and each tile is
+    represented by a dense SemanticSegmentationLabels object (of type
+    tile_cls). Tiles are only allocated when they are first written to, so
+    memory usage is proportional to the area covered by predictions rather
+    than to the full extent.
+
+    If spill_dir is specified, the arrays of each tile are backed by
+    memory-mapped files in that directory rather than by RAM. This allows
+    holding labels for scenes that do not fit in memory.
+    """
+
+    tile_cls: Type[SemanticSegmentationLabels]
+    # names of the tile_cls attributes holding the tile's arrays
+    tile_array_attrs: Tuple[str, ...]
+
+    def __init__(self,
+                 extent: Box,
+                 num_classes: int,
+                 dtype: Any,
+                 tile_size: int = 1024,
+                 spill_dir: Optional[str] = None):
+        """Constructor.
+
+        Args:
+            extent (Box): The extent of the region to which
+                the labels belong, in global coordinates.
+            num_classes (int): Number of classes.
+            dtype (Any): dtype of the main array of each tile.
+            tile_size (int): Height and width of each tile. Defaults to 1024.
+            spill_dir (Optional[str]): If specified, tile arrays are stored as
+                memory-mapped files in this directory. Defaults to None.
+        """
+        if tile_size <= 0:
+            raise ValueError('tile_size must be positive.')
+        super().__init__(extent, num_classes, dtype)
+        self.tile_size = tile_size
+        self.spill_dir = spill_dir
+        self._tiles: Dict[TileKey, SemanticSegmentationLabels] = {}
+
+    @property
+    def num_tiles(self) -> int:
+        """Number of allocated tiles."""
+        return len(self._tiles)
+
+    def get_tile_box(self, key: TileKey) -> Box:
+        """Get the extent of a tile in global coordinates."""
+        row, col = key
+        ymin = self.extent.ymin + row * self.tile_size
+        xmin = self.extent.xmin + col * self.tile_size
+        ymax = min(ymin + self.tile_size, self.extent.ymax)
+        xmax = min(xmin + self.tile_size, self.extent.xmax)
+        return Box(ymin, xmin, ymax, xmax)
+
+    def _clip_to_extent(self, window: Box) -> Box:
+        """Clip window to the extent. Result is in global coordinates."""
+        return self._to_local_coords(window).shift_origin(self.extent)
+
+    def get_tile_keys(self, window: Box) -> Iterator[TileKey]:
+        """Get the (row, col) keys of all tiles intersecting the window."""
+        window = self._clip_to_extent(window)
+        if window.area == 0:
+            return
+        ymin, xmin, ymax, xmax = window.to_offsets(self.extent)
+        ts = self.tile_size
+        for row in range(ymin // ts, (ymax - 1) // ts + 1):
+            for col in range(xmin // ts, (xmax - 1) // ts + 1):
+                yield (row, col)
+
+    def _make_tile(self, key: TileKey) -> SemanticSegmentationLabels:
+        tile_box = self.get_tile_box(key)
+        tile = self.tile_cls(
+            extent=tile_box, num_classes=self.num_classes, dtype=self.dtype)
+        if self.spill_dir is not None:
+            row, col = key
+            for attr in self.tile_array_attrs:
+                arr: np.ndarray = getattr(tile, attr)
+                path = join(self.spill_dir, f'{attr}-{row}-{col}.dat')
+                mmap = np.memmap(
+                    path, dtype=arr.dtype, mode='w+', shape=arr.shape)
+                setattr(tile, attr, mmap)
+        return tile
+
+    def get_tile(self, key: TileKey,
+                 create: bool = False) -> Optional[SemanticSegmentationLabels]:
+        """Get the tile for the key. If not allocated, None is returned
+        unless create=True, in which case an empty tile is allocated.
+        """
+        tile = self._tiles.get(key)
+        if tile is None and create:
+            tile = self._make_tile(key)
+            self._tiles[key] = tile
+        return tile
+
+    def _iter_tiles(self, window: Box, create: bool = False
+                    ) -> Iterator[Tuple[Box, SemanticSegmentationLabels]]:
+        """Yield (sub-window, tile) for each tile intersecting the window.
+
+        The sub-window is the intersection of the window with the tile's
+        extent. If create=False, unallocated tiles are skipped.
+        """
+        for key in self.get_tile_keys(window):
+            tile = self.get_tile(key, create=create)
+            if tile is None:
+                continue
+            yield tile.extent.intersection(window), tile
+
+    def flush(self) -> None:
+        """Flush memory-mapped tile arrays to disk. No-op if not spilling."""
+        if self.spill_dir is None:
+            return
+        for tile in self._tiles.values():
+            for attr in self.tile_array_attrs:
+                arr = getattr(tile, attr)
+                if isinstance(arr, np.memmap):
+                    arr.flush()
+
+    def __add__(self, other: SemanticSegmentationLabels
+                ) -> 'SemanticSegmentationTiledLabels':
+        """Merge self with other labels.
+
+        Other can be either tiled labels with the same tile size or dense
+        labels of type tile_cls.
+        """
+        if self.extent != other.extent:
+            raise ValueError('Cannot add labels with unqeual extents.')
+
+        if isinstance(other, SemanticSegmentationTiledLabels):
+            if self.tile_size != other.tile_size:
+                raise ValueError('Cannot add tiled labels with unequal '
+                                 'tile sizes.')
+            for key, other_tile in other._tiles.items():
+                tile = self.get_tile(key, create=True)
+                other_arrs = [
+                    getattr(other_tile, attr) for attr in self.tile_array_attrs
+                ]
+                self._add_to_tile(tile, other_arrs)
+            return self
+
+        if not isinstance(other, self.tile_cls):
+            raise TypeError(f'Cannot add {type(other).__name__} to '
+                            f'{type(self).__name__}.')
+        for key in self.get_tile_keys(self.extent):
+            tile_box = self.get_tile_box(key)
+            y0, x0, y1, x1 = tile_box.to_offsets(other.extent)
+            other_arrs = [
+                getattr(other, attr)[..., y0:y1, x0:x1]
+                for attr in self.tile_array_attrs
+            ]
+            if not any(np.any(arr) for arr in other_arrs):
+                continue
+            tile = self.get_tile(key, create=True)
+            self._add_to_tile(tile, other_arrs)
+        return self
+
+    def _add_to_tile(self, tile: SemanticSegmentationLabels,
+                     other_arrs: List[np.ndarray]) -> None:
+        """Add arrays, in the order of tile_array_attrs, to a tile's arrays.
+
+        Boolean arrays (such as hit masks) are OR'ed instead.
+        """
+        for attr, other_arr in zip(self.tile_array_attrs, other_arrs):
+            arr = getattr(tile, attr)
+            if arr.dtype == bool:
+                arr |= other_arr
+            else:
+                arr += other_arr
+
+    def __eq__(self, other: 'SemanticSegmentationTiledLabels') -> bool:
+        if not isinstance(other, type(self)):
+            return False
+        if self.extent != other.extent or self.tile_size != other.tile_size:
+            return False
+        for key in set(self._tiles.keys()) | set(other._tiles.keys()):
+            tile = self.get_tile(key)
+            other_tile = other.get_tile(key)
+            if tile is None:
+                tile = self._make_empty_tile(key)
+            if other_tile is None:
+                other_tile = other._make_empty_tile(key)
+            if not tile == other_tile:
+                return False
+        return True
+
+    def _make_empty_tile(self, key: TileKey) -> SemanticSegmentationLabels:
+        tile_box = self.get_tile_box(key)
+        return self.tile_cls(
+            extent=tile_box, num_classes=self.num_classes, dtype=self.dtype)
+
+    def __delitem__(self, window: Box) -> None:
+        for key in list(self.get_tile_keys(window)):
+            tile = self.get_tile(key)
+            if tile is None:
+                continue
+            sub_window = tile.extent.intersection(window)
+            if sub_window == tile.extent:
+                # the whole tile is being reset, so just drop it
+                del self._tiles[key]
+            else:
+                del tile[sub_window]
+
+    def add_window(self, window: Box, values: np.ndarray) -> None:
+        for sub_window, tile in self._iter_tiles(window, create=True):
+            src_yslice, src_xslice = sub_window.to_offsets(window).to_slices()
+            tile.add_window(sub_window, values[..., src_yslice, src_xslice])
+
+    def add_windows(self, windows: List[Box],
+                    values: List[np.ndarray]) -> None:
+        """Split the windows by tile and add them to each tile as a batch."""
+        tile_batches: Dict[TileKey, Tuple[List[Box], List[np.ndarray]]] = {}
+        for window, window_values in zip(windows, values):
+            for key in self.get_tile_keys(window):
+                tile_box = self.get_tile_box(key)
+                sub_window = tile_box.intersection(window)
+                if sub_window.area == 0:
+                    continue
+                src_yslice, src_xslice = sub_window.to_offsets(
+                    window).to_slices()
+                sub_windows, sub_values = tile_batches.setdefault(
+                    key, ([], []))
+                sub_windows.append(sub_window)
+                sub_values.append(window_values[..., src_yslice, src_xslice])
+        for key, (sub_windows, sub_values) in tile_batches.items():
+            tile = self.get_tile(key, create=True)
+            tile.add_windows(sub_windows, sub_values)
+
+    def mask_fill(self, window: Box, mask: np.ndarray,
+                  fill_value: Any) -> None:
+        for sub_window, tile in self._iter_tiles(window, create=True):
+            src_yslice, src_xslice = sub_window.to_offsets(window).to_slices()
+            tile.mask_fill(sub_window, mask[src_yslice, src_xslice],
+                           fill_value)
+
+    def get_label_arr(self, window: Box,
+                      null_class_id: int = -1) -> np.ndarray:
+        """Get labels as array of class IDs.
+
+        Returns null_class_id for pixels for which there is no data.
+        """
+        window_clipped = self._clip_to_extent(window)
+        label_arr = np.full(window_clipped.size, null_class_id)
+        for sub_window, tile in self._iter_tiles(window_clipped):
+            dst_yslice, dst_xslice = sub_window.to_offsets(
+                window_clipped).to_slices()
+            label_arr[dst_yslice, dst_xslice] = tile.get_label_arr(
+                sub_window, null_class_id)
+        return label_arr
+
+    def get_score_arr(self, window: Box) -> np.ndarray:
+        """Get array of pixel scores.
+
+        Scores for pixels for which there is no data are NaN.
+        """
+        window_clipped = self._clip_to_extent(window)
+        h, w = window_clipped.size
+        score_arr = None
+        for sub_window, tile in self._iter_tiles(window_clipped):
+            dst_yslice, dst_xslice = sub_window.to_offsets(
+                window_clipped).to_slices()
+            tile_score_arr = tile.get_score_arr(sub_window)
+            if score_arr is None:
+                score_arr = np.full(
+                    (self.num_classes, h, w),
+                    np.nan,
+                    dtype=tile_score_arr.dtype)
+            score_arr[..., dst_yslice, dst_xslice] = tile_score_arr
+        if score_arr is None:
+            score_arr = np.full((self.num_classes, h, w), np.nan)
+        return score_arr
+
+
+class SemanticSegmentationTiledDiscreteLabels(SemanticSegmentationTiledLabels):
+    """Tiled, sparse version of SemanticSegmentationDiscreteLabels."""
+
+    tile_cls = SemanticSegmentationDiscreteLabels
+    tile_array_attrs = ('pixel_counts', 'hit_mask')
+
+    def __init__(self,
+                 extent: Box,
+                 num_classes: int,
+                 dtype: Any = np.uint8,
+                 tile_size: int = 1024,
+                 spill_dir: Optional[str] = None):
+        """Constructor.
+
+        Args:
+            extent (Box): The extent of the region to which
+                the labels belong, in global coordinates.
+            num_classes (int): Number of classes.
+            dtype (Any): dtype of the counts array. Defaults to np.uint8.
+            tile_size (int): Height and width of each tile. Defaults to 1024.
+            spill_dir (Optional[str]): If specified, tile arrays are stored as
+                memory-mapped files in this directory. Defaults to None.
+        """
+        super().__init__(
+            extent,
+            num_classes,
+            dtype,
+            tile_size=tile_size,
+            spill_dir=spill_dir)
+
+    def __getitem__(self, window: Box) -> np.ndarray:
+        return self.get_label_arr(window)
+
+    @classmethod
+    def make_empty(cls,
+                   extent: Box,
+                   num_classes: int,
+                   tile_size: int = 1024,
+                   spill_dir: Optional[str] = None
+                   ) -> 'SemanticSegmentationTiledDiscreteLabels':
+        """Instantiate an empty instance."""
+        return cls(
+            extent=extent,
+            num_classes=num_classes,
+            tile_size=tile_size,
+            spill_dir=spill_dir)
+
+    def save(self,
+             uri: str,
+             crs_transformer: 'CRSTransformer',
+             class_config: 'ClassConfig',
+             tmp_dir: Optional[str] = None,
+             save_as_rgb: bool = False,
+             raster_output: bool = True,
+             rasterio_block_size: int = 512,
+             vector_outputs: Optional[List['VectorOutputConfig']] = None,
+             profile_overrides: Optional[dict] = None) -> None:
+        """Save labels as a raster and/or vectors.
+
+        See SemanticSegmentationDiscreteLabels.save() for details.
+        """
+        SemanticSegmentationDiscreteLabels.save(
+            self,
+            uri,
+            crs_transformer,
+            class_config,
+            tmp_dir=tmp_dir,
+            save_as_rgb=save_as_rgb,
+            raster_output=raster_output,
+            rasterio_block_size=rasterio_block_size,
+            vector_outputs=vector_outputs,
+            profile_overrides=profile_overrides)
+
+
+class SemanticSegmentationTiledSmoothLabels(SemanticSegmentationTiledLabels):
+    """Tiled, sparse version of SemanticSegmentationSmoothLabels."""
+
+    tile_cls = SemanticSegmentationSmoothLabels
+    tile_array_attrs = ('pixel_scores', 'pixel_hits')
+
+    def __init__(self,
+                 extent: Box,
+                 num_classes: int,
+                 dtype: Any = np.float16,
+                 tile_size: int = 1024,
+                 spill_dir: Optional[str] = None):
+        """Constructor.
+
+        Args:
+            extent (Box): The extent of the region to which
+                the labels belong, in global coordinates.
+            num_classes (int): Number of classes.
+            dtype (Any): dtype of the scores array. Defaults to np.float16.
+            tile_size (int): Height and width of each tile. Defaults to 1024.
+            spill_dir (Optional[str]): If specified, tile arrays are stored as
+                memory-mapped files in this directory. Defaults to None.
+        """
+        super().__init__(
+            extent,
+            num_classes,
+            dtype,
+            tile_size=tile_size,
+            spill_dir=spill_dir)
+
+    def __getitem__(self, window: Box) -> np.ndarray:
+        return self.get_score_arr(window)
+
+    @property
+    def pixel_hits(self) -> np.ndarray:
+        """Full-extent array of pixel hits.
+
+        Not safe to call on very large extents.
+        """
+        hits = np.zeros(self.extent.size, dtype=np.uint8)
+        for tile in self._tiles.values():
+            yslice, xslice = tile.extent.to_offsets(self.extent).to_slices()
+            hits[yslice, xslice] = tile.pixel_hits
+        return hits
+
+    @classmethod
+    def make_empty(cls,
+                   extent: Box,
+                   num_classes: int,
+                   tile_size: int = 1024,
+                   spill_dir: Optional[str] = None
+                   ) -> 'SemanticSegmentationTiledSmoothLabels':
+        """Instantiate an empty instance."""
+        return cls(
+            extent=extent,
+            num_classes=num_classes,
+            tile_size=tile_size,
+            spill_dir=spill_dir)
+
+    def save(self,
+             uri: str,
+             crs_transformer: 'CRSTransformer',
+             class_config: 'ClassConfig',
+             tmp_dir: Optional[str] = None,
+             save_as_rgb: bool = False,
+             discrete_output: bool = True,
+             smooth_output: bool = True,
+             smooth_as_uint8: bool = False,
+             rasterio_block_size: int = 512,
+             vector_outputs: Optional[List['VectorOutputConfig']] = None,
+             profile_overrides: Optional[dict] = None) -> None:
+        """Save labels as rasters and/or vectors.
+
+        See SemanticSegmentationSmoothLabels.save() for details.
+        """
+        SemanticSegmentationSmoothLabels.save(
+            self,
+            uri,
+            crs_transformer,
+            class_config,
+            tmp_dir=tmp_dir,
+            save_as_rgb=save_as_rgb,
+            discrete_output=discrete_output,
+            smooth_output=smooth_output,
+            smooth_as_uint8=smooth_as_uint8,
+            rasterio_block_size=rasterio_block_size,
+            vector_outputs=vector_outputs,
+            profile_overrides=profile_overrides)
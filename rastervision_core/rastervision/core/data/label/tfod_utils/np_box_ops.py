@@ -75,6 +75,30 @@ def iou(boxes1, boxes2):
     return intersect / union
 
 
+def paired_iou(boxes1, boxes2):
+    """Computes the IOU of corresponding pairs of boxes.
+
+    Unlike iou(), which computes the IOU of all pairs of boxes, this only
+    computes the IOU of boxes1[i] and boxes2[i] for each i.
+
+    Args:
+        boxes1 (np.ndarray): A numpy array with shape [N, 4] holding N boxes.
+        boxes2 (np.ndarray): A numpy array with shape [N, 4] holding N boxes.
+
+    Returns:
+        (np.ndarray): A numpy array with shape [N] representing the iou
+            scores. Pairs of boxes with a zero-area union have an iou of 0.
+    """
+    ymin = np.maximum(boxes1[:, 0], boxes2[:, 0])
+    xmin = np.maximum(boxes1[:, 1], boxes2[:, 1])
+    ymax = np.minimum(boxes1[:, 2], boxes2[:, 2])
+    xmax = np.minimum(boxes1[:, 3], boxes2[:, 3])
+    intersect = np.clip(ymax - ymin, 0, None) * np.clip(xmax - xmin, 0, None)
+    union = area(boxes1) + area(boxes2) - intersect
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, intersect / union, 0.)
+
+
 def ioa(boxes1, boxes2):
     """Computes pairwise intersection-over-area between box collections.
 
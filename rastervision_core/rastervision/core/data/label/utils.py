@@ -1,26 +1,41 @@
-from typing import (TYPE_CHECKING, Iterable, Iterator, List, Tuple)
+from typing import (TYPE_CHECKING, Iterable, Iterator, List, Tuple, Union)
+
+from rastervision.core.box_array import BoxArray
+
 if TYPE_CHECKING:
     import numpy as np
     from rastervision.core.box import Box
 
 
 def discard_prediction_edges(
-        windows: Iterable['Box'], predictions: Iterable['np.ndarray'],
-        crop_sz: int) -> Tuple[List['Box'], Iterator['np.ndarray']]:
+        windows: Union[Iterable['Box'], BoxArray],
+        predictions: Iterable['np.ndarray'], crop_sz: int
+) -> Tuple[Union[List['Box'], BoxArray], Iterator['np.ndarray']]:
     """Discard the edges of predicted chips.
 
     Args:
-        windows (Iterable[Box]): The windows corresponding to the chips.
+        windows (Union[Iterable[Box], BoxArray]): The windows corresponding
+            to the chips. If a BoxArray, the cropped windows are also
+            returned as a BoxArray.
         predictions (Iterable[np.ndarray]): The predicted chips.
         crop_sz (int): Number of pixel rows/cols to discard.
 
     Returns:
         Tuple[Iterator[Box], Iterator[np.ndarray]]: Cropped windows and chips.
     """
-    windows_cropped = [w.center_crop(crop_sz, crop_sz) for w in windows]
-    array_slices = [
-        wc.to_offsets(w).to_slices() for w, wc in zip(windows, windows_cropped)
-    ]
+    if isinstance(windows, BoxArray):
+        # avoid creating a Box for each window
+        windows_cropped = windows.center_crop(crop_sz, crop_sz)
+        array_slices = [
+            (slice(crop_sz, h - crop_sz), slice(crop_sz, w - crop_sz))
+            for h, w in zip(windows.height.tolist(), windows.width.tolist())
+        ]
+    else:
+        windows_cropped = [w.center_crop(crop_sz, crop_sz) for w in windows]
+        array_slices = [
+            wc.to_offsets(w).to_slices()
+            for w, wc in zip(windows, windows_cropped)
+        ]
     predictions_cropped = (p[..., yslice, xslice]
                            for p, (xslice,
                                    yslice) in zip(predictions, array_slices))
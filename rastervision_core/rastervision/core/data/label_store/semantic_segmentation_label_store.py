@@ -1,5 +1,8 @@
-from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+from typing import (TYPE_CHECKING, Callable, Iterable, Optional, Sequence,
+                    Tuple)
 from os.path import join
+from collections import Counter
+from contextlib import ExitStack
 import logging
 
 import numpy as np
@@ -13,7 +16,11 @@ from rastervision.pipeline.file_system import (
 from rastervision.core.box import Box
 from rastervision.core.data import (CRSTransformer, ClassConfig)
 from rastervision.core.data.label import (SemanticSegmentationLabels,
-                                          SemanticSegmentationSmoothLabels)
+                                          SemanticSegmentationSmoothLabels,
+                                          SemanticSegmentationTiledLabels)
+from rastervision.core.data.label.semantic_segmentation_tiled_labels import (
+    TileKey)
+from rastervision.core.data.label.utils import discard_prediction_edges
 from rastervision.core.data.label_store import LabelStore
 from rastervision.core.data.label_source import SemanticSegmentationLabelSource
 from rastervision.core.data.raster_transformer import RGBClassTransformer
@@ -202,17 +209,7 @@ class SemanticSegmentationLabelStore(LabelStore):
         local_root = get_local_path(self.root_uri, self.tmp_dir)
         make_dir(local_root)
 
-        height, width = self.extent.size
-        out_profile = dict(
-            driver='GTiff',
-            height=height,
-            width=width,
-            transform=self.crs_transformer.transform,
-            crs=self.crs_transformer.image_crs,
-            blockxsize=min(self.rasterio_block_size, width),
-            blockysize=min(self.rasterio_block_size, height))
-        if profile is not None:
-            out_profile.update(profile)
+        out_profile = self._get_out_profile(profile)
 
         # if old scores exist, combine them with the new ones
         if self.score_source is not None:
@@ -235,6 +232,188 @@ class SemanticSegmentationLabelStore(LabelStore):
 
         sync_to_dir(local_root, self.root_uri)
 
+    def save_streaming(self,
+                       windows: Iterable[Box],
+                       predictions: Iterable[np.ndarray],
+                       crop_sz: Optional[int] = None,
+                       profile: Optional[dict] = None) -> None:
+        """Save predictions to disk as they arrive, block by block.
+
+        Unlike save(), this does not require labels for the full scene to be
+        held in memory. Predictions are accumulated in tiled labels whose
+        tiles coincide with the blocks of the output GeoTIFF(s) and each
+        block is written out (and its tile freed) as soon as all the windows
+        that cover it have been added. If the windows are ordered row by row
+        (as is the case for sliding windows), memory usage is proportional to
+        one row of blocks.
+
+        Vector outputs are produced from the written label raster, one strip
+        of blocks at a time, with polygons stitched across strip seams.
+
+        Args:
+            windows (Iterable[Box]): Prediction windows in pixel coords.
+                These are needed in advance to know when a block is complete.
+            predictions (Iterable[np.ndarray]): Predictions for each window,
+                in the same order. Class IDs of shape (H, W) if
+                smooth_output=False, and class scores of shape (C, H, W)
+                otherwise.
+            crop_sz (Optional[int]): Number of rows/columns of pixels from the
+                edge of prediction windows to discard. See
+                SemanticSegmentationLabels.from_predictions().
+                Defaults to None.
+            profile (Optional[dict]): Overrides for the profile of the output
+                GeoTIFF(s). Defaults to None.
+
+        Raises:
+            ValueError: If scores from a previous run exist at the URI, since
+                merging with them is not supported in streaming mode.
+        """
+        if self.score_source is not None:
+            raise ValueError(
+                f'Scores already exist at {self.score_uri}. Merging with '
+                'existing scores is not supported by save_streaming(). '
+                'Use save() instead.')
+
+        windows = list(windows)
+        if crop_sz is not None:
+            windows, predictions = discard_prediction_edges(
+                windows, predictions, crop_sz)
+
+        local_root = get_local_path(self.root_uri, self.tmp_dir)
+        make_dir(local_root)
+
+        block_size = self.rasterio_block_size
+        out_profile = self._get_out_profile(profile)
+        labels: SemanticSegmentationTiledLabels = self.empty_labels(
+            tile_size=block_size)
+
+        # number of windows, yet to arrive, that cover each block
+        num_pending = Counter()
+        for window in windows:
+            num_pending.update(labels.get_tile_keys(window))
+
+        labels_path = get_local_path(self.label_uri, self.tmp_dir)
+        with ExitStack() as stack:
+            write_fns = []
+            if self.discrete_output:
+                write_fns.append(
+                    self._make_discrete_block_writer(stack, out_profile,
+                                                     labels_path,
+                                                     self.class_transformer))
+            # label raster (of class IDs) from which to derive vector outputs
+            vector_src_path = None
+            if self.vector_outputs is not None:
+                if self.discrete_output and self.class_transformer is None:
+                    vector_src_path = labels_path
+                else:
+                    vector_src_path = join(self.tmp_dir,
+                                           'vector-src-labels.tif')
+                    write_fns.append(
+                        self._make_discrete_block_writer(
+                            stack, out_profile, vector_src_path, None))
+            if self.smooth_output:
+                scores_path = get_local_path(self.score_uri, self.tmp_dir)
+                hits_path = get_local_path(self.hits_uri, self.tmp_dir)
+                write_fns.append(
+                    self._make_smooth_block_writer(stack, out_profile,
+                                                   scores_path, hits_path))
+
+            def write_block(key: TileKey) -> None:
+                for write_fn in write_fns:
+                    write_fn(labels, key)
+                # free the tile
+                del labels[labels.get_tile_box(key)]
+
+            # If predictions is tqdm-wrapped, it needs to be the first arg to
+            # zip() or the progress bar won't terminate with the correct
+            # count.
+            for prediction, window in zip(predictions, windows):
+                labels[window] = prediction
+                for key in labels.get_tile_keys(window):
+                    num_pending[key] -= 1
+                    if num_pending[key] == 0:
+                        write_block(key)
+
+            # write out the blocks not covered by any window
+            for key in labels.get_tile_keys(self.extent):
+                if key not in num_pending:
+                    write_block(key)
+
+        if self.vector_outputs is not None:
+            self.write_vector_outputs_from_raster(vector_src_path)
+
+        sync_to_dir(local_root, self.root_uri)
+
+    def _make_discrete_block_writer(
+            self, stack: ExitStack, out_profile: dict, path: str,
+            class_transformer: Optional[RGBClassTransformer]
+    ) -> Callable[[SemanticSegmentationTiledLabels, TileKey], None]:
+        """Open a label raster for writing and return a function that writes
+        a block to it. The raster is closed when the stack exits.
+        """
+        num_bands = 1 if class_transformer is None else 3
+        dtype = np.uint8
+        out_profile = dict(out_profile, count=num_bands, dtype=dtype)
+        ds = stack.enter_context(rio.open(path, 'w', **out_profile))
+        null_class_id = self.class_config.null_class_id
+
+        def write_block(labels: SemanticSegmentationTiledLabels,
+                        key: TileKey) -> None:
+            window = labels.get_tile_box(key)
+            label_arr = labels.get_label_arr(window,
+                                             null_class_id).astype(dtype)
+            if class_transformer is not None:
+                label_arr = class_transformer.class_to_rgb(label_arr)
+                label_arr = label_arr.transpose(2, 0, 1)
+            self._write_array(ds, window, label_arr)
+
+        return write_block
+
+    def _make_smooth_block_writer(
+            self, stack: ExitStack, out_profile: dict, scores_path: str,
+            hits_path: str
+    ) -> Callable[[SemanticSegmentationTiledLabels, TileKey], None]:
+        """Open a score raster and a memory-mapped pixel-hits array for
+        writing and return a function that writes a block to them.
+        """
+        num_bands = len(self.class_config)
+        dtype = np.uint8 if self.smooth_as_uint8 else np.float32
+        out_profile = dict(out_profile, count=num_bands, dtype=dtype)
+        ds = stack.enter_context(rio.open(scores_path, 'w', **out_profile))
+        hits_arr = np.lib.format.open_memmap(
+            hits_path, mode='w+', dtype=np.uint8, shape=self.extent.size)
+        stack.callback(hits_arr.flush)
+
+        def write_block(labels: SemanticSegmentationTiledLabels,
+                        key: TileKey) -> None:
+            window = labels.get_tile_box(key)
+            score_arr = labels.get_score_arr(window)
+            if dtype == np.uint8:
+                score_arr = self._scores_to_uint8(score_arr)
+            else:
+                score_arr = score_arr.astype(dtype)
+            self._write_array(ds, window, score_arr)
+            tile = labels.get_tile(key)
+            if tile is not None:
+                hits_arr[window.to_slices()] = tile.pixel_hits
+
+        return write_block
+
+    def _get_out_profile(self, profile: Optional[dict] = None) -> dict:
+        """Get the rasterio profile for the output GeoTIFF(s)."""
+        height, width = self.extent.size
+        out_profile = dict(
+            driver='GTiff',
+            height=height,
+            width=width,
+            transform=self.crs_transformer.transform,
+            crs=self.crs_transformer.image_crs,
+            blockxsize=min(self.rasterio_block_size, width),
+            blockysize=min(self.rasterio_block_size, height))
+        if profile is not None:
+            out_profile.update(profile)
+        return out_profile
+
     def write_smooth_raster_output(
             self, out_profile: dict, scores_path: str, hits_path: str,
             labels: SemanticSegmentationSmoothLabels) -> None:
@@ -324,6 +503,84 @@ class SemanticSegmentationLabelStore(LabelStore):
                 geojson = geoms_to_geojson(polys)
                 json_to_file(geojson, vo.uri)
 
+    def write_vector_outputs_from_raster(self, path: str) -> None:
+        """Write vectorized outputs for all configs in self.vector_outputs,
+        reading class IDs from a single-band label raster.
+
+        In "polygons" mode, the raster is read and vectorized in horizontal
+        strips (of height rasterio_block_size) and polygons are stitched
+        across strip seams, so that the full label array never needs to be in
+        memory. Each strip is read with a halo of vo.denoise rows so that
+        denoising is not affected by the seams. "buildings" mode needs whole
+        connected components and therefore reads the full raster.
+
+        Args:
+            path (str): Local path to a label raster of class IDs.
+        """
+        from rastervision.core.data.utils import (denoise, geoms_to_geojson,
+                                                  mask_to_building_polygons,
+                                                  mask_strips_to_polygons)
+
+        log.info('Writing vector output to disk.')
+
+        strip_height = self.rasterio_block_size
+        with rio.open(path) as ds:
+            height, width = ds.height, ds.width
+
+            def read_class_mask(class_id: int, ymin: int, ymax: int,
+                                radius: int) -> np.ndarray:
+                """Read a class mask for rows [ymin, ymax) of the raster,
+                denoised using a halo of radius rows on each side."""
+                ymin_halo = max(0, ymin - radius)
+                ymax_halo = min(height, ymax + radius)
+                window = Box(ymin_halo, 0, ymax_halo, width)
+                label_arr = ds.read(1, window=window.rasterio_format())
+                class_mask = (label_arr == class_id).astype(np.uint8)
+                if radius > 0:
+                    class_mask = denoise(class_mask, radius=radius)
+                return class_mask[ymin - ymin_halo:ymax - ymin_halo]
+
+            vector_outputs = tqdm(
+                self.vector_outputs, desc='Vectorizing predictions')
+            with vector_outputs as bar:
+                for i, vo in enumerate(bar):
+                    mode = vo.get_mode()
+                    bar.set_postfix(
+                        dict(
+                            class_id=vo.class_id,
+                            mode=mode,
+                            denoise_radius=vo.denoise))
+
+                    if vo.uri is None:
+                        log.info(f'Skipping VectorOutputConfig at index {i} '
+                                 'due to missing uri.')
+                        continue
+
+                    if mode == 'polygons':
+                        strips = ((ymin,
+                                   read_class_mask(
+                                       vo.class_id, ymin,
+                                       min(ymin + strip_height, height),
+                                       vo.denoise))
+                                  for ymin in range(0, height, strip_height))
+                        polys = mask_strips_to_polygons(strips)
+                    elif mode == 'buildings':
+                        class_mask = read_class_mask(vo.class_id, 0, height,
+                                                     vo.denoise)
+                        polys = mask_to_building_polygons(
+                            mask=class_mask,
+                            min_area=vo.min_area,
+                            width_factor=vo.element_width_factor,
+                            thickness=vo.element_thickness)
+                    else:
+                        raise NotImplementedError()
+
+                    polys = [
+                        self.crs_transformer.pixel_to_map(p) for p in polys
+                    ]
+                    geojson = geoms_to_geojson(polys)
+                    json_to_file(geojson, vo.uri)
+
     def empty_labels(self, **kwargs) -> SemanticSegmentationLabels:
         """Returns an empty SemanticSegmentationLabels object."""
         args = dict(
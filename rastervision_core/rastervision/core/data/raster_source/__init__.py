@@ -1,6 +1,7 @@
 # flake8: noqa
 from rastervision.core.data.raster_source.raster_source import *
 from rastervision.core.data.raster_source.raster_source_config import *
+from rastervision.core.data.raster_source.block_cache import *
 from rastervision.core.data.raster_source.rasterio_source import *
 from rastervision.core.data.raster_source.rasterio_source_config import *
 from rastervision.core.data.raster_source.rasterized_source import *
@@ -13,6 +14,7 @@ __all__ = [
     RasterSourceConfig.__name__,
     RasterioSource.__name__,
     RasterioSourceConfig.__name__,
+    BlockCache.__name__,
     RasterizedSource.__name__,
     RasterizedSourceConfig.__name__,
     RasterizerConfig.__name__,
@@ -0,0 +1,84 @@
+from typing import TYPE_CHECKING, Hashable, Optional
+from collections import OrderedDict
+from threading import Lock
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class BlockCache():
+    """A memory-bounded LRU cache of decoded raster blocks.
+
+    Keys are arbitrary hashables, but are expected to be of the form
+    (uri, band, block_row, block_col). The size of the cache is measured in
+    bytes (as reported by ``np.ndarray.nbytes``) and the least recently used
+    blocks are evicted once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Constructor.
+
+        Args:
+            max_bytes (int): Maximum total size, in bytes, of the cached
+                blocks.
+        """
+        if max_bytes <= 0:
+            raise ValueError('max_bytes must be positive.')
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional['np.ndarray']:
+        """Return the cached block or None. Updates hit/miss counters."""
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+    def put(self, key: Hashable, block: 'np.ndarray') -> None:
+        """Add a block to the cache, evicting old blocks if needed.
+
+        Blocks larger than max_bytes are not cached.
+        """
+        if block.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old_block = self._blocks.pop(key, None)
+            if old_block is not None:
+                self.nbytes -= old_block.nbytes
+            self._blocks[key] = block
+            self.nbytes += block.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Remove all blocks and reset the counters."""
+        with self._lock:
+            self._blocks.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._blocks
+
+    def __repr__(self) -> str:
+        return (f'{type(self).__name__}(max_bytes={self.max_bytes}, '
+                f'nbytes={self.nbytes}, num_blocks={len(self)}, '
+                f'hits={self.hits}, misses={self.misses})')
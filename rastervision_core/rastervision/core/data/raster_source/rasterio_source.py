@@ -12,6 +12,7 @@ from rastervision.pipeline.file_system import download_if_needed
 from rastervision.core.box import Box
 from rastervision.core.data.crs_transformer import RasterioCRSTransformer
 from rastervision.core.data.raster_source import RasterSource
+from rastervision.core.data.raster_source.block_cache import BlockCache
 from rastervision.core.data.utils import listify_uris
 
 if TYPE_CHECKING:
@@ -98,6 +99,104 @@ def load_window(
     return im
 
 
+def load_block(image_dataset: 'DatasetReader',
+               band: int,
+               block_row: int,
+               block_col: int,
+               is_masked: bool = False) -> np.ndarray:
+    """Load a single native block of one band of an image using Rasterio.
+
+    Masked and NODATA pixels are set to 0, as in load_window().
+
+    Args:
+        image_dataset: a Rasterio dataset.
+        band (int): 1-indexed band index.
+        block_row (int): Row index of the block in the band's block grid.
+        block_col (int): Column index of the block in the band's block grid.
+        is_masked (bool): If True, read a masked array from rasterio.
+            Defaults to False.
+
+    Returns:
+        np.ndarray of shape (block_height, block_width). Blocks on the right
+            and bottom edges of the raster may be smaller than the nominal
+            block size.
+    """
+    block_window = image_dataset.block_window(band, block_row, block_col)
+    block = image_dataset.read(band, window=block_window, masked=is_masked)
+    if is_masked:
+        block = np.ma.filled(block, fill_value=0)
+    nodataval = image_dataset.nodatavals[band - 1]
+    if nodataval is not None and nodataval != 0:
+        block[block == nodataval] = 0
+    return block
+
+
+def load_window_from_blocks(image_dataset: 'DatasetReader',
+                            block_cache: BlockCache,
+                            window: Box,
+                            bands: Optional[Sequence[int]] = None,
+                            is_masked: bool = False,
+                            cache_key: Optional[str] = None) -> np.ndarray:
+    """Load a window of an image by assembling it from cached native blocks.
+
+    Blocks that are not in block_cache are read using load_block() and added
+    to the cache. Parts of the window that lie outside the raster are filled
+    with zeros, which matches the boundless read done by load_window().
+
+    Args:
+        image_dataset: a Rasterio dataset.
+        block_cache (BlockCache): Cache of decoded blocks.
+        window (Box): Window in the pixel coordinates of image_dataset.
+        bands (Optional[Sequence[int]]): Band indices to read. Must be
+            1-indexed. If None, all bands are read. Defaults to None.
+        is_masked (bool): If True, read masked arrays from rasterio.
+            Defaults to False.
+        cache_key (Optional[str]): Prefix of the cache keys, usually the URI
+            of the image. If None, image_dataset.name is used.
+            Defaults to None.
+
+    Returns:
+        np.ndarray of shape (height, width, channels).
+    """
+    if bands is None:
+        bands = range(1, image_dataset.count + 1)
+    bands = [int(b) for b in bands]
+    if cache_key is None:
+        cache_key = image_dataset.name
+
+    dtype = np.result_type(*[image_dataset.dtypes[b - 1] for b in bands])
+    h, w = window.size
+    chip = np.zeros((h, w, len(bands)), dtype=dtype)
+
+    raster_extent = Box(0, 0, image_dataset.height, image_dataset.width)
+    read_window = window.intersection(raster_extent)
+    if read_window.area == 0:
+        return chip
+
+    ymin, xmin, ymax, xmax = read_window
+    for channel, band in enumerate(bands):
+        block_h, block_w = image_dataset.block_shapes[band - 1]
+        for block_row in range(ymin // block_h, (ymax - 1) // block_h + 1):
+            for block_col in range(xmin // block_w, (xmax - 1) // block_w + 1):
+                key = (cache_key, band, block_row, block_col)
+                block = block_cache.get(key)
+                if block is None:
+                    block = load_block(image_dataset, band, block_row,
+                                       block_col, is_masked)
+                    block_cache.put(key, block)
+                block_ymin = block_row * block_h
+                block_xmin = block_col * block_w
+                block_box = Box(block_ymin, block_xmin,
+                                block_ymin + block.shape[0],
+                                block_xmin + block.shape[1])
+                overlap = block_box.intersection(read_window)
+                src = overlap.to_offsets(block_box)
+                dst = overlap.to_offsets(window)
+                chip[dst.ymin:dst.ymax, dst.xmin:dst.xmax, channel] = block[
+                    src.ymin:src.ymax, src.xmin:src.xmax]
+    return chip
+
+
 def fill_overflow(extent: Box,
                   window: Box,
                   arr: np.ndarray,
@@ -167,6 +266,7 @@ class RasterioSource(RasterSource):
                  extent: Optional[Box] = None,
                  tmp_dir: Optional[str] = None,
                  load_whole_image: Optional[bool] = False,
+                 block_cache_size: Optional[int] = None,
                  ):
         """Constructor.
 
@@ -188,10 +288,18 @@ class RasterioSource(RasterSource):
                 will be auto-generated. Defaults to None.
             load_whole_image (Optional[bool]): Flag to determine whether to fill the Window with
                 zeros or reshape to fill.
+            block_cache_size (Optional[int]): Maximum size, in bytes, of an
+                LRU cache of decoded native raster blocks. If set, chips are
+                assembled from cached blocks so that overlapping windows do
+                not decode the same blocks repeatedly. If None, no caching is
+                done. Defaults to None.
         """
         self.uris = listify_uris(uris)
         self.allow_streaming = allow_streaming
         self.load_whole_image = load_whole_image
+        self.block_cache = None
+        if block_cache_size is not None:
+            self.block_cache = BlockCache(block_cache_size)
         self._num_channels = None
         self._dtype = None
 
@@ -289,6 +397,19 @@ class RasterioSource(RasterSource):
                   bands: Optional[Sequence[int]] = None,
                   out_shape: Optional[Tuple[int, ...]] = None) -> np.ndarray:
         window = window.shift_origin(self.extent)
+        use_block_cache = (self.block_cache is not None and out_shape is None
+                           and not self.load_whole_image)
+        if use_block_cache:
+            chip = load_window_from_blocks(
+                self.image_dataset,
+                self.block_cache,
+                window,
+                bands=bands,
+                is_masked=self.is_masked,
+                cache_key=self.imagery_path)
+            chip = fill_overflow(self.extent, window, chip)
+            return chip
+
         chip = load_window(
             self.image_dataset,
             bands=bands,
@@ -33,6 +33,13 @@ class RasterioSourceConfig(RasterSourceConfig):
         description=(
             'Allow streaming of assets rather than always downloading.'))
     load_whole_image: Optional[bool] = Field(False, description=('Determine whether to reshape the image to fill the window'))
+    block_cache_size: Optional[int] = Field(
+        None,
+        description=(
+            'Maximum size, in bytes, of an in-memory LRU cache of decoded '
+            'native raster blocks. Useful when reading overlapping windows '
+            '(e.g. sliding windows with stride < size). If None, no caching '
+            'is done.'))
 
     def build(self, tmp_dir, use_transformers=True):
         raster_transformers = ([rt.build() for rt in self.transformers]
@@ -40,4 +47,5 @@ class RasterioSourceConfig(RasterSourceConfig):
 
         return RasterioSource(uris=self.uris, raster_transformers=raster_transformers,
                               allow_streaming=self.allow_streaming, channel_order=self.channel_order,
-                              extent=self.extent, tmp_dir=tmp_dir, load_whole_image=self.load_whole_image)
+                              extent=self.extent, tmp_dir=tmp_dir, load_whole_image=self.load_whole_image,
+                              block_cache_size=self.block_cache_size)
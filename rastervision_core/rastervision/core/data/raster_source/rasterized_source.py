@@ -1,7 +1,10 @@
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 import logging
+import os
 
 from rasterio.features import rasterize
+from rasterio.transform import Affine
+import rasterio as rio
 import numpy as np
 import geopandas as gpd
 
@@ -17,29 +20,38 @@ if TYPE_CHECKING:
 def geoms_to_raster(df: gpd.GeoDataFrame, window: 'Box',
                     background_class_id: int, all_touched: bool,
                     extent: 'Box') -> np.ndarray:
-    """Rasterize geometries that intersect with the window."""
+    """Rasterize geometries that intersect with the window.
+
+    Candidate geometries are looked up in the spatial index of the
+    GeoDataFrame (df.sindex) by bounding box, which is built once and reused
+    across calls. Geometries whose bounding box, but not shape, intersects
+    the window are harmless since they do not burn in any pixels.
+    """
     if len(df) == 0:
         return np.full(window.size, background_class_id, dtype=np.uint8)
 
     window_geom = window.to_shapely()
 
-    # subset to shapes that intersect window
-    df_int = df[df.intersects(window_geom)]
-    # transform to window frame of reference
-    shapes = df_int.translate(xoff=-window.xmin, yoff=-window.ymin)
+    # subset to shapes whose bounding box intersects the window
+    inds = df.sindex.query(window_geom)
+    if len(inds) == 0:
+        return np.full(window.size, background_class_id, dtype=np.uint8)
+    inds.sort()
+    df_int = df.iloc[inds]
+    shapes = df_int.geometry.values
     # class IDs of each shape
-    class_ids = df_int['class_id']
-
-    if len(shapes) > 0:
-        raster = rasterize(
-            shapes=list(zip(shapes, class_ids)),
-            out_shape=window.size,
-            fill=background_class_id,
-            dtype=np.uint8,
-            all_touched=all_touched)
-    else:
-        raster = np.full(window.size, background_class_id, dtype=np.uint8)
-
+    class_ids = df_int['class_id'].values
+
+    # map the window frame of reference to pixel coords instead of
+    # translating the shapes
+    transform = Affine.translation(window.xmin, window.ymin)
+    raster = rasterize(
+        shapes=list(zip(shapes, class_ids)),
+        out_shape=window.size,
+        fill=background_class_id,
+        transform=transform,
+        dtype=np.uint8,
+        all_touched=all_touched)
     return raster
 
 
@@ -51,7 +63,8 @@ class RasterizedSource(RasterSource):
                  background_class_id: int,
                  extent: 'Box',
                  all_touched: bool = False,
-                 raster_transformers: List['RasterTransformer'] = []):
+                 raster_transformers: List['RasterTransformer'] = [],
+                 cache_path: Optional[str] = None):
         """Constructor.
 
         Args:
@@ -65,10 +78,18 @@ class RasterizedSource(RasterSource):
                 Bresenham's line algorithm will be burned in.
                 (See rasterio.features.rasterize for more details). Defaults
                 to False.
+            raster_transformers (List[RasterTransformer], optional): Raster
+                transformers. Defaults to [].
+            cache_path (Optional[str], optional): Local path to a GeoTIFF. If
+                specified, the full extent is rasterized to this file on first
+                use and chips within the extent are subsequently read from
+                it. An existing file with the right shape is reused as-is, so
+                the path should be unique to the labels. Defaults to None.
         """
         self.vector_source = vector_source
         self.background_class_id = background_class_id
         self.all_touched = all_touched
+        self.cache_path = cache_path
 
         self.df = self.vector_source.get_dataframe()
         self.validate_labels(self.df)
@@ -102,6 +123,10 @@ class RasterizedSource(RasterSource):
         Returns:
             [height, width, channels] numpy array
         """
+        if self.cache_path is not None and window.intersection(
+                self.extent) == window:
+            return np.expand_dims(self._read_cached(window), 2)
+
         log.debug(f'Rasterizing window: {window}')
         chip = geoms_to_raster(
             self.df,
@@ -112,6 +137,70 @@ class RasterizedSource(RasterSource):
         # Add third singleton dim since rasters must have >=1 channel.
         return np.expand_dims(chip, 2)
 
+    def _read_cached(self, window: 'Box') -> np.ndarray:
+        if not self._is_cache_valid():
+            self.rasterize_to_file(self.cache_path)
+        window = window.to_offsets(self.extent)
+        with rio.open(self.cache_path) as ds:
+            return ds.read(1, window=window.to_rasterio())
+
+    def _is_cache_valid(self) -> bool:
+        if not os.path.isfile(self.cache_path):
+            return False
+        with rio.open(self.cache_path) as ds:
+            return (ds.height, ds.width) == self.extent.size
+
+    def rasterize_to_file(self, path: str, block_size: int = 2048) -> None:
+        """Rasterize the full extent to a single-band GeoTIFF.
+
+        The extent is rasterized one block at a time to keep memory usage
+        bounded. The output is written to a temporary file first and then
+        moved to path so that readers never see a partial file.
+
+        Args:
+            path (str): Local output path.
+            block_size (int): Size of the blocks rasterized at a time.
+                Defaults to 2048.
+        """
+        log.info(f'Rasterizing labels to {path}...')
+        height, width = self.extent.size
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        part_path = f'{path}.part'
+        profile = dict(
+            driver='GTiff',
+            height=height,
+            width=width,
+            count=1,
+            dtype=np.uint8,
+            tiled=True,
+            blockxsize=256,
+            blockysize=256,
+            compress='deflate')
+        # tiled GeoTIFFs need dimensions larger than the block size
+        if height < 256 or width < 256:
+            profile.update(tiled=False)
+            del profile['blockxsize'], profile['blockysize']
+        try:
+            with rio.open(part_path, 'w', **profile) as ds:
+                windows = self.extent.get_windows(
+                    block_size, block_size, padding=block_size)
+                for window in windows:
+                    window = window.intersection(self.extent)
+                    if window.area == 0:
+                        continue
+                    chip = geoms_to_raster(
+                        self.df,
+                        window,
+                        background_class_id=self.background_class_id,
+                        extent=self.extent,
+                        all_touched=self.all_touched)
+                    offsets = window.to_offsets(self.extent)
+                    ds.write(chip, 1, window=offsets.to_rasterio())
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
     def validate_labels(self, df: gpd.GeoDataFrame) -> None:
         geom_types = set(df.geom_type)
         if 'Point' in geom_types or 'LineString' in geom_types:
@@ -1,3 +1,7 @@
+from typing import Optional
+import hashlib
+from os.path import join
+
 from rastervision.core.data.raster_source import (RasterizedSource)
 from rastervision.core.data.vector_source import (VectorSourceConfig)
 from rastervision.core.data.vector_transformer import (
@@ -18,6 +22,13 @@ class RasterizerConfig(Config):
         'in. If false, only pixels whose center is within the polygon or that '
         'are selected by Bresenham’s line algorithm will be burned in. '
         '(See rasterio.features.rasterize for more details).')
+    cache_dir: Optional[str] = Field(
+        None,
+        description='If set, the full extent of the scene is rasterized once '
+        'to a GeoTIFF in this local directory and chips are read from it '
+        'instead of being rasterized on the fly. The file name is derived '
+        'from the config and the extent, so the cache is not invalidated if '
+        'the vector data is modified in place.')
 
 
 @register_config('rasterized_source')
@@ -53,8 +64,18 @@ class RasterizedSourceConfig(Config):
 
     def build(self, class_config, crs_transformer, extent):
         vector_source = self.vector_source.build(class_config, crs_transformer)
+        cache_path = None
+        if self.rasterizer_config.cache_dir is not None:
+            cache_path = join(self.rasterizer_config.cache_dir,
+                              f'{self.get_cache_key(extent)}.tif')
         return RasterizedSource(
             vector_source=vector_source,
             background_class_id=self.rasterizer_config.background_class_id,
             extent=extent,
-            all_touched=self.rasterizer_config.all_touched)
+            all_touched=self.rasterizer_config.all_touched,
+            cache_path=cache_path)
+
+    def get_cache_key(self, extent) -> str:
+        """Return a key that identifies the rasterization of the extent."""
+        key_str = f'{self.json()}{tuple(extent)}'
+        return hashlib.sha256(key_str.encode()).hexdigest()
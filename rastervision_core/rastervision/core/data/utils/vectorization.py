@@ -2,13 +2,14 @@
 # Ported over from https://github.com/azavea/mask-to-polygons.
 ###############################################################################
 
-from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Tuple
 from itertools import chain
 
 import numpy as np
 import cv2
 import rasterio as rio
 from shapely.geometry import shape
+from shapely.ops import unary_union
 
 if TYPE_CHECKING:
     from shapely.geometry.base import BaseGeometry
@@ -35,6 +36,47 @@ def mask_to_polygons(mask: np.ndarray, transform: Optional[rio.Affine] = None
     return polygons
 
 
+def mask_strips_to_polygons(strips: Iterable[Tuple[int, np.ndarray]]
+                            ) -> Iterator['BaseGeometry']:
+    """Polygonize a raster mask that is provided in horizontal strips.
+
+    Each strip is polygonized separately and polygons that touch the seam
+    between two strips are stitched back together, so that the output is
+    the same as that of ``mask_to_polygons()`` on the full mask, but only
+    one strip needs to be held in memory at a time.
+
+    Args:
+        strips (Iterable[Tuple[int, np.ndarray]]): (row offset, mask strip)
+            tuples in top-to-bottom order. The strips must be contiguous and
+            all have the same width.
+
+    Returns:
+        (Iterator[BaseGeometry]): Generator of shapely polygons in pixel
+        coordinates of the full mask.
+    """
+    # polygons touching the bottom seam of the previous strip
+    open_polys = []
+    for row_offset, mask in strips:
+        transform = rio.Affine.translation(0, row_offset)
+        polys = list(mask_to_polygons(mask, transform=transform))
+        top, bottom = row_offset, row_offset + mask.shape[0]
+        if len(open_polys) > 0:
+            at_seam = [p for p in polys if p.bounds[1] <= top]
+            polys = [p for p in polys if p.bounds[1] > top]
+            merged = unary_union(open_polys + at_seam)
+            if merged.geom_type == 'Polygon':
+                polys.append(merged)
+            else:
+                polys.extend(merged.geoms)
+        open_polys = []
+        for p in polys:
+            if p.bounds[3] >= bottom:
+                open_polys.append(p)
+            else:
+                yield p
+    yield from open_polys
+
+
 def mask_to_building_polygons(
         mask: np.ndarray,
         transform: Optional[rio.Affine] = None,
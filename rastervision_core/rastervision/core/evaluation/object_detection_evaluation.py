@@ -1,75 +1,281 @@
-from typing import TYPE_CHECKING, Dict, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 import numpy as np
-from shapely.strtree import STRtree
 
 from rastervision.core.evaluation import (ClassificationEvaluation,
                                           ClassEvaluationItem)
+from rastervision.core.data.label.box_grid_index import BoxGridIndex
+from rastervision.core.data.label.tfod_utils.np_box_ops import paired_iou
 
 if TYPE_CHECKING:
-    from shapely.geometry import Polygon
     from rastervision.core.data import ObjectDetectionLabels
     from rastervision.core.data.class_config import ClassConfig
 
+# IOU thresholds over which mAP is averaged, as in COCO
+DEFAULT_AP_IOU_THRESHS = tuple(np.round(np.arange(0.5, 1., 0.05), 2))
+# recall values at which the precision-recall curve is sampled
+PR_CURVE_RECALLS = np.linspace(0, 1, 101)
+
+
+def get_candidate_matches(gt_npboxes: np.ndarray, gt_class_ids: np.ndarray,
+                          pred_npboxes: np.ndarray, pred_class_ids: np.ndarray
+                          ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find all overlapping (ground truth, prediction) pairs of the same class.
+
+    Pairs are found by bucketing all boxes with a BoxGridIndex, so that IOUs
+    are only computed for boxes that are near each other.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Indices of the ground truth
+        boxes, indices of the predicted boxes, and their IOUs, for each pair
+        with a non-zero IOU.
+    """
+    num_gt = len(gt_npboxes)
+    npboxes = np.concatenate([gt_npboxes, pred_npboxes]).reshape(-1, 4)
+    ii, jj = BoxGridIndex(npboxes).query_pairs()
+    # since ii < jj, ground truth boxes are always in ii for mixed pairs
+    is_mixed = (ii < num_gt) & (jj >= num_gt)
+    gt_inds, pred_inds = ii[is_mixed], jj[is_mixed] - num_gt
+    same_class = gt_class_ids[gt_inds] == pred_class_ids[pred_inds]
+    gt_inds, pred_inds = gt_inds[same_class], pred_inds[same_class]
+    ious = paired_iou(gt_npboxes[gt_inds], pred_npboxes[pred_inds])
+    overlapping = ious > 0
+    return gt_inds[overlapping], pred_inds[overlapping], ious[overlapping]
+
+
+def match_predictions(gt_inds: np.ndarray, pred_inds: np.ndarray,
+                      ious: np.ndarray, pred_scores: np.ndarray,
+                      iou_thresh: float) -> np.ndarray:
+    """Greedily match predictions to ground truth boxes by score.
+
+    Predictions are visited in order of decreasing score and each is matched
+    to the unmatched ground truth box with the highest IOU, if that IOU is
+    greater than iou_thresh.
+
+    Args:
+        gt_inds (np.ndarray): Ground truth indices of candidate pairs.
+        pred_inds (np.ndarray): Prediction indices of candidate pairs.
+        ious (np.ndarray): IOUs of candidate pairs.
+        pred_scores (np.ndarray): Scores of all predictions.
+        iou_thresh (float): Minimum IOU for a match.
+
+    Returns:
+        np.ndarray: Boolean array indicating which predictions are true
+        positives.
+    """
+    is_tp = np.zeros(len(pred_scores), dtype=bool)
+    valid = ious > iou_thresh
+    gt_inds, pred_inds, ious = gt_inds[valid], pred_inds[valid], ious[valid]
+    if len(ious) == 0:
+        return is_tp
+    pred_rank = np.empty(len(pred_scores), dtype=np.int64)
+    pred_rank[np.argsort(-pred_scores, kind='stable')] = np.arange(
+        len(pred_scores))
+    # by prediction rank, then by decreasing IOU
+    order = np.lexsort((-ious, pred_rank[pred_inds]))
+    gt_matched = set()
+    for gt_ind, pred_ind in zip(gt_inds[order].tolist(),
+                                pred_inds[order].tolist()):
+        if is_tp[pred_ind] or gt_ind in gt_matched:
+            continue
+        is_tp[pred_ind] = True
+        gt_matched.add(gt_ind)
+    return is_tp
+
+
+def compute_ap(scores: np.ndarray, is_tp: np.ndarray,
+               num_gt: int) -> Tuple[float, np.ndarray]:
+    """Compute the average precision of a set of scored predictions.
+
+    Args:
+        scores (np.ndarray): Scores of the predictions.
+        is_tp (np.ndarray): Whether each prediction is a true positive.
+        num_gt (int): Number of ground truth boxes.
+
+    Returns:
+        Tuple[float, np.ndarray]: The all-point interpolated average
+        precision and the interpolated precision at each recall in
+        PR_CURVE_RECALLS. The AP is NaN if num_gt is 0.
+    """
+    if num_gt == 0:
+        return np.nan, np.zeros(len(PR_CURVE_RECALLS))
+    order = np.argsort(-scores, kind='stable')
+    tp_cumsum = np.cumsum(is_tp[order])
+    fp_cumsum = np.cumsum(~is_tp[order])
+    recall = tp_cumsum / num_gt
+    precision = tp_cumsum / np.maximum(tp_cumsum + fp_cumsum, 1)
+    # make precision monotonically decreasing
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    recall_steps = np.diff(recall, prepend=0.)
+    ap = float(np.sum(recall_steps * precision))
+    inds = np.searchsorted(recall, PR_CURVE_RECALLS, side='left')
+    pr_curve = np.zeros(len(PR_CURVE_RECALLS))
+    valid = inds < len(precision)
+    pr_curve[valid] = precision[inds[valid]]
+    return ap, pr_curve
+
 
 def compute_metrics(
         gt_labels: 'ObjectDetectionLabels',
         pred_labels: 'ObjectDetectionLabels',
         num_classes: int,
         iou_thresh: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    gt_geoms = [b.to_shapely() for b in gt_labels.get_boxes()]
-    gt_classes = gt_labels.get_class_ids()
-    pred_geoms = [b.to_shapely() for b in pred_labels.get_boxes()]
-    pred_classes = pred_labels.get_class_ids()
-
-    for pred_geom, class_id in zip(pred_geoms, pred_classes):
-        pred_geom.class_id = class_id
-    pred_tree = STRtree(pred_geoms)
+    """Compute per-class true positive, false positive and false negative
+    counts.
 
-    def iou(a: 'Polygon', b: 'Polygon') -> float:
-        return a.intersection(b).area / a.union(b).area
+    See match_predictions() for how predictions are matched.
+    """
+    gt_class_ids = gt_labels.get_class_ids()
+    pred_class_ids = pred_labels.get_class_ids()
+    candidates = get_candidate_matches(gt_labels.get_npboxes(), gt_class_ids,
+                                       pred_labels.get_npboxes(),
+                                       pred_class_ids)
+    is_tp = match_predictions(
+        *candidates, pred_labels.get_scores(), iou_thresh=iou_thresh)
+    tp = np.bincount(
+        pred_class_ids[is_tp], minlength=num_classes)[:num_classes]
+    fp = np.bincount(
+        pred_class_ids[~is_tp], minlength=num_classes)[:num_classes]
+    gt_count = np.bincount(gt_class_ids, minlength=num_classes)[:num_classes]
+    fn = gt_count - tp
+    return tp.astype(float), fp.astype(float), fn.astype(float)
 
-    def is_matched(geom) -> bool:
-        return hasattr(geom, 'iou_matched')
 
-    tp = np.zeros((num_classes, ))
-    fp = np.zeros((num_classes, ))
-    fn = np.zeros((num_classes, ))
-
-    for gt_geom, gt_class in zip(gt_geoms, gt_classes):
-        matches = [
-            g for g in pred_tree.query(gt_geom)
-            if (not is_matched(g)) and (g.class_id == gt_class)
-        ]
-        ious = np.array([iou(m, gt_geom) for m in matches])
-        if (ious > iou_thresh).any():
-            max_ind = np.argmax(ious)
-            matches[max_ind].iou_matched = True
-            tp[gt_class] += 1
-        else:
-            fn[gt_class] += 1
-
-    for class_id in range(num_classes):
-        pred_not_matched = np.array([not is_matched(g) for g in pred_geoms])
-        fp[class_id] = np.sum(pred_not_matched[pred_classes == class_id])
+class ObjectDetectionEvaluation(ClassificationEvaluation):
+    """Evaluation of object detection predictions.
 
-    return tp, fp, fn
+    In addition to precision, recall and F1 at iou_thresh, the average
+    precision (AP) and precision-recall curve of each class are computed,
+    as well as the AP at each of ap_iou_threshs. To allow merging the
+    evaluations of multiple scenes, the scores and match results of all
+    predictions are kept.
+    """
 
+    def __init__(self,
+                 class_config: 'ClassConfig',
+                 iou_thresh: float = 0.5,
+                 ap_iou_threshs: Optional[Sequence[float]] = None):
+        """Constructor.
 
-class ObjectDetectionEvaluation(ClassificationEvaluation):
-    def __init__(self, class_config: 'ClassConfig', iou_thresh: float = 0.5):
-        super().__init__()
+        Args:
+            class_config (ClassConfig): Class config.
+            iou_thresh (float): IOU threshold used for counting true
+                positives. Defaults to 0.5.
+            ap_iou_threshs (Optional[Sequence[float]]): IOU thresholds at
+                which AP is computed. If None, 0.5 to 0.95 in steps of 0.05 is
+                used. Defaults to None.
+        """
         self.class_config = class_config
         self.iou_thresh = iou_thresh
+        if ap_iou_threshs is None:
+            ap_iou_threshs = DEFAULT_AP_IOU_THRESHS
+        self.ap_iou_threshs = [float(t) for t in ap_iou_threshs]
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        num_threshs = len(self.ap_iou_threshs) + 1
+        # per class: scores of predictions, whether each prediction is a true
+        # positive (at iou_thresh and each of ap_iou_threshs), gt counts
+        self.class_to_scores: Dict[int, np.ndarray] = {}
+        self.class_to_is_tp: Dict[int, np.ndarray] = {}
+        self.class_to_gt_count: Dict[int, int] = {}
+        for class_id in range(len(self.class_config)):
+            self.class_to_scores[class_id] = np.zeros(0)
+            self.class_to_is_tp[class_id] = np.zeros(
+                (0, num_threshs), dtype=bool)
+            self.class_to_gt_count[class_id] = 0
 
     def compute(self, ground_truth_labels: 'ObjectDetectionLabels',
                 prediction_labels: 'ObjectDetectionLabels'):
-        self.class_to_eval_item = ObjectDetectionEvaluation.compute_eval_items(
-            ground_truth_labels,
-            prediction_labels,
-            self.class_config,
-            iou_thresh=self.iou_thresh)
+        gt_class_ids = ground_truth_labels.get_class_ids()
+        pred_class_ids = prediction_labels.get_class_ids()
+        pred_scores = prediction_labels.get_scores()
+        candidates = get_candidate_matches(
+            ground_truth_labels.get_npboxes(), gt_class_ids,
+            prediction_labels.get_npboxes(), pred_class_ids)
+        is_tp = np.stack(
+            [
+                match_predictions(*candidates, pred_scores, iou_thresh=t)
+                for t in [self.iou_thresh, *self.ap_iou_threshs]
+            ],
+            axis=1)
+        for class_id in range(len(self.class_config)):
+            is_class = pred_class_ids == class_id
+            self.class_to_scores[class_id] = pred_scores[is_class]
+            self.class_to_is_tp[class_id] = is_tp[is_class]
+            self.class_to_gt_count[class_id] = int(
+                np.sum(gt_class_ids == class_id))
+        self.class_to_eval_item = self.make_eval_items()
         self.compute_avg()
 
+    def merge(self,
+              other: 'ObjectDetectionEvaluation',
+              scene_id: Optional[str] = None) -> None:
+        for class_id in self.class_to_scores:
+            self.class_to_scores[class_id] = np.concatenate([
+                self.class_to_scores[class_id], other.class_to_scores[class_id]
+            ])
+            self.class_to_is_tp[class_id] = np.concatenate([
+                self.class_to_is_tp[class_id], other.class_to_is_tp[class_id]
+            ])
+            self.class_to_gt_count[class_id] += other.class_to_gt_count[
+                class_id]
+        super().merge(other, scene_id=scene_id)
+        # the tp/fp/fn counts were merged by the parent class, but AP needs
+        # to be recomputed from the merged predictions
+        self.class_to_eval_item = self.make_eval_items()
+        self.compute_avg()
+
+    def make_eval_items(self) -> Dict[int, ClassEvaluationItem]:
+        """Make an eval item for each class from the stored match results."""
+        class_to_eval_item = {}
+        for class_id in self.class_to_scores:
+            scores = self.class_to_scores[class_id]
+            is_tp = self.class_to_is_tp[class_id]
+            gt_count = self.class_to_gt_count[class_id]
+            tp = int(is_tp[:, 0].sum())
+            ap, pr_curve = compute_ap(scores, is_tp[:, 0], gt_count)
+            ap_by_iou_thresh = {
+                f'{t:.2f}': compute_ap(scores, is_tp[:, i + 1], gt_count)[0]
+                for i, t in enumerate(self.ap_iou_threshs)
+            }
+            class_to_eval_item[class_id] = ClassEvaluationItem(
+                class_id=class_id,
+                class_name=self.class_config.get_name(class_id),
+                tp=tp,
+                fp=len(scores) - tp,
+                fn=gt_count - tp,
+                ap=ap,
+                ap_by_iou_thresh=ap_by_iou_thresh,
+                pr_curve={
+                    'recall': PR_CURVE_RECALLS.round(2).tolist(),
+                    'precision': pr_curve.tolist()
+                })
+        return class_to_eval_item
+
+    def compute_avg(self):
+        super().compute_avg()
+        if self.avg_item is None:
+            return
+        # mean over classes that have ground truth boxes
+        items = [
+            item for item in self.class_to_eval_item.values()
+            if item.gt_count > 0
+        ]
+        if len(items) == 0:
+            return
+        self.avg_item['map'] = float(
+            np.mean([item.extra_info['ap'] for item in items]))
+        self.avg_item['map_by_iou_thresh'] = {
+            t: float(
+                np.mean([
+                    item.extra_info['ap_by_iou_thresh'][t] for item in items
+                ]))
+            for t in items[0].extra_info['ap_by_iou_thresh']
+        }
+        self.avg_item['map_averaged_over_iou_threshs'] = float(
+            np.mean(list(self.avg_item['map_by_iou_thresh'].values())))
+
     @staticmethod
     def compute_eval_items(
             gt_labels: 'ObjectDetectionLabels',
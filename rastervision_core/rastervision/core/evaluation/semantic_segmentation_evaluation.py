@@ -2,7 +2,6 @@ from typing import TYPE_CHECKING
 import logging
 
 import numpy as np
-from sklearn.metrics import confusion_matrix
 from tqdm.auto import tqdm
 
 from rastervision.core.evaluation import ClassEvaluationItem
@@ -15,6 +14,35 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+def compute_conf_mat(gt_arr: np.ndarray, pred_arr: np.ndarray,
+                     num_classes: int) -> np.ndarray:
+    """Compute a confusion matrix from arrays of class IDs.
+
+    Uses a single np.bincount over gt * num_classes + pred. Pixels whose
+    ground truth or predicted class ID is not in [0, num_classes) are
+    ignored.
+
+    Args:
+        gt_arr (np.ndarray): Ground truth class IDs.
+        pred_arr (np.ndarray): Predicted class IDs. Same shape as gt_arr.
+        num_classes (int): Number of classes.
+
+    Returns:
+        np.ndarray: A (num_classes, num_classes) array of counts where rows
+        correspond to ground truth classes and columns to predicted classes.
+    """
+    gt_arr = gt_arr.ravel()
+    pred_arr = pred_arr.ravel()
+    gt_valid = (gt_arr >= 0) & (gt_arr < num_classes)
+    pred_valid = (pred_arr >= 0) & (pred_arr < num_classes)
+    valid = gt_valid & pred_valid
+    if not valid.all():
+        gt_arr, pred_arr = gt_arr[valid], pred_arr[valid]
+    inds = gt_arr.astype(np.int64) * num_classes + pred_arr.astype(np.int64)
+    counts = np.bincount(inds, minlength=num_classes**2)
+    return counts.reshape(num_classes, num_classes)
+
+
 class SemanticSegmentationEvaluation(ClassificationEvaluation):
     """Evaluation for semantic segmentation."""
 
@@ -29,16 +57,25 @@ class SemanticSegmentationEvaluation(ClassificationEvaluation):
         # compute confusion matrix
         null_class_id = self.class_config.null_class_id
         num_classes = len(self.class_config)
-        labels = np.arange(num_classes)
-        self.conf_mat = np.zeros((num_classes, num_classes))
+        conf_mat = np.zeros((num_classes, num_classes))
         windows = pred_labels.get_windows()
         with tqdm(windows, delay=5, desc='Computing metrics') as bar:
             for window in bar:
                 gt_arr = gt_labels.get_label_arr(window, null_class_id)
                 pred_arr = pred_labels.get_label_arr(window, null_class_id)
-                self.conf_mat += confusion_matrix(
-                    gt_arr.ravel(), pred_arr.ravel(), labels=labels)
+                conf_mat += compute_conf_mat(gt_arr, pred_arr, num_classes)
+
+        self.compute_from_conf_mat(conf_mat)
 
+    def compute_from_conf_mat(self, conf_mat: np.ndarray) -> None:
+        """Compute metrics from an already accumulated confusion matrix.
+
+        Args:
+            conf_mat (np.ndarray): A (num_classes, num_classes) array with
+                ground truth classes as rows and predictions as columns.
+        """
+        self.reset()
+        self.conf_mat = conf_mat
         for class_id, class_name in enumerate(self.class_config.names):
             eval_item = ClassEvaluationItem.from_multiclass_conf_mat(
                 conf_mat=self.conf_mat,
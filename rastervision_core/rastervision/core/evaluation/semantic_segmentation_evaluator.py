@@ -1,23 +1,118 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
+import numpy as np
+from rasterio.features import rasterize
+from rasterio.transform import Affine
+from tqdm.auto import tqdm
+
 from rastervision.core.evaluation import (ClassificationEvaluator,
                                           SemanticSegmentationEvaluation)
+from rastervision.core.evaluation.semantic_segmentation_evaluation import (
+    compute_conf_mat)
 
 log = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from rastervision.core.data import Scene
+    from shapely.geometry import Polygon
+    from rastervision.core.box import Box
+    from rastervision.core.data import ClassConfig, Scene
 
 
 class SemanticSegmentationEvaluator(ClassificationEvaluator):
-    """Evaluates predictions for a set of scenes."""
+    """Evaluates predictions for a set of scenes.
+
+    If the predictions have been saved as a discrete raster, ground truth and
+    predictions are read and compared one tile at a time, so that only a
+    single tile of each needs to be in memory at once.
+    """
+
+    def __init__(self,
+                 class_config: 'ClassConfig',
+                 output_uri: Optional[str] = None,
+                 tile_size: int = 2048,
+                 num_workers: int = 1):
+        """Constructor.
+
+        Args:
+            class_config (ClassConfig): Class config.
+            output_uri (Optional[str]): URI of the JSON file to save the
+                evaluation to. Defaults to None.
+            tile_size (int): Size of the tiles that the ground truth and
+                predictions are read in. Defaults to 2048.
+            num_workers (int): Number of scenes to evaluate concurrently.
+                Defaults to 1.
+        """
+        super().__init__(class_config, output_uri)
+        self.tile_size = tile_size
+        self.num_workers = num_workers
 
     def create_evaluation(self) -> SemanticSegmentationEvaluation:
         return SemanticSegmentationEvaluation(self.class_config)
 
+    def process(self, scenes: Iterable['Scene'],
+                tmp_dir: Optional[str] = None) -> None:
+        """Override to evaluate scenes concurrently."""
+        if self.output_uri is None:
+            return
+        scenes = list(scenes)
+        evaluation_global = self.create_evaluation()
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            # map() returns results in order, so the merged evaluation does
+            # not depend on the order in which scenes finish
+            evaluations = executor.map(self.evaluate_scene, scenes)
+            for scene, evaluation in zip(scenes, evaluations):
+                evaluation_global.merge(evaluation, scene_id=scene.id)
+        evaluation_global.save(self.output_uri)
+
     def evaluate_scene(self, scene: 'Scene') -> SemanticSegmentationEvaluation:
-        """Override to pass null_class_id to filter_by_aoi()."""
+        """Evaluate the predictions for a scene.
+
+        If the label store has discrete predictions, they are streamed
+        tile-by-tile alongside the ground truth. Otherwise, the full
+        ground truth and predictions are loaded via get_labels().
+        """
+        log.info(f'Computing evaluation for scene {scene.id}...')
+        pred_source = getattr(scene.label_store, 'label_source', None)
+        if pred_source is None:
+            return self._evaluate_scene_in_memory(scene)
+
+        null_class_id = self.class_config.null_class_id
+        num_classes = len(self.class_config)
+        conf_mat = np.zeros((num_classes, num_classes))
+        windows = self.get_tiles(pred_source.extent)
+        with tqdm(windows, delay=5, desc='Computing metrics') as bar:
+            for window in bar:
+                if scene.aoi_polygons:
+                    aoi_mask = get_aoi_mask(window, scene.aoi_polygons)
+                    if not aoi_mask.any():
+                        # same as filling the whole tile with the null class
+                        conf_mat[null_class_id, null_class_id] += window.area
+                        continue
+                gt_arr = scene.label_source.get_label_arr(window)
+                pred_arr = pred_source.get_label_arr(window)
+                if scene.aoi_polygons:
+                    gt_arr[~aoi_mask] = null_class_id
+                    pred_arr[~aoi_mask] = null_class_id
+                conf_mat += compute_conf_mat(gt_arr, pred_arr, num_classes)
+
+        evaluation = self.create_evaluation()
+        evaluation.compute_from_conf_mat(conf_mat)
+        return evaluation
+
+    def get_tiles(self, extent: 'Box') -> List['Box']:
+        """Split the extent into non-overlapping tiles of size tile_size.
+
+        Tiles at the right and bottom edges are clipped to the extent.
+        """
+        tiles = extent.get_windows(
+            self.tile_size, self.tile_size, padding=self.tile_size)
+        tiles = [tile.intersection(extent) for tile in tiles]
+        return [tile for tile in tiles if tile.area > 0]
+
+    def _evaluate_scene_in_memory(
+            self, scene: 'Scene') -> SemanticSegmentationEvaluation:
         null_class_id = self.class_config.null_class_id
         ground_truth = scene.label_source.get_labels()
         predictions = scene.label_store.get_labels()
@@ -29,3 +124,28 @@ class SemanticSegmentationEvaluator(ClassificationEvaluator):
                                                     null_class_id)
         evaluation = self.evaluate_predictions(ground_truth, predictions)
         return evaluation
+
+
+def get_aoi_mask(window: 'Box', aoi_polygons: List['Polygon']) -> np.ndarray:
+    """Return a boolean mask of the pixels in the window that are in the AOI.
+
+    Args:
+        window (Box): Window in pixel coordinates.
+        aoi_polygons (List[Polygon]): AOI polygons in pixel coordinates.
+
+    Returns:
+        np.ndarray: Boolean array of shape (window.height, window.width).
+    """
+    window_geom = window.to_shapely()
+    polygons = [p for p in aoi_polygons if p.intersects(window_geom)]
+    out_shape = (window.height, window.width)
+    if not polygons:
+        return np.zeros(out_shape, dtype=bool)
+    mask = rasterize(
+        polygons,
+        out_shape=out_shape,
+        fill=0,
+        default_value=1,
+        transform=Affine.translation(window.xmin, window.ymin),
+        dtype=np.uint8)
+    return mask.astype(bool)
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, Iterable, Optional, Tuple
 
-from rastervision.pipeline.config import register_config
+from rastervision.pipeline.config import register_config, Field
+from rastervision.core.box import PosInt
 from rastervision.core.evaluation.classification_evaluator_config import (
     ClassificationEvaluatorConfig)
 from rastervision.core.evaluation.semantic_segmentation_evaluator import (
@@ -23,6 +24,14 @@ def ss_evaluator_config_upgrader(cfg_dict: dict, version: int) -> dict:
 @register_config(
     'semantic_segmentation_evaluator', upgrader=ss_evaluator_config_upgrader)
 class SemanticSegmentationEvaluatorConfig(ClassificationEvaluatorConfig):
+    tile_size: PosInt = Field(
+        2048,
+        description='Size of the tiles in which ground truth and predictions '
+        'are read and compared. Only applies if the predictions were saved as '
+        'a discrete raster.')
+    num_workers: PosInt = Field(
+        1, description='Number of scenes to evaluate concurrently.')
+
     def build(self,
               class_config: 'ClassConfig',
               scene_group: Optional[Tuple[str, Iterable[str]]] = None
@@ -33,5 +42,9 @@ class SemanticSegmentationEvaluatorConfig(ClassificationEvaluatorConfig):
             group_name, _ = scene_group
             output_uri = self.get_output_uri(group_name)
 
-        evaluator = SemanticSegmentationEvaluator(class_config, output_uri)
+        evaluator = SemanticSegmentationEvaluator(
+            class_config,
+            output_uri,
+            tile_size=self.tile_size,
+            num_workers=self.num_workers)
         return evaluator
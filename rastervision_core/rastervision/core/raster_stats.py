@@ -1,4 +1,6 @@
-from typing import TYPE_CHECKING, Iterator, Optional, Sequence
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import json
 
 import numpy as np
@@ -57,14 +59,136 @@ def parallel_mean(mean_a, count_a, mean_b, count_b):
     return mean
 
 
+class _RunningStats():
+    """Per-band running count, mean, sum of squared deviations (M2), and,
+    optionally, histogram of the valid (non-NODATA) values of a raster.
+
+    Sums and sums of squares of each chip are computed on the chip in its
+    native dtype (with float64 accumulators) and are merged into the running
+    stats using the parallel algorithm for the variance. Two _RunningStats
+    can be merged in the same way.
+    """
+
+    def __init__(self,
+                 num_channels: int,
+                 compute_histograms: bool = False,
+                 hist_bins: int = 256,
+                 hist_range: Optional[Tuple[float, float]] = None):
+        self.count = np.zeros((num_channels, ), dtype=np.int64)
+        self.mean = np.zeros((num_channels, ))
+        self.m2 = np.zeros((num_channels, ))
+        self.compute_histograms = compute_histograms
+        self.hist_bins = hist_bins
+        self.hist_range = hist_range
+        self.hist_counts: Optional[np.ndarray] = None
+        self.hist_edges: Optional[np.ndarray] = None
+
+    def _init_histograms(self, dtype: np.dtype) -> None:
+        """Set up histogram bins based on the dtype of the data.
+
+        Integer data of up to 16 bits gets one bin per possible value, so
+        that the histograms (and percentiles derived from them) are exact.
+        Other data needs hist_range to be specified.
+        """
+        num_channels = len(self.count)
+        if np.issubdtype(dtype, np.integer) and dtype.itemsize <= 2:
+            info = np.iinfo(dtype)
+            self.hist_edges = np.arange(info.min, info.max + 2)
+        else:
+            if self.hist_range is None:
+                raise ValueError(
+                    f'hist_range must be specified to compute histograms of '
+                    f'data of type {dtype}.')
+            self.hist_edges = np.linspace(*self.hist_range, self.hist_bins + 1)
+        self.hist_counts = np.zeros(
+            (num_channels, len(self.hist_edges) - 1), dtype=np.int64)
+
+    def update(self, chip: np.ndarray) -> None:
+        """Update stats with a (H, W, C) chip. 0 and NaN are NODATA."""
+        if np.issubdtype(chip.dtype, np.floating):
+            nan_mask = np.isnan(chip)
+            if nan_mask.any():
+                chip = np.where(nan_mask, 0, chip)
+        chip = chip.reshape(-1, chip.shape[-1])
+        # Since NODATA pixels are 0, they do not contribute to the sums, so
+        # there is no need to mask them out.
+        count = np.count_nonzero(chip, axis=0)
+        if not np.any(count):
+            return
+        sums = chip.sum(axis=0, dtype=np.float64)
+        sq_sums = np.einsum('ij,ij->j', chip, chip, dtype=np.float64)
+        denom = np.maximum(count, 1)
+        mean = sums / denom
+        m2 = np.maximum(sq_sums - sums * mean, 0)
+        self._merge(count, mean, m2)
+
+        if self.compute_histograms:
+            if self.hist_edges is None:
+                self._init_histograms(chip.dtype)
+            self._update_histograms(chip)
+
+    def _update_histograms(self, chip: np.ndarray) -> None:
+        """Update histograms with a (N, C) chip."""
+        exact = np.issubdtype(chip.dtype, np.integer) and (
+            len(self.hist_edges) - 1) == 2**(8 * chip.dtype.itemsize)
+        for i in range(chip.shape[-1]):
+            band = chip[:, i]
+            vals = band[band != 0]
+            if exact:
+                offset = self.hist_edges[0]
+                self.hist_counts[i] += np.bincount(
+                    vals.astype(np.int64) - offset,
+                    minlength=self.hist_counts.shape[1])
+            else:
+                self.hist_counts[i] += np.histogram(
+                    vals, bins=self.hist_edges)[0]
+
+    def _merge(self, count_b: np.ndarray, mean_b: np.ndarray,
+               m2_b: np.ndarray) -> None:
+        count_a, mean_a, m2_a = self.count, self.mean, self.m2
+        count = count_a + count_b
+        # avoid division by zero for bands that have no data at all
+        denom = np.maximum(count, 1)
+        delta = mean_b - mean_a
+        self.mean = mean_a + delta * count_b / denom
+        self.m2 = m2_a + m2_b + delta**2 * count_a * count_b / denom
+        self.count = count
+
+    def merge(self, other: '_RunningStats') -> None:
+        """Merge stats computed over another partition of the data."""
+        self._merge(other.count, other.mean, other.m2)
+        if other.hist_counts is None:
+            return
+        if self.hist_counts is None:
+            self.hist_counts = other.hist_counts.copy()
+            self.hist_edges = other.hist_edges
+        elif np.array_equal(self.hist_edges, other.hist_edges):
+            self.hist_counts += other.hist_counts
+        else:
+            raise ValueError('Cannot merge histograms with different bins. '
+                             'Are the raster sources of different dtypes?')
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / np.maximum(self.count, 1))
+
+
 class RasterStats():
+    """Per-band means, standard deviations, and (optionally) histograms of
+    the values in one or more rasters."""
+
     def __init__(self):
         self.means = None
         self.stds = None
+        self.histograms: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
 
     def compute(self,
                 raster_sources: Sequence['RasterSource'],
-                sample_prob: Optional[float] = None) -> None:
+                sample_prob: Optional[float] = None,
+                num_workers: int = 1,
+                compute_histograms: bool = False,
+                hist_bins: int = 256,
+                hist_range: Optional[Tuple[float, float]] = None) -> None:
         """Compute the mean and stds over all the raster_sources.
 
         This ignores NODATA values.
@@ -76,75 +200,122 @@ class RasterStats():
         uniformly sampled from the scene with replacement. Otherwise, it uses a sliding
         window over the entire scene to compute stats.
 
+        Partial stats are computed for each raster source and then merged.
+        If num_workers > 1, the raster sources are processed concurrently in
+        a pool of threads. Threads rather than processes are used because
+        raster sources hold open file handles that cannot be pickled; both
+        reading (GDAL) and the numpy reductions release the GIL. Each raster
+        source is only ever read by one thread at a time.
+
         Args:
             raster_sources: list of RasterSource
             sample_prob: (float or None) between 0 and 1
+            num_workers: (int) number of raster sources to process
+                concurrently. Defaults to 1.
+            compute_histograms: (bool) if True, also compute a histogram of
+                values for each band (see get_percentiles()). Integer data of
+                up to 16 bits gets one bin per value, so that the histograms
+                are exact. Defaults to False.
+            hist_bins: (int) number of histogram bins for other data types.
+                Defaults to 256.
+            hist_range: (Optional[Tuple[float, float]]) range of the
+                histogram bins for other data types. Required in that case.
         """
         stride = chip_sz
         nb_channels = raster_sources[0].num_channels_raw
 
-        def get_chip(raster_source: 'RasterSource',
-                     window: 'Box') -> Optional[np.ndarray]:
-            """Return chip or None if all values are NODATA."""
-            chip = raster_source.get_raw_chip(window).astype(float)
-            # Convert shape from [h,w,c] to [c,h*w]
-            chip = np.reshape(np.transpose(chip, [2, 0, 1]), (nb_channels, -1))
-
-            # Ignore NODATA values.
-            chip[chip == 0.0] = np.nan
-            if np.any(~np.isnan(chip)):
-                return chip
-            return None
-
-        def sliding_chip_stream() -> Iterator[np.ndarray]:
-            """Get stream of chips using a sliding window of size 300."""
-            for raster_source in raster_sources:
-                windows = raster_source.extent.get_windows(chip_sz, stride)
-                for window in windows:
-                    chip = get_chip(raster_source, window)
-                    if chip is not None:
-                        yield chip
-
-        def random_chip_stream() -> Iterator[np.ndarray]:
-            """Get random stream of chips."""
-            for raster_source in raster_sources:
-                extent = raster_source.extent
-                num_pixels = extent.area
-                num_chips = round(sample_prob * (num_pixels / (chip_sz**2)))
-                num_chips = max(1, num_chips)
-                for _ in range(num_chips):
-                    window = raster_source.extent.make_random_square(chip_sz)
-                    chip = get_chip(raster_source, window)
-                    if chip is not None:
-                        yield chip
-
-        # For each chip, compute the mean and var of that chip and then update the
-        # running mean and var.
-        count = 0
-        mean = np.zeros((nb_channels, ))
-        var = np.zeros((nb_channels, ))
-        chip_stream = (sliding_chip_stream()
-                       if sample_prob is None else random_chip_stream())
-
-        with tqdm(chip_stream, desc='Analyzing chips') as bar:
-            for chip in bar:
-                chip_means = np.nanmean(chip, axis=1)
-                chip_vars = np.nanvar(chip, axis=1)
-                chip_count = np.sum(chip[0] != np.nan)
-
-                var = parallel_variance(chip_means, chip_count, chip_vars,
-                                        mean, count, var)
-                mean = parallel_mean(chip_means, chip_count, mean, count)
-                count += chip_count
-
-        self.means = mean
-        self.stds = np.sqrt(var)
+        def get_windows(raster_source: 'RasterSource') -> List['Box']:
+            if sample_prob is None:
+                return raster_source.extent.get_windows(chip_sz, stride)
+            extent = raster_source.extent
+            num_pixels = extent.area
+            num_chips = round(sample_prob * (num_pixels / (chip_sz**2)))
+            num_chips = max(1, num_chips)
+            return [
+                extent.make_random_square(chip_sz) for _ in range(num_chips)
+            ]
+
+        def compute_raster_stats(
+                raster_source: 'RasterSource') -> _RunningStats:
+            stats = _RunningStats(
+                nb_channels,
+                compute_histograms=compute_histograms,
+                hist_bins=hist_bins,
+                hist_range=hist_range)
+            for window in get_windows(raster_source):
+                chip = raster_source.get_raw_chip(window)
+                stats.update(chip)
+            return stats
+
+        stats = _RunningStats(nb_channels)
+        if num_workers > 1:
+            executor = ThreadPoolExecutor(max_workers=num_workers)
+            per_source_stats = executor.map(compute_raster_stats,
+                                            raster_sources)
+        else:
+            executor = nullcontext()
+            per_source_stats = map(compute_raster_stats, raster_sources)
+        with executor:
+            with tqdm(
+                    per_source_stats,
+                    desc='Analyzing rasters',
+                    total=len(raster_sources)) as bar:
+                for raster_stats in bar:
+                    stats.merge(raster_stats)
+
+        self.means = stats.mean
+        self.stds = stats.std
+        if stats.hist_counts is not None:
+            self.histograms = [(counts, stats.hist_edges)
+                               for counts in stats.hist_counts]
+
+    def get_percentiles(self, q: Sequence[float]) -> np.ndarray:
+        """Get per-band percentiles from the histograms.
+
+        Exact for integer data of up to 16 bits. Otherwise, values are
+        linearly interpolated within histogram bins.
+
+        Args:
+            q (Sequence[float]): Percentiles, in [0, 100].
+
+        Returns:
+            np.ndarray: Array of shape (num_bands, len(q)).
+        """
+        if self.histograms is None:
+            raise ValueError('Histograms have not been computed.')
+        q = np.asarray(q, dtype=float) / 100
+        out = []
+        for counts, edges in self.histograms:
+            counts = np.asarray(counts)
+            edges = np.asarray(edges)
+            cum_counts = np.cumsum(counts)
+            total = cum_counts[-1]
+            if total == 0:
+                out.append(np.full(len(q), np.nan))
+                continue
+            targets = q * total
+            bin_inds = np.searchsorted(cum_counts, targets, side='left')
+            bin_inds = np.clip(bin_inds, 0, len(counts) - 1)
+            if np.issubdtype(edges.dtype, np.integer):
+                out.append(edges[bin_inds].astype(float))
+                continue
+            prev_counts = np.where(bin_inds > 0, cum_counts[bin_inds - 1], 0)
+            bin_counts = np.maximum(counts[bin_inds], 1)
+            frac = np.clip((targets - prev_counts) / bin_counts, 0, 1)
+            lo, hi = edges[bin_inds], edges[bin_inds + 1]
+            out.append(lo + frac * (hi - lo))
+        return np.stack(out)
 
     def save(self, stats_uri: str) -> None:
         # Ensure lists
         means = list(self.means)
         stds = list(self.stds)
         stats = {'means': means, 'stds': stds}
+        if self.histograms is not None:
+            stats['histograms'] = [
+                _histogram_to_dict(counts, edges)
+                for counts, edges in self.histograms
+            ]
         str_to_file(json.dumps(stats), stats_uri)
 
     @staticmethod
@@ -153,4 +324,25 @@ class RasterStats():
         stats = RasterStats()
         stats.means = stats_json['means']
         stats.stds = stats_json['stds']
+        if 'histograms' in stats_json:
+            stats.histograms = [
+                _histogram_from_dict(d) for d in stats_json['histograms']
+            ]
         return stats
+
+
+def _histogram_to_dict(counts: np.ndarray, edges: np.ndarray) -> dict:
+    """Serialize a histogram, trimming empty bins at both ends."""
+    nonzero = np.flatnonzero(counts)
+    if len(nonzero) == 0:
+        lo, hi = 0, 0
+    else:
+        lo, hi = nonzero[0], nonzero[-1] + 1
+    return {
+        'counts': counts[lo:hi].tolist(),
+        'bin_edges': edges[lo:hi + 1].tolist()
+    }
+
+
+def _histogram_from_dict(d: dict) -> Tuple[np.ndarray, np.ndarray]:
+    return np.array(d['counts'], dtype=np.int64), np.array(d['bin_edges'])
@@ -170,4 +170,5 @@ class ObjectDetection(RVPipeline):
         return ObjectDetectionLabels.prune_duplicates(
             labels,
             score_thresh=self.config.predict_options.score_thresh,
-            merge_thresh=self.config.predict_options.merge_thresh)
+            merge_thresh=self.config.predict_options.merge_thresh,
+            class_agnostic=self.config.predict_options.class_agnostic_merge)
@@ -55,6 +55,11 @@ class ObjectDetectionPredictOptions(PredictOptions):
         description=
         ('Predicted boxes are only output if their score is above score_thresh.'
          ))
+    class_agnostic_merge: bool = Field(
+        True,
+        description=
+        ('If True, overlapping predicted boxes are merged regardless of their '
+         'class. If False, only boxes of the same class are merged.'))
 
 
 @register_config('object_detection')
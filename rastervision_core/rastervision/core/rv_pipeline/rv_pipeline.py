@@ -2,7 +2,9 @@ import logging
 from os.path import join
 import tempfile
 import shutil
-from typing import TYPE_CHECKING, Optional, List
+import multiprocessing
+import traceback
+from typing import TYPE_CHECKING, Iterator, Optional, List, Tuple
 from functools import lru_cache
 
 import click
@@ -11,9 +13,10 @@ from tqdm.auto import tqdm
 
 from rastervision.pipeline.pipeline import Pipeline
 from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
 from rastervision.core.data_sample import DataSample
 from rastervision.core.data import Scene, Labels
-from rastervision.core.backend import Backend
+from rastervision.core.backend import Backend, SampleWriter
 from rastervision.core.rv_pipeline import TRAIN, VALIDATION
 from rastervision.pipeline.file_system.utils import (
     download_if_needed, zipdir, get_local_path, upload_or_copy, make_dir,
@@ -22,11 +25,62 @@ from rastervision.pipeline.file_system.utils import (
 log = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from rastervision.core.data import ClassConfig, SceneConfig
     from rastervision.core.rv_pipeline import RVPipelineConfig
 
 ALL_COMMANDS = ['analyze', 'chip', 'train', 'predict', 'eval', 'bundle']
 SPLITTABLE_COMMANDS = ['chip', 'predict']
 GPU_COMMANDS = ['train', 'predict']
+# max number of samples, per worker, waiting to be written when chipping
+# in parallel
+CHIP_QUEUE_SIZE_PER_WORKER = 8
+
+
+def save_window_manifest(windows: List[Box], uri: str, tmp_dir: str) -> None:
+    """Save windows as an (N, 4) int32 .npy array to uri."""
+    windows = BoxArray.from_boxes(windows)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp_subdir:
+        path = join(tmp_subdir, 'windows.npy')
+        np.save(path, windows.npboxes)
+        upload_or_copy(path, uri)
+
+
+def load_window_manifest(uri: str, tmp_dir: str) -> BoxArray:
+    """Load windows saved by save_window_manifest()."""
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp_subdir:
+        path = download_if_needed(uri, tmp_subdir)
+        return BoxArray(np.load(path))
+
+
+class ChipWorkerError(Exception):
+    """Raised when a chip worker process fails."""
+    pass
+
+
+def _chip_worker(pipeline_cfg: 'RVPipelineConfig', tmp_dir: str,
+                 tasks: multiprocessing.Queue,
+                 samples: multiprocessing.Queue) -> None:
+    """Chip (scene, split) tasks and put the resulting samples on a queue.
+
+    A None is put on the samples queue once there are no more tasks. If an
+    exception is raised, its traceback is put on the queue instead.
+    """
+    try:
+        pipeline: 'RVPipeline' = pipeline_cfg.build(tmp_dir)
+        class_cfg = pipeline_cfg.dataset.class_config
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            scene_cfg, split = task
+            samples = pipeline.get_scene_train_samples(scene_cfg, class_cfg,
+                                                       split)
+            for sample in samples:
+                samples.put(pipeline.post_process_sample(sample))
+    except Exception:
+        samples.put(ChipWorkerError(traceback.format_exc()))
+    finally:
+        samples.put(None)
 
 
 class RVPipeline(Pipeline):
@@ -114,6 +168,70 @@ class RVPipeline(Pipeline):
         """
         raise NotImplementedError()
 
+    def get_train_samples(self, scene: Scene,
+                          split: str) -> Iterator[DataSample]:
+        """Yield the training samples for a Scene.
+
+        By default, this reads the chip and labels for each window returned
+        by get_train_windows(). Pipelines whose window filtering already needs
+        to read the chip or labels can override this to read each window only
+        once.
+
+        Args:
+            scene: Scene to generate samples from.
+            split: TRAIN or VALIDATION.
+        """
+        for window in self.get_train_windows(scene):
+            yield self.make_train_sample(window, scene, split)
+
+    def make_train_sample(self, window: Box, scene: Scene,
+                          split: str) -> DataSample:
+        """Read the chip and labels for a training window."""
+        chip = scene.raster_source.get_chip(window)
+        labels = self.get_train_labels(window, scene)
+        return DataSample(
+            chip=chip,
+            window=window,
+            labels=labels,
+            scene_id=str(scene.id),
+            is_train=split == TRAIN)
+
+    def get_scene_train_samples(self, scene_cfg: 'SceneConfig',
+                                class_cfg: 'ClassConfig',
+                                split: str) -> Iterator[DataSample]:
+        """Build a scene and yield its training samples.
+
+        If cache_train_windows is set in the config and a window manifest
+        exists for the scene (see RVPipelineConfig.get_window_manifest_uri()),
+        the windows in it are read directly, skipping window generation and
+        filtering. Otherwise, samples are generated using get_train_samples()
+        and, once the scene has been fully chipped, the accepted windows are
+        saved to the manifest so that they can be reused by later runs.
+
+        Args:
+            scene_cfg (SceneConfig): Config of the scene to chip.
+            class_cfg (ClassConfig): Class config.
+            split (str): TRAIN or VALIDATION.
+        """
+        scene = scene_cfg.build(class_cfg, self.tmp_dir)
+        if not self.config.cache_train_windows:
+            yield from self.get_train_samples(scene, split)
+            return
+
+        manifest_uri = self.config.get_window_manifest_uri(scene_cfg)
+        if file_exists(manifest_uri, include_dir=False):
+            log.info(f'Reusing training windows from {manifest_uri}')
+            windows = load_window_manifest(manifest_uri, self.tmp_dir)
+            for window in windows:
+                yield self.make_train_sample(window, scene, split)
+            return
+
+        windows = []
+        for sample in self.get_train_samples(scene, split):
+            windows.append(sample.window)
+            yield sample
+        save_window_manifest(windows, manifest_uri, self.tmp_dir)
+
     def chip(self, split_ind: int = 0, num_splits: int = 1):
         """Save training and validation chips."""
         cfg = self.config
@@ -124,29 +242,82 @@ class RVPipeline(Pipeline):
 
         class_cfg = dataset.class_config
         with backend.get_sample_writer() as writer:
-
-            def chip_scene(scene, split):
-                windows = self.get_train_windows(scene)
+            if cfg.chip_num_workers > 0:
+                tasks = [(s, TRAIN) for s in dataset.train_scenes]
+                tasks += [(s, VALIDATION) for s in dataset.validation_scenes]
+                self._chip_in_parallel(tasks, writer, cfg.chip_num_workers)
+                return
+
+            def chip_scene(scene_cfg, split):
+                samples = self.get_scene_train_samples(scene_cfg, class_cfg,
+                                                       split)
                 with tqdm(
-                        windows,
-                        desc=f'Making {split} chips from scene {scene.id}',
+                        samples,
+                        desc=f'Making {split} chips from scene {scene_cfg.id}',
                         mininterval=0.5) as bar:
-                    for window in bar:
-                        chip = scene.raster_source.get_chip(window)
-                        labels = self.get_train_labels(window, scene)
-                        sample = DataSample(
-                            chip=chip,
-                            window=window,
-                            labels=labels,
-                            scene_id=str(scene.id),
-                            is_train=split == TRAIN)
+                    for sample in bar:
                         sample = self.post_process_sample(sample)
                         writer.write_sample(sample)
 
             for s in dataset.train_scenes:
-                chip_scene(s.build(class_cfg, self.tmp_dir), TRAIN)
+                chip_scene(s, TRAIN)
             for s in dataset.validation_scenes:
-                chip_scene(s.build(class_cfg, self.tmp_dir), VALIDATION)
+                chip_scene(s, VALIDATION)
+
+    def _chip_in_parallel(self, tasks: List[Tuple['SceneConfig', str]],
+                          writer: SampleWriter, num_workers: int) -> None:
+        """Chip scenes on worker processes and write samples using writer.
+
+        Each worker builds its own copy of the pipeline and chips one scene at
+        a time. Samples are sent back to this process through a bounded queue
+        and written by the single writer.
+
+        Args:
+            tasks (List[Tuple[SceneConfig, str]]): (scene config, split) pairs.
+            writer (SampleWriter): Writer to write samples with.
+            num_workers (int): Number of worker processes.
+        """
+        num_workers = min(num_workers, len(tasks))
+        if num_workers == 0:
+            return
+
+        task_queue = multiprocessing.Queue()
+        for task in tasks:
+            task_queue.put(task)
+        for _ in range(num_workers):
+            task_queue.put(None)
+        sample_queue = multiprocessing.Queue(
+            maxsize=CHIP_QUEUE_SIZE_PER_WORKER * num_workers)
+
+        workers = [
+            multiprocessing.Process(
+                target=_chip_worker,
+                args=(self.config, self.tmp_dir, task_queue, sample_queue),
+                daemon=True) for _ in range(num_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        num_running = num_workers
+        try:
+            with tqdm(
+                    desc=f'Making chips from {len(tasks)} scenes using '
+                    f'{num_workers} workers',
+                    mininterval=0.5) as bar:
+                while num_running > 0:
+                    sample = sample_queue.get()
+                    if sample is None:
+                        num_running -= 1
+                    elif isinstance(sample, ChipWorkerError):
+                        raise sample
+                    else:
+                        writer.write_sample(sample)
+                        bar.update(1)
+        finally:
+            for worker in workers:
+                if num_running > 0:
+                    worker.terminate()
+                worker.join()
 
     def train(self):
         """Train a model and save it."""
@@ -185,9 +356,13 @@ class RVPipeline(Pipeline):
 
         for scene_config in (dataset.validation_scenes + dataset.test_scenes):
             scene = scene_config.build(class_config, self.tmp_dir)
-            labels = self.predict_scene(scene, self.backend)
-            labels = self.post_process_predictions(labels, scene)
-            scene.label_store.save(labels)
+            self.predict_and_save_scene(scene, self.backend)
+
+    def predict_and_save_scene(self, scene: Scene, backend: Backend) -> None:
+        """Make predictions on a scene and save them to its label store."""
+        labels = self.predict_scene(scene, backend)
+        labels = self.post_process_predictions(labels, scene)
+        scene.label_store.save(labels)
 
     def predict_scene(self, scene: Scene, backend: Backend) -> Labels:
         chip_sz = self.config.predict_chip_sz
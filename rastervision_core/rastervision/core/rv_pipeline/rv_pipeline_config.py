@@ -1,9 +1,12 @@
 from os.path import join
+import hashlib
+import json
 from typing import List, TYPE_CHECKING, Optional
 
 from rastervision.pipeline.pipeline_config import PipelineConfig
 from rastervision.core.data import (DatasetConfig, StatsTransformerConfig,
                                     LabelStoreConfig, SceneConfig)
+from rastervision.core.box import NonNegInt
 from rastervision.core.utils.misc import Proportion
 from rastervision.core.analyzer import StatsAnalyzerConfig
 from rastervision.core.backend import BackendConfig
@@ -53,6 +56,21 @@ class RVPipelineConfig(PipelineConfig):
         'greater than or equal to this value. Might result in false positives '
         'if there are many legitimate black pixels in the chip. Use with '
         'caution.')
+    chip_num_workers: NonNegInt = Field(
+        0,
+        description='Number of worker processes to use for chipping. Each '
+        'worker chips one scene at a time and sends the samples back to a '
+        'single sample writer. If 0, scenes are chipped serially in the main '
+        'process.')
+    cache_train_windows: bool = Field(
+        True,
+        description='If True, the training windows accepted for each scene '
+        'during chipping are saved to a manifest under chip_uri, keyed by the '
+        'scene config and the chip options. Later chip runs with the same '
+        'scene and chip options read the windows from the manifest instead '
+        'of generating and filtering them again. Note that the key is based '
+        'on the config only, so manifests must be deleted if the underlying '
+        'data changes.')
 
     analyze_uri: Optional[str] = Field(
         None,
@@ -108,6 +126,24 @@ class RVPipelineConfig(PipelineConfig):
         for analyzer in self.analyzers:
             analyzer.update(pipeline=self)
 
+    def get_chip_options_dict(self) -> dict:
+        """Return the options that determine which training windows are
+        generated for a scene."""
+        chip_options = getattr(self, 'chip_options', None)
+        return dict(
+            train_chip_sz=self.train_chip_sz,
+            chip_nodata_threshold=self.chip_nodata_threshold,
+            class_config=self.dataset.class_config.dict(),
+            chip_options=(None
+                          if chip_options is None else chip_options.dict()))
+
+    def get_window_manifest_uri(self, scene: SceneConfig) -> str:
+        """Return the URI of the training window manifest of a scene."""
+        key = dict(scene=scene.dict(), **self.get_chip_options_dict())
+        key_str = json.dumps(key, sort_keys=True, default=str)
+        key_hash = hashlib.sha256(key_str.encode()).hexdigest()
+        return join(self.chip_uri, 'windows', f'{scene.id}-{key_hash}.npy')
+
     def get_model_bundle_uri(self):
         return join(self.bundle_uri, 'model-bundle.zip')
 
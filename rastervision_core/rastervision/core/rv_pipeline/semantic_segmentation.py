@@ -1,9 +1,15 @@
-from typing import TYPE_CHECKING, List, Sequence
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+from os.path import join
 import logging
 
 import numpy as np
 
+from rastervision.pipeline.file_system import make_dir
 from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
+from rastervision.core.data import SemanticSegmentationLabels
+from rastervision.core.data_sample import DataSample
+from rastervision.core.rv_pipeline import TRAIN
 from rastervision.core.rv_pipeline.rv_pipeline import RVPipeline
 from rastervision.core.rv_pipeline.utils import (fill_no_data,
                                                  nodata_below_threshold)
@@ -24,61 +30,54 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
-def get_train_windows(scene: 'Scene',
+def get_train_samples(scene: 'Scene',
                       class_config: 'ClassConfig',
                       chip_size: int,
                       chip_options: 'SemanticSegmentationChipOptions',
-                      chip_nodata_threshold: float = 1.) -> List[Box]:
-    """Get training windows covering a scene.
+                      chip_nodata_threshold: float = 1.
+                      ) -> Iterator[Tuple[Box, np.ndarray, np.ndarray]]:
+    """Yield training windows along with their chips and label arrays.
+
+    The imagery and labels of each candidate window are read only once and
+    the window filters are evaluated on the in-memory arrays, so that the
+    accepted samples can be written without reading the windows again.
+
+    Windows are rejected if they
+    (1) are outside the AOI
+    (2) only consist of null labels
+    (3) have NODATA proportion >= chip_nodata_threshold
 
     Args:
         scene: The scene over-which windows are to be generated.
 
-    Returns:
-        A list of windows, list(Box)
+    Yields:
+        (window, chip, label_arr) tuples.
     """
     co = chip_options
     raster_source = scene.raster_source
     extent = raster_source.extent
     label_source: 'SemanticSegmentationLabelSource' = scene.label_source
+    null_class_id = class_config.null_class_id
 
-    def filter_windows(windows: Sequence[Box]) -> List[Box]:
-        """Filter out chips that
-        (1) are outside the AOI
-        (2) only consist of null labels
-        (3) have NODATA proportion >= chip_nodata_threshold
-        """
-        total_windows = len(windows)
-        if scene.aoi_polygons:
-            windows = Box.filter_by_aoi(windows, scene.aoi_polygons)
-            log.info(f'AOI filtering: {len(windows)}/{total_windows} '
-                     'chips accepted')
-
-        filt_windows = []
-        for w in windows:
-            chip = raster_source.get_chip(w)
-            nodata_below_thresh = nodata_below_threshold(
-                chip, chip_nodata_threshold, nodata_val=0)
-
-            label_arr = label_source.get_labels(w).get_label_arr(w)
-            null_labels = label_arr == class_config.null_class_id
+    def read_window(window: Box) -> Tuple[Box, np.ndarray, np.ndarray]:
+        chip = raster_source.get_chip(window)
+        label_arr = label_source.get_label_arr(window)
+        return window, chip, label_arr
 
-            if not np.all(null_labels) and nodata_below_thresh:
-                filt_windows.append(w)
-        log.info('Label and NODATA filtering: '
-                 f'{len(filt_windows)}/{len(windows)} chips accepted')
-
-        windows = filt_windows
-        return windows
+    def is_valid(chip: np.ndarray, label_arr: np.ndarray) -> bool:
+        nodata_below_thresh = nodata_below_threshold(
+            chip, chip_nodata_threshold, nodata_val=0)
+        null_labels = label_arr == null_class_id
+        return not np.all(null_labels) and nodata_below_thresh
 
-    def should_use_window(window: Box) -> bool:
+    def should_use_window(label_arr: np.ndarray) -> bool:
         if co.negative_survival_prob >= 1.0:
             return True
         else:
             is_positive = False
             if co.target_class_ids is not None:
-                is_positive = label_source.enough_target_pixels(
-                    window, co.target_count_threshold, co.target_class_ids)
+                target_count = np.isin(label_arr, co.target_class_ids).sum()
+                is_positive = target_count >= co.target_count_threshold
             if is_positive:
                 return True
             keep_negative = np.random.sample() < co.negative_survival_prob
@@ -86,34 +85,84 @@ def get_train_windows(scene: 'Scene',
 
     if co.window_method == SemanticSegmentationWindowMethod.sliding:
         stride = co.stride or int(round(chip_size / 2))
-        unfiltered_windows = extent.get_windows(chip_size, stride)
-        windows = list(filter_windows(unfiltered_windows))
-        if len(windows) > 0:
-            a_window = windows[0]
-            windows = list(filter(should_use_window, windows))
-            if len(windows) == 0:
-                windows = [a_window]
-        elif len(windows) == 0:
-            return [unfiltered_windows[0]]
+        unfiltered_windows = BoxArray.get_windows(extent, chip_size, stride)
+        windows = unfiltered_windows
+        if scene.aoi_polygons:
+            windows = windows.filter_by_aoi(scene.aoi_polygons)
+            log.info(f'AOI filtering: {len(windows)}/'
+                     f'{len(unfiltered_windows)} chips accepted')
+
+        num_valid, num_used = 0, 0
+        first_valid_sample = None
+        for window in windows:
+            sample = read_window(window)
+            _, chip, label_arr = sample
+            if not is_valid(chip, label_arr):
+                continue
+            num_valid += 1
+            if first_valid_sample is None:
+                first_valid_sample = sample
+            if should_use_window(label_arr):
+                num_used += 1
+                yield sample
+        log.info('Label and NODATA filtering: '
+                 f'{num_valid}/{len(windows)} chips accepted')
+
+        # Ensure there is at least one window per scene.
+        if num_used == 0:
+            if first_valid_sample is not None:
+                yield first_valid_sample
+            else:
+                yield read_window(unfiltered_windows[0])
     elif co.window_method == SemanticSegmentationWindowMethod.random_sample:
-        windows = []
         attempts = 0
+        num_used = 0
 
         while attempts < co.chips_per_scene:
             window = extent.make_random_square(chip_size)
-            if not filter_windows([window]):
+            if scene.aoi_polygons and not Box.within_aoi(
+                    window, scene.aoi_polygons):
+                continue
+            sample = read_window(window)
+            _, chip, label_arr = sample
+            if not is_valid(chip, label_arr):
                 continue
 
             attempts += 1
             if co.negative_survival_prob >= 1.0:
-                windows.append(window)
-            elif attempts == co.chips_per_scene and len(windows) == 0:
+                use_window = True
+            elif attempts == co.chips_per_scene and num_used == 0:
                 # Ensure there is at least one window per scene.
-                windows.append(window)
-            elif should_use_window(window):
-                windows.append(window)
+                use_window = True
+            else:
+                use_window = should_use_window(label_arr)
+            if use_window:
+                num_used += 1
+                yield sample
+
+
+def get_train_windows(scene: 'Scene',
+                      class_config: 'ClassConfig',
+                      chip_size: int,
+                      chip_options: 'SemanticSegmentationChipOptions',
+                      chip_nodata_threshold: float = 1.) -> List[Box]:
+    """Get training windows covering a scene.
+
+    See get_train_samples() for details on how windows are filtered.
 
-    return windows
+    Args:
+        scene: The scene over-which windows are to be generated.
+
+    Returns:
+        A list of windows, list(Box)
+    """
+    samples = get_train_samples(
+        scene,
+        class_config,
+        chip_size,
+        chip_options,
+        chip_nodata_threshold=chip_nodata_threshold)
+    return [window for window, _, _ in samples]
 
 
 class SemanticSegmentation(RVPipeline):
@@ -132,6 +181,27 @@ class SemanticSegmentation(RVPipeline):
     def get_train_labels(self, window, scene):
         return scene.label_source.get_labels(window=window)
 
+    def get_train_samples(self, scene: 'Scene',
+                          split: str) -> Iterator[DataSample]:
+        """Yield training samples, reading each window only once."""
+        class_config = self.config.dataset.class_config
+        samples = get_train_samples(
+            scene,
+            class_config,
+            self.config.train_chip_sz,
+            self.config.chip_options,
+            chip_nodata_threshold=self.config.chip_nodata_threshold)
+        for window, chip, label_arr in samples:
+            labels = SemanticSegmentationLabels.make_empty(
+                extent=window, num_classes=len(class_config), smooth=False)
+            labels[window] = label_arr
+            yield DataSample(
+                chip=chip,
+                window=window,
+                labels=labels,
+                scene_id=str(scene.id),
+                is_train=split == TRAIN)
+
     def post_process_sample(self, sample):
         # Use null label for each pixel with NODATA.
         img = sample.chip
@@ -149,7 +219,8 @@ class SemanticSegmentation(RVPipeline):
 
         return labels
 
-    def predict_scene(self, scene: 'Scene', backend: 'Backend') -> 'Labels':
+    def _get_predict_window_params(self) -> Tuple[int, int, Optional[int]]:
+        """Get chip_sz, stride, and crop_sz for prediction."""
         cfg: 'SemanticSegmentationConfig' = self.config
         chip_sz = cfg.predict_chip_sz
         stride = cfg.predict_options.stride
@@ -167,5 +238,32 @@ class SemanticSegmentation(RVPipeline):
                     'still overlap after cropping.')
             crop_sz = overlap_sz // 2
 
-        return backend.predict_scene(
+        return chip_sz, stride, crop_sz
+
+    def predict_and_save_scene(self, scene: 'Scene',
+                               backend: 'Backend') -> None:
+        cfg: 'SemanticSegmentationConfig' = self.config
+        if not cfg.predict_options.save_streaming:
+            return super().predict_and_save_scene(scene, backend)
+
+        chip_sz, stride, crop_sz = self._get_predict_window_params()
+        backend.predict_scene_streaming(
             scene, chip_sz=chip_sz, stride=stride, crop_sz=crop_sz)
+
+    def predict_scene(self, scene: 'Scene', backend: 'Backend') -> 'Labels':
+        cfg: 'SemanticSegmentationConfig' = self.config
+        chip_sz, stride, crop_sz = self._get_predict_window_params()
+
+        label_tile_sz = cfg.predict_options.label_tile_sz
+        label_spill_dir = None
+        if label_tile_sz is not None and cfg.predict_options.label_spill_to_disk:
+            label_spill_dir = join(self.tmp_dir, 'label-tiles', str(scene.id))
+            make_dir(label_spill_dir)
+
+        return backend.predict_scene(
+            scene,
+            chip_sz=chip_sz,
+            stride=stride,
+            crop_sz=crop_sz,
+            label_tile_sz=label_tile_sz,
+            label_spill_dir=label_spill_dir)
@@ -88,6 +88,29 @@ class SemanticSegmentationPredictOptions(PredictOptions):
         'tend to be lower quality and can result in very visible artifacts '
         'near the edges of chips. If "auto", will be set to half the stride '
         'if stride is less than chip_sz. Defaults to None.')
+    label_tile_sz: Optional[conint(gt=0)] = Field(
+        None,
+        description=
+        'If specified, predictions are accumulated in tiled labels that only '
+        'allocate memory for tiles (of this size) that are covered by '
+        'prediction windows, rather than in arrays covering the full scene '
+        'extent. Useful for very large scenes. Defaults to None.')
+    label_spill_to_disk: bool = Field(
+        False,
+        description=
+        'If True, and label_tile_sz is specified, the tiles are stored in '
+        'memory-mapped files in the temporary directory rather than in RAM. '
+        'Defaults to False.')
+    save_streaming: bool = Field(
+        False,
+        description=
+        'If True, predictions are written to the label store block by block '
+        'as soon as all prediction windows covering a block have been '
+        'processed, instead of first being accumulated for the whole scene. '
+        'Memory usage is then proportional to one row of output blocks, which '
+        'allows predicting on scenes larger than RAM. Vector outputs are '
+        'produced strip by strip. Cannot be used to merge with existing '
+        'scores. Defaults to False.')
 
     @validator('crop_sz')
     def validate_crop_sz(cls,
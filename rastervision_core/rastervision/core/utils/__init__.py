@@ -2,3 +2,4 @@
 
 from rastervision.core.utils.stac import *
 from rastervision.core.utils.misc import *
+from rastervision.core.utils.pipelining import *
@@ -0,0 +1,193 @@
+from typing import Any, Callable, Iterable, Iterator, Optional
+from contextlib import contextmanager
+from queue import Queue
+from threading import Event, Thread
+import logging
+import time
+
+__all__ = ['StageStats', 'prefetch', 'BackgroundConsumer']
+
+log = logging.getLogger(__name__)
+
+# sentinel put in queues to signal that there are no more items
+_DONE = object()
+
+
+class StageStats():
+    """Running count of items processed and time spent in a pipeline stage.
+    """
+
+    def __init__(self, name: str):
+        """Constructor.
+
+        Args:
+            name (str): Name of the stage. Used in log messages.
+        """
+        self.name = name
+        self.num_items = 0
+        self.seconds = 0.
+
+    @contextmanager
+    def timer(self, num_items: int = 1):
+        """Context manager that adds the time spent in it to this stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.num_items += num_items
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second of time spent in this stage."""
+        if self.seconds == 0:
+            return 0.
+        return self.num_items / self.seconds
+
+    def __repr__(self) -> str:
+        return (f'{self.name}: {self.num_items} items in {self.seconds:.2f}s '
+                f'({self.throughput:.1f} items/s)')
+
+
+def prefetch(iterable: Iterable,
+             buffer_size: int = 2,
+             stats: Optional[StageStats] = None,
+             num_items_fn: Callable[[Any], int] = lambda _: 1) -> Iterator:
+    """Iterate over an iterable in a background thread.
+
+    Items are produced into a bounded queue of size buffer_size, so that
+    producing the next items overlaps with consuming the current one. Errors
+    raised while producing are re-raised in the consuming thread.
+
+    Args:
+        iterable (Iterable): The iterable to consume in the background.
+        buffer_size (int): Max number of items to produce ahead of the
+            consumer. Defaults to 2.
+        stats (Optional[StageStats]): If specified, the time spent producing
+            each item is added to it. Defaults to None.
+        num_items_fn (Callable[[Any], int]): Function returning the number of
+            items an element counts as in stats, e.g. the batch size.
+            Defaults to counting each element as 1.
+
+    Yields:
+        The elements of the iterable, in order.
+    """
+    queue = Queue(maxsize=buffer_size)
+    stop = Event()
+
+    def produce():
+        try:
+            it = iter(iterable)
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                if stats is not None:
+                    stats.seconds += time.perf_counter() - start
+                    stats.num_items += num_items_fn(item)
+                queue.put((item, None))
+        except Exception as e:
+            queue.put((None, e))
+        queue.put((_DONE, None))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, err = queue.get()
+            if err is not None:
+                raise err
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        # if the consumer stopped early, unblock and stop the producer
+        stop.set()
+        while thread.is_alive():
+            while not queue.empty():
+                queue.get_nowait()
+            thread.join(timeout=0.01)
+
+
+class BackgroundConsumer():
+    """Apply a function to items in a background thread.
+
+    Items passed to put() are added to a bounded queue and processed, in
+    order, by a worker thread. put() blocks if the queue is full so that
+    memory usage stays bounded when the consumer is the slowest stage.
+
+    Use as a context manager or call close() to wait for all items to be
+    processed. Errors raised by the function are re-raised by put() or
+    close().
+    """
+
+    def __init__(self,
+                 fn: Callable[[Any], None],
+                 buffer_size: int = 2,
+                 stats: Optional[StageStats] = None,
+                 num_items_fn: Callable[[Any], int] = lambda _: 1):
+        """Constructor.
+
+        Args:
+            fn (Callable[[Any], None]): Function to apply to each item.
+            buffer_size (int): Max number of items waiting to be processed.
+                Defaults to 2.
+            stats (Optional[StageStats]): If specified, the time spent in fn
+                is added to it. Defaults to None.
+            num_items_fn (Callable[[Any], int]): Function returning the number
+                of items an element counts as in stats. Defaults to counting
+                each element as 1.
+        """
+        self.fn = fn
+        self.stats = stats
+        self.num_items_fn = num_items_fn
+        self._queue = Queue(maxsize=buffer_size)
+        self._error: Optional[Exception] = None
+        self._thread = Thread(target=self._consume, daemon=True)
+        self._thread.start()
+
+    def _consume(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is not None:
+                # drain the queue so that put() does not block forever
+                continue
+            try:
+                if self.stats is not None:
+                    with self.stats.timer(self.num_items_fn(item)):
+                        self.fn(item)
+                else:
+                    self.fn(item)
+            except Exception as e:
+                self._error = e
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def put(self, item: Any) -> None:
+        """Queue an item for processing."""
+        self._raise_if_failed()
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """Wait for all queued items to be processed."""
+        if self._thread.is_alive():
+            self._queue.put(_DONE)
+            self._thread.join()
+        self._raise_if_failed()
+
+    def __enter__(self) -> 'BackgroundConsumer':
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        if type is None:
+            self.close()
+        elif self._thread.is_alive():
+            # don't mask the original error; just stop the worker
+            self._queue.put(_DONE)
+            self._thread.join()
@@ -3,6 +3,7 @@
 from rastervision.pipeline.file_system.file_system import *
 from rastervision.pipeline.file_system.local_file_system import *
 from rastervision.pipeline.file_system.http_file_system import *
+from rastervision.pipeline.file_system.download_cache import *
 from rastervision.pipeline.file_system.utils import *
 
 __all__ = [
@@ -0,0 +1,233 @@
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import hashlib
+import logging
+import os
+import shutil
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # file locking is only available on POSIX systems
+    fcntl = None
+
+if TYPE_CHECKING:
+    from rastervision.pipeline.file_system import FileSystem
+
+__all__ = ['DownloadCache', 'get_download_cache']
+
+log = logging.getLogger(__name__)
+
+# name of the subdirectory of the RV cache dir used by the download cache
+DOWNLOAD_CACHE_DIRNAME = 'downloads'
+# default max size of the download cache, in GB
+DEFAULT_DOWNLOAD_CACHE_SIZE = 100.
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive lock on a file for the duration of the context.
+
+    Yields True if the lock was acquired. Only yields False if blocking is
+    False and the lock is held by someone else.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield True
+        return
+    with open(path, 'a') as f:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(f, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _get_dir_size(path: str) -> int:
+    size = 0
+    for root, _, fnames in os.walk(path):
+        for fname in fnames:
+            try:
+                size += os.path.getsize(os.path.join(root, fname))
+            except OSError:
+                pass
+    return size
+
+
+class DownloadCache():
+    """A persistent, content-addressed cache of downloaded files.
+
+    Each file is stored in a directory whose name is a hash of its URI and
+    its version (i.e. its last modified time, if the FileSystem supports
+    it), so a file that changes remotely is downloaded again rather than
+    silently reused. Downloads are guarded by a per-entry file lock so that
+    concurrent processes (e.g. parallel splits of a command) download each
+    file only once. Once the total size of the cache exceeds max_bytes, the
+    least recently used entries are deleted.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None):
+        """Constructor.
+
+        Args:
+            cache_dir (str): Local directory to store the cached files in.
+            max_bytes (Optional[int]): Maximum total size, in bytes, of the
+                cached files. If None, the cache is never pruned. Defaults to
+                None.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def get_key(uri: str, version: Optional[str] = None) -> str:
+        """Return the cache key for a given URI and version."""
+        key_str = uri if version is None else f'{uri}@{version}'
+        return hashlib.sha256(key_str.encode()).hexdigest()
+
+    @staticmethod
+    def get_version(uri: str, fs: 'FileSystem') -> Optional[str]:
+        """Return a string identifying the current version of the file.
+
+        Returns None if the FileSystem cannot tell when the file was last
+        modified or if the lookup fails.
+        """
+        try:
+            last_modified = fs.last_modified(uri)
+        except Exception:
+            return None
+        if last_modified is None:
+            return None
+        return last_modified.isoformat()
+
+    def get_entry_path(self, uri: str, version: Optional[str] = None) -> str:
+        """Return the path the file would be stored at in the cache.
+
+        The file name is preserved so that tools which infer the format from
+        the extension (e.g. GDAL) keep working.
+        """
+        fname = os.path.basename(urlparse(uri).path) or 'file'
+        entry_dir = os.path.join(self.cache_dir, self.get_key(uri, version))
+        return os.path.join(entry_dir, fname)
+
+    def get(self, uri: str, fs: 'FileSystem', use_cache: bool = True) -> str:
+        """Return a local path to the file, downloading it if needed.
+
+        Args:
+            uri (str): URI of the remote file.
+            fs (FileSystem): FileSystem to use to read the file.
+            use_cache (bool): If False, download the file even if it is
+                already in the cache. Defaults to True.
+
+        Returns:
+            str: Path to the local copy of the file.
+        """
+        version = self.get_version(uri, fs)
+        local_path = self.get_entry_path(uri, version)
+        entry_dir = os.path.dirname(local_path)
+
+        with _file_lock(entry_dir + '.lock'):
+            if use_cache and os.path.isfile(local_path):
+                log.info(f'Using cached file {local_path}.')
+                # mark as recently used
+                os.utime(entry_dir)
+                return local_path
+
+            log.info(f'Downloading {uri} to {local_path}...')
+            os.makedirs(entry_dir, exist_ok=True)
+            # download to a temporary path first so that an interrupted
+            # download never leaves a partial file in the cache
+            part_path = os.path.join(entry_dir,
+                                     f'.{os.path.basename(local_path)}.part')
+            try:
+                fs.copy_from(uri, part_path)
+                os.replace(part_path, local_path)
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            os.utime(entry_dir)
+
+        if self.max_bytes is not None:
+            self.prune(keep=[entry_dir])
+        return local_path
+
+    def get_entries(self) -> List[Tuple[str, float, int]]:
+        """Return (entry_dir, last_used_time, size_in_bytes) for each entry.
+
+        The entries are sorted from least to most recently used.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if not e.is_dir():
+                    continue
+                try:
+                    mtime = e.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                entries.append((e.path, mtime, _get_dir_size(e.path)))
+        entries.sort(key=lambda e: e[1])
+        return entries
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached files, in bytes."""
+        return sum(size for _, _, size in self.get_entries())
+
+    def prune(self, max_bytes: Optional[int] = None,
+              keep: Iterable[str] = ()) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        Entries that are currently locked (i.e. being downloaded) and the
+        entry dirs in keep are never deleted.
+
+        Args:
+            max_bytes (Optional[int]): Target size. If None, self.max_bytes
+                is used. Defaults to None.
+            keep (Iterable[str]): Entry dirs that must not be deleted.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        if max_bytes is None:
+            return
+        keep = set(keep)
+        with _file_lock(os.path.join(self.cache_dir, '.prune.lock')):
+            entries = self.get_entries()
+            total = sum(size for _, _, size in entries)
+            for entry_dir, _, size in entries:
+                if total <= max_bytes:
+                    break
+                if entry_dir in keep:
+                    continue
+                with _file_lock(entry_dir + '.lock', blocking=False) as ok:
+                    if not ok:
+                        continue
+                    log.debug(f'Evicting {entry_dir} from download cache.')
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
+
+    def clear(self) -> None:
+        """Delete all entries that are not currently locked."""
+        self.prune(max_bytes=0)
+
+
+def get_download_cache() -> DownloadCache:
+    """Return the DownloadCache under the cache dir defined by RVConfig.
+
+    The max size of the cache, in GB, can be set via the
+    RV_DOWNLOAD_CACHE_SIZE env var or the download_cache_size key in the rv
+    section of the RV config file. A value <= 0 disables eviction.
+    """
+    from rastervision.pipeline import rv_config
+    cache_dir = os.path.join(rv_config.get_cache_dir(), DOWNLOAD_CACHE_DIRNAME)
+    max_size = rv_config.get_namespace_config('rv')(
+        'download_cache_size',
+        default=str(DEFAULT_DOWNLOAD_CACHE_SIZE),
+        parser=float)
+    max_bytes = int(max_size * 1e9) if max_size > 0 else None
+    return DownloadCache(cache_dir, max_bytes=max_bytes)
@@ -12,6 +12,8 @@ from rastervision.pipeline import rv_config
 from rastervision.pipeline.file_system import FileSystem
 from rastervision.pipeline.file_system.local_file_system import (
     LocalFileSystem, make_dir)
+from rastervision.pipeline.file_system.download_cache import (
+    get_download_cache)
 
 log = logging.getLogger(__name__)
 
@@ -138,8 +140,9 @@ def download_if_needed(uri: str,
     Args:
         uri (str): URI of file to download.
         download_dir (Optional[str], optional): Local directory to download
-            file into. If None, the file will be downloaded to
-            cache dir as defined by RVConfig. Defaults to None.
+            file into. If None, the file will be downloaded to the
+            persistent download cache (see DownloadCache) in the cache dir
+            as defined by RVConfig. Defaults to None.
         fs (Optional[FileSystem], optional): If provided, use fs instead of
             the automatically chosen FileSystem for uri. Defaults to None.
         use_cache (bool, optional): If False and the file is remote, download
@@ -151,12 +154,14 @@ def download_if_needed(uri: str,
     Raises:
         NotReadableError if URI cannot be read from
     """
-    if download_dir is None:
-        download_dir = rv_config.get_cache_dir()
-
     if not fs:
         fs = FileSystem.get_file_system(uri, 'r')
 
+    if download_dir is None:
+        if fs.local_path(uri, '') == uri:
+            return uri
+        return get_download_cache().get(uri, fs, use_cache=use_cache)
+
     local_path = get_local_path(uri, download_dir, fs=fs)
     if local_path == uri:
         return local_path
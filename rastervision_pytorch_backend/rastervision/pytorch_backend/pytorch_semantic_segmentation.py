@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Iterator, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 from os.path import join
 import uuid
 
@@ -12,6 +12,7 @@ from rastervision.pytorch_learner.dataset import (
 from rastervision.core.data import SemanticSegmentationLabels
 
 if TYPE_CHECKING:
+    from rastervision.core.box import Box
     from rastervision.core.data_sample import DataSample
     from rastervision.core.data import (Scene, SemanticSegmentationLabelStore)
 
@@ -54,13 +55,51 @@ class PyTorchSemanticSegmentation(PyTorchLearnerBackend):
         return PyTorchSemanticSegmentationSampleWriter(
             output_uri, self.pipeline_cfg.dataset.class_config, self.tmp_dir)
 
-    def predict_scene(
-            self,
-            scene: 'Scene',
-            chip_sz: int,
-            stride: Optional[int] = None,
-            crop_sz: Optional[int] = None) -> 'SemanticSegmentationLabels':
+    def predict_scene(self,
+                      scene: 'Scene',
+                      chip_sz: int,
+                      stride: Optional[int] = None,
+                      crop_sz: Optional[int] = None,
+                      label_tile_sz: Optional[int] = None,
+                      label_spill_dir: Optional[str] = None
+                      ) -> 'SemanticSegmentationLabels':
+        windows, predictions = self._predict_windows(scene, chip_sz, stride,
+                                                     crop_sz)
+        label_store: 'SemanticSegmentationLabelStore' = scene.label_store
+        labels = SemanticSegmentationLabels.from_predictions(
+            windows,
+            predictions,
+            smooth=label_store.smooth_output,
+            extent=label_store.extent,
+            num_classes=len(label_store.class_config),
+            crop_sz=crop_sz,
+            tile_size=label_tile_sz,
+            spill_dir=label_spill_dir,
+            accumulate_in_background=True)
+
+        return labels
 
+    def predict_scene_streaming(self,
+                                scene: 'Scene',
+                                chip_sz: int,
+                                stride: Optional[int] = None,
+                                crop_sz: Optional[int] = None) -> None:
+        """Make predictions on a scene and write them directly to its label
+        store block by block. See SemanticSegmentationLabelStore.save_streaming().
+        """
+        windows, predictions = self._predict_windows(scene, chip_sz, stride,
+                                                     crop_sz)
+        label_store: 'SemanticSegmentationLabelStore' = scene.label_store
+        label_store.save_streaming(windows, predictions, crop_sz=crop_sz)
+
+    def _predict_windows(self,
+                         scene: 'Scene',
+                         chip_sz: int,
+                         stride: Optional[int] = None,
+                         crop_sz: Optional[int] = None
+                         ) -> Tuple[List['Box'], Iterator[np.ndarray]]:
+        """Get sliding windows over the scene and an iterator over the
+        model's predictions for each window."""
         if scene.label_store is None:
             raise ValueError(
                 f'Scene.label_store is not set for scene {scene.id}')
@@ -94,12 +133,4 @@ class PyTorchSemanticSegmentation(PyTorchLearnerBackend):
             progress_bar=True,
             progress_bar_kw=dict(desc=f'Making predictions on {scene.id}'))
 
-        labels = SemanticSegmentationLabels.from_predictions(
-            ds.windows,
-            predictions,
-            smooth=raw_out,
-            extent=label_store.extent,
-            num_classes=len(label_store.class_config),
-            crop_sz=crop_sz)
-
-        return labels
+        return ds.windows, predictions
@@ -8,6 +8,7 @@ import torch
 from torch.utils.data import Dataset
 
 from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
 from rastervision.core.data import Scene
 from rastervision.pytorch_learner.learner_config import PosInt, NonNegInt
 from rastervision.pytorch_learner.dataset.transform import (TransformType,
@@ -79,6 +80,7 @@ class ImageDataset(AlbumentationsDataset):
     """ Dataset that reads from image files. """
     pass
 
+
 class CustomImageDataset(ImageDataset):
     ...
 
@@ -177,14 +179,19 @@ class SlidingWindowGeoDataset(GeoDataset):
         self.init_windows()
 
     def init_windows(self) -> None:
-        """Pre-compute windows."""
-        windows = self.scene.raster_source.extent.get_windows(
+        """Pre-compute windows.
+
+        The windows are stored as a BoxArray, so that scenes with a very large
+        number of windows do not need one Box object per window.
+        """
+        windows = BoxArray.get_windows(
+            self.scene.raster_source.extent,
             self.size,
             stride=self.stride,
             padding=self.padding,
             pad_direction=self.pad_direction)
         if len(self.scene.aoi_polygons) > 0:
-            windows = Box.filter_by_aoi(windows, self.scene.aoi_polygons)
+            windows = windows.filter_by_aoi(self.scene.aoi_polygons)
         self.windows = windows
 
     def __getitem__(self, idx: int):
@@ -403,6 +410,7 @@ class RandomWindowGeoDataset(GeoDataset):
     def __len__(self):
         return self.max_windows
 
+
 class FullImageWindowGeoDataset(GeoDataset):
     """
     Using the whole scene as the dataset
@@ -438,8 +446,7 @@ class FullImageWindowGeoDataset(GeoDataset):
         # include padding in the extent
         self.return_window = None
         ymin, xmin, ymax, xmax = scene.raster_source.extent
-        self.extent = Box(ymin, xmin , ymax, xmax)
-
+        self.extent = Box(ymin, xmin, ymax, xmax)
 
     # We only have one sample window
     def get_resize_transform(
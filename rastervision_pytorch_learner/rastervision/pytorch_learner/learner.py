@@ -31,6 +31,7 @@ from rastervision.pipeline.file_system.utils import file_exists
 from rastervision.pipeline.utils import terminate_at_exit
 from rastervision.pipeline.config import (build_config, upgrade_config,
                                           save_pipeline_config)
+from rastervision.core.utils import StageStats, prefetch
 from rastervision.pytorch_learner.utils import (get_hubconf_dir_from_cfg)
 from rastervision.pytorch_learner.dataset.visualizer import Visualizer
 
@@ -208,6 +209,14 @@ class Learner(ABC):
         self.setup_model(
             model_weights_path=model_weights_path,
             model_def_path=model_def_path)
+        if cfg.solver.channels_last:
+            self.model.to(memory_format=torch.channels_last)
+
+        # only needed for float16; bfloat16 has the same range as float32
+        use_grad_scaler = (
+            cfg.solver.amp and self.device.type == 'cuda'
+            and cfg.solver.get_amp_dtype('cuda') == torch.float16)
+        self.grad_scaler = torch.cuda.amp.GradScaler(enabled=use_grad_scaler)
 
         if training:
             self.setup_training(loss_def_path=loss_def_path)
@@ -765,7 +774,8 @@ class Learner(ABC):
             dl,
             raw_out=raw_out,
             batched_output=batched_output,
-            predict_kw=predict_kw)
+            predict_kw=predict_kw,
+            return_x=(return_format == 'xyz'))
 
         if return_format == 'yz':
             preds = ((y, z) for _, y, z in preds)
@@ -779,9 +789,16 @@ class Learner(ABC):
             dl: DataLoader,
             raw_out: bool = True,
             batched_output: bool = True,
-            predict_kw: dict = {}) -> Iterator[Tuple[Tensor, Any, Any]]:
+            predict_kw: dict = {},
+            return_x: bool = True,
+            prefetch_batches: int = 2) -> Iterator[Tuple[Tensor, Any, Any]]:
         """Returns an iterator over predictions on the given dataloader.
 
+        Batches are read from the dataloader in a background thread, so that
+        reading the next batches overlaps with running the model on the
+        current one. The throughput of the read and forward stages is logged
+        once the iterator is exhausted.
+
         Args:
             dl (DataLoader): The dataloader to make predictions on.
             batched_output (bool, optional): If True, return batches of
@@ -792,6 +809,12 @@ class Learner(ABC):
             predict_kw (dict): Dict with keywords passed to Learner.predict().
                 Useful if a Learner subclass implements a custom predict()
                 method.
+            return_x (bool, optional): If False, x is not copied back from
+                the device and None is returned in its place. Defaults to
+                True.
+            prefetch_batches (int, optional): Number of batches to read ahead
+                of the model in a background thread. If 0, batches are read
+                in the calling thread. Defaults to 2.
 
         Raises:
             ValueError: If return_format is not one of the allowed values.
@@ -803,18 +826,39 @@ class Learner(ABC):
         """
         self.model.eval()
 
-        for x, y in dl:
-            x = self.to_device(x, self.device)
-            z = self.predict(x, raw_out=raw_out, **predict_kw)
-            x = self.to_device(x, 'cpu')
-            y = self.to_device(y, 'cpu') if y is not None else y
-            z = self.to_device(z, 'cpu')
+        read_stats = StageStats('read')
+        forward_stats = StageStats('forward')
+        if prefetch_batches > 0:
+            batches = prefetch(
+                dl,
+                buffer_size=prefetch_batches,
+                stats=read_stats,
+                num_items_fn=lambda batch: len(batch[0]))
+        else:
+            batches = dl
+
+        for x, y in batches:
+            batch_sz = len(x)
+            with forward_stats.timer(batch_sz):
+                x = self.to_device(x, self.device)
+                z = self.predict(x, raw_out=raw_out, **predict_kw)
+                x = self.to_device(x, 'cpu') if return_x else None
+                y = self.to_device(y, 'cpu') if y is not None else y
+                z = self.to_device(z, 'cpu')
             if batched_output:
                 yield x, y, z
             else:
-                for _x, _y, _z in zip(x, y, z):
+                xs = x if x is not None else [None] * batch_sz
+                ys = y if y is not None else [None] * batch_sz
+                for _x, _y, _z in zip(xs, ys, z):
                     yield _x, _y, _z
 
+        if prefetch_batches > 0:
+            log.info('Prediction throughput: %s; %s', read_stats,
+                     forward_stats)
+        else:
+            log.info('Prediction throughput: %s', forward_stats)
+
     def get_dataloader(self, split: str) -> DataLoader:
         """Get the DataLoader for a split.
 
@@ -1063,31 +1107,69 @@ class Learner(ABC):
         else:
             return x.to(device)
 
+    def autocast(self) -> torch.autocast:
+        """Return a context manager for running the forward pass.
+
+        This enables mixed precision via torch.autocast if cfg.solver.amp is
+        True and is a no-op otherwise.
+        """
+        solver_cfg = self.cfg.solver
+        return torch.autocast(
+            device_type=self.device.type,
+            dtype=solver_cfg.get_amp_dtype(self.device.type),
+            enabled=solver_cfg.amp)
+
+    def to_memory_format(self, x: Any) -> Any:
+        """Convert batches of images to channels_last if configured to."""
+        if (self.cfg.solver.channels_last and isinstance(x, Tensor)
+                and x.ndim == 4):
+            return x.contiguous(memory_format=torch.channels_last)
+        return x
+
+    def optimizer_step(self, optimizer: 'Optimizer') -> None:
+        """Take an optimizer step using the accumulated gradients."""
+        self.grad_scaler.step(optimizer)
+        self.grad_scaler.update()
+        optimizer.zero_grad()
+
     def train_epoch(
             self,
             optimizer: 'Optimizer',
             step_scheduler: Optional['_LRScheduler'] = None) -> MetricDict:
-        """Train for a single epoch."""
+        """Train for a single epoch.
+
+        If cfg.solver.grad_accumulation_steps > 1, gradients are accumulated
+        over that many batches before each optimizer and step_scheduler step.
+        """
         start = time.time()
         self.model.train()
         num_samples = 0
         outputs = []
+        accum_steps = self.cfg.solver.grad_accumulation_steps
+        optimizer.zero_grad()
         with tqdm(self.train_dl, desc='Training') as bar:
             for batch_ind, (x, y) in enumerate(bar):
-                x = self.to_device(x, self.device)
+                x = self.to_memory_format(self.to_device(x, self.device))
                 y = self.to_device(y, self.device)
                 batch = (x, y)
-                optimizer.zero_grad()
-                output = self.train_step(batch, batch_ind)
-                output['train_loss'].backward()
-                optimizer.step()
+                with self.autocast():
+                    output = self.train_step(batch, batch_ind)
+                loss = output['train_loss'] / accum_steps
+                self.grad_scaler.scale(loss).backward()
+                if (batch_ind + 1) % accum_steps == 0:
+                    self.optimizer_step(optimizer)
+                    if step_scheduler is not None:
+                        step_scheduler.step()
                 # detach tensors in the output, if any, to avoid memory leaks
                 for k, v in output.items():
                     output[k] = v.detach() if isinstance(v, Tensor) else v
                 outputs.append(output)
-                if step_scheduler is not None:
-                    step_scheduler.step()
                 num_samples += x.shape[0]
+        if len(outputs) % accum_steps != 0:
+            # use the gradients accumulated from the leftover batches
+            self.optimizer_step(optimizer)
+            if step_scheduler is not None:
+                step_scheduler.step()
         metrics = self.train_end(outputs, num_samples)
         end = time.time()
         train_time = datetime.timedelta(seconds=end - start)
@@ -1103,10 +1185,11 @@ class Learner(ABC):
         with torch.inference_mode():
             with tqdm(dl, desc='Validating') as bar:
                 for batch_ind, (x, y) in enumerate(bar):
-                    x = self.to_device(x, self.device)
+                    x = self.to_memory_format(self.to_device(x, self.device))
                     y = self.to_device(y, self.device)
                     batch = (x, y)
-                    output = self.validate_step(batch, batch_ind)
+                    with self.autocast():
+                        output = self.validate_step(batch, batch_ind)
                     outputs.append(output)
                     num_samples += x.shape[0]
         end = time.time()
@@ -1121,16 +1204,17 @@ class Learner(ABC):
         self.on_overfit_start()
 
         x, y = next(iter(self.train_dl))
-        x = self.to_device(x, self.device)
+        x = self.to_memory_format(self.to_device(x, self.device))
         y = self.to_device(y, self.device)
         batch = (x, y)
 
         num_steps = self.cfg.solver.overfit_num_steps
         with tqdm(range(num_steps), desc='Overfitting') as bar:
             for step in bar:
-                loss = self.train_step(batch, step)['train_loss']
-                loss.backward()
-                self.opt.step()
+                with self.autocast():
+                    loss = self.train_step(batch, step)['train_loss']
+                self.grad_scaler.scale(loss).backward()
+                self.optimizer_step(self.opt)
 
                 if (step + 1) % 25 == 0:
                     log.info('\nstep: {}'.format(step))
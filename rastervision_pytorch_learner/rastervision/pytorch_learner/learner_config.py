@@ -346,6 +346,26 @@ class SolverConfig(Config):
         None,
         description='If specified, the loss will be built from the definition '
         'from this external source, using Torch Hub.')
+    amp: bool = Field(
+        False,
+        description='If True, run the forward pass and loss computation in '
+        'mixed precision using torch.autocast. On CUDA, float16 is used along '
+        'with a GradScaler to avoid gradient underflow. On CPU, bfloat16 is '
+        'used.')
+    amp_dtype: Optional[Literal['float16', 'bfloat16']] = Field(
+        None,
+        description='Lower precision dtype to use if amp=True. If None, '
+        'float16 is used on CUDA and bfloat16 on CPU.')
+    grad_accumulation_steps: PosInt = Field(
+        1,
+        description='Number of batches to accumulate gradients over before '
+        'each optimizer step. The effective batch size is batch_sz * '
+        'grad_accumulation_steps.')
+    channels_last: bool = Field(
+        False,
+        description='If True, convert the model and its image inputs to the '
+        'channels_last memory format, which is faster for convolutions on '
+        'recent GPUs and on CPUs, especially in combination with amp.')
 
     @root_validator(skip_on_failure=True)
     def check_no_loss_opts_if_external(cls, values: dict) -> dict:
@@ -400,6 +420,14 @@ class SolverConfig(Config):
 
         return loss
 
+    def get_amp_dtype(self, device_type: str) -> torch.dtype:
+        """Return the dtype to autocast to on the given device type."""
+        if self.amp_dtype is not None:
+            return getattr(torch, self.amp_dtype)
+        if device_type == 'cuda':
+            return torch.float16
+        return torch.bfloat16
+
     def build_optimizer(self, model: nn.Module, **kwargs) -> optim.Optimizer:
         return optim.Adam(model.parameters(), lr=self.lr, **kwargs)
 
@@ -415,7 +443,10 @@ class SolverConfig(Config):
         """
         scheduler = None
         if self.one_cycle and self.num_epochs > 1:
-            steps_per_epoch = max(1, train_ds_sz // self.batch_sz)
+            # one step per optimizer step rather than per batch
+            steps_per_epoch = max(
+                1,
+                train_ds_sz // (self.batch_sz * self.grad_accumulation_steps))
             total_steps = self.num_epochs * steps_per_epoch
             step_size_up = (self.num_epochs // 2) * steps_per_epoch
             step_size_down = total_steps - step_size_up
@@ -4,6 +4,7 @@ import warnings
 import logging
 
 import numpy as np
+import torch
 
 from rastervision.pytorch_learner.learner import Learner
 from rastervision.pytorch_learner.object_detection_utils import (
@@ -65,6 +66,16 @@ class ObjectDetectionLearner(Learner):
     def get_collate_fn(self):
         return collate_fn
 
+    def autocast(self) -> 'torch.autocast':
+        """Override to not autocast on CPU.
+
+        The NMS op that torchvision detection models use internally does not
+        have a reduced precision CPU implementation.
+        """
+        if self.device.type == 'cpu':
+            return torch.autocast(device_type='cpu', enabled=False)
+        return super().autocast()
+
     def train_step(self, batch, batch_ind):
         x, y = batch
         loss_dict = self.model(x, y)
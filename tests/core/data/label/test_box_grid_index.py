@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.data.label.box_grid_index import BoxGridIndex
+
+
+def brute_force(npboxes: np.ndarray, window: np.ndarray) -> np.ndarray:
+    ymin, xmin, ymax, xmax = window
+    mask = ((npboxes[:, 0] <= ymax) & (npboxes[:, 2] >= ymin)
+            & (npboxes[:, 1] <= xmax) & (npboxes[:, 3] >= xmin))
+    return np.flatnonzero(mask)
+
+
+class TestBoxGridIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        ymin, xmin = rng.uniform(-100, 1000, size=(2, 500))
+        h, w = rng.uniform(1, 40, size=(2, 500))
+        self.npboxes = np.stack([ymin, xmin, ymin + h, xmin + w], axis=1)
+        # a few boxes spanning (almost) the whole extent
+        self.npboxes[:3] = [[-100, -100, 1100, 1100], [0, 0, 1000, 5],
+                            [500, -50, 510, 1050]]
+        self.windows = np.array([
+            [0, 0, 100, 100],
+            [-200, -200, -150, -150],
+            [250, 700, 300, 900],
+            [-1000, -1000, 5000, 5000],
+            [990, 990, 2000, 2000],
+        ])
+
+    def test_query(self):
+        index = BoxGridIndex(self.npboxes)
+        self.assertEqual(len(index), len(self.npboxes))
+        self.assertGreater(len(index._large_box_ids), 0)
+        for window in self.windows:
+            candidates = index.query(window)
+            expected = brute_force(self.npboxes, window)
+            # candidates must be sorted, unique and a superset of the
+            # intersecting boxes
+            np.testing.assert_array_equal(candidates, np.unique(candidates))
+            self.assertTrue(np.isin(expected, candidates).all())
+
+    def test_query_exact_on_small_boxes(self):
+        # with no large boxes, there should be no candidates far from the
+        # window
+        index = BoxGridIndex(self.npboxes[3:], cell_size=10)
+        window = np.array([250, 700, 300, 900])
+        candidates = index.query(window)
+        cand_boxes = self.npboxes[3:][candidates]
+        self.assertTrue(np.all(cand_boxes[:, 0] <= window[2] + 10))
+        self.assertTrue(np.all(cand_boxes[:, 2] >= window[0] - 10))
+
+    def test_query_batch(self):
+        index = BoxGridIndex(self.npboxes, cell_size=25)
+        out = index.query_batch(self.windows)
+        self.assertEqual(len(out), len(self.windows))
+        for window, candidates in zip(self.windows, out):
+            np.testing.assert_array_equal(candidates, index.query(window))
+
+    def test_query_pairs(self):
+        index = BoxGridIndex(self.npboxes)
+        ii, jj = index.query_pairs()
+        self.assertTrue(np.all(ii < jj))
+        pair_keys = ii * len(self.npboxes) + jj
+        np.testing.assert_array_equal(pair_keys, np.unique(pair_keys))
+        for i, box in enumerate(self.npboxes):
+            neighbors = brute_force(self.npboxes, box)
+            neighbors = neighbors[neighbors > i]
+            self.assertTrue(np.isin(neighbors, jj[ii == i]).all())
+
+    def test_empty(self):
+        index = BoxGridIndex(np.zeros((0, 4)))
+        self.assertEqual(len(index), 0)
+        self.assertEqual(len(index.query([0, 0, 10, 10])), 0)
+        self.assertEqual(index.query_batch(np.zeros((0, 4))), [])
+        ii, jj = index.query_pairs()
+        self.assertEqual(len(ii), 0)
+        self.assertEqual(len(jj), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.data.label.nms import non_max_suppression_tiled
+from rastervision.core.data.label.tfod_utils.np_box_list import BoxList
+from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
+    non_max_suppression)
+
+
+def make_boxlist(num_boxes: int, seed: int = 0) -> BoxList:
+    """Random boxes, each with a few jittered duplicates."""
+    rng = np.random.default_rng(seed)
+    ymin, xmin = rng.uniform(0, 1000, size=(2, num_boxes))
+    h, w = rng.uniform(5, 40, size=(2, num_boxes))
+    npboxes = np.stack([ymin, xmin, ymin + h, xmin + w], axis=1)
+    shifts = rng.normal(0, 3, size=(3 * num_boxes, 2))
+    npboxes = np.concatenate(
+        [npboxes, np.repeat(npboxes, 3, axis=0) + np.tile(shifts, 2)])
+    boxlist = BoxList(npboxes)
+    boxlist.add_field('scores', rng.random(len(npboxes)))
+    boxlist.add_field('classes', rng.integers(0, 3, size=len(npboxes)))
+    return boxlist
+
+
+class TestNonMaxSuppressionTiled(unittest.TestCase):
+    def test_same_as_non_max_suppression(self):
+        boxlist = make_boxlist(500)
+        for iou_threshold in [0., 0.3, 0.5, 0.9, 1.]:
+            for score_threshold in [-10., 0.5]:
+                expected = non_max_suppression(
+                    boxlist,
+                    max_output_size=100_000,
+                    iou_threshold=iou_threshold,
+                    score_threshold=score_threshold)
+                output = non_max_suppression_tiled(
+                    boxlist,
+                    iou_threshold=iou_threshold,
+                    score_threshold=score_threshold)
+                np.testing.assert_array_equal(output.get(), expected.get())
+                np.testing.assert_array_equal(
+                    output.get_field('scores'), expected.get_field('scores'))
+
+    def test_max_output_size(self):
+        boxlist = make_boxlist(100)
+        expected = non_max_suppression(
+            boxlist, max_output_size=10, iou_threshold=0.5)
+        output = non_max_suppression_tiled(
+            boxlist, iou_threshold=0.5, max_output_size=10)
+        np.testing.assert_array_equal(output.get(), expected.get())
+
+    def test_class_agnostic(self):
+        boxlist = make_boxlist(300)
+        output = non_max_suppression_tiled(
+            boxlist, iou_threshold=0.5, class_agnostic=False)
+        # same as running NMS separately for each class
+        class_ids = boxlist.get_field('classes')
+        expected = []
+        for class_id in np.unique(class_ids):
+            class_boxlist = BoxList(boxlist.get()[class_ids == class_id])
+            class_boxlist.add_field(
+                'scores',
+                boxlist.get_field('scores')[class_ids == class_id])
+            class_out = non_max_suppression(
+                class_boxlist, max_output_size=100_000, iou_threshold=0.5)
+            expected.append(class_out.get())
+        expected = np.concatenate(expected)
+        self.assertEqual(output.num_boxes(), len(expected))
+        self.assertEqual(
+            set(map(tuple, output.get())), set(map(tuple, expected)))
+
+    def test_empty(self):
+        boxlist = BoxList(np.zeros((0, 4)))
+        boxlist.add_field('scores', np.zeros(0))
+        output = non_max_suppression_tiled(boxlist, iou_threshold=0.5)
+        self.assertEqual(output.num_boxes(), 0)
+
+    def test_errors(self):
+        boxlist = BoxList(np.zeros((1, 4)))
+        with self.assertRaises(ValueError):
+            non_max_suppression_tiled(boxlist)
+        boxlist.add_field('scores', np.zeros(1))
+        with self.assertRaises(ValueError):
+            non_max_suppression_tiled(boxlist, iou_threshold=2.)
+
+
+if __name__ == '__main__':
+    unittest.main()
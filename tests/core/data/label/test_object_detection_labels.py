@@ -7,6 +7,8 @@ from rastervision.core.data.class_config import ClassConfig
 from rastervision.core.data.label.object_detection_labels import (
     ObjectDetectionLabels)
 from rastervision.core.data.label.tfod_utils.np_box_list import BoxList
+from rastervision.core.data.label.tfod_utils.np_box_list_ops import (
+    prune_non_overlapping_boxes, clip_to_window)
 
 
 class ObjectDetectionLabelsTest(unittest.TestCase):
@@ -127,6 +129,39 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
             expected_npboxes, self.class_ids, scores=self.scores)
         labels.assert_equal(expected_labels)
 
+    def test_get_overlapping_batch(self):
+        rng = np.random.default_rng(0)
+        ymin, xmin = rng.uniform(0, 500, size=(2, 200))
+        h, w = rng.uniform(1, 30, size=(2, 200))
+        npboxes = np.stack([ymin, xmin, ymin + h, xmin + w], axis=1)
+        labels = ObjectDetectionLabels(
+            npboxes, rng.integers(0, 2, size=200), scores=rng.random(200))
+        windows = [
+            Box.make_square(y, x, 64)
+            for y, x in [(0, 0), (100, 250), (480, 480)]
+        ]
+        windows.append(Box(-100, -100, 1000, 1000))
+        for ioa_thresh in [0.000001, 0.5, 0.]:
+            out = ObjectDetectionLabels.get_overlapping_batch(
+                labels, windows, ioa_thresh=ioa_thresh, clip=True)
+            self.assertEqual(len(out), len(windows))
+            for window, window_labels in zip(windows, out):
+                # compare with a brute-force check of every box
+                boxlist = prune_non_overlapping_boxes(
+                    labels.boxlist,
+                    BoxList(window.npbox_format()[np.newaxis]),
+                    minoverlap=ioa_thresh)
+                boxlist = clip_to_window(boxlist, window.npbox_format())
+                expected = ObjectDetectionLabels.from_boxlist(boxlist)
+                window_labels.assert_equal(expected)
+
+    def test_get_index(self):
+        index = self.labels.get_index()
+        self.assertIs(self.labels.get_index(), index)
+        self.labels.boxlist = BoxList(self.npboxes[:1])
+        self.assertIsNot(self.labels.get_index(), index)
+        self.assertEqual(len(self.labels.get_index()), 1)
+
     def test_concatenate(self):
         npboxes = np.array([[4., 4., 5., 5.]])
         class_ids = np.array([1])
@@ -180,6 +215,20 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
             scores=expected_scores[pruned_inds])
         pruned_labels.assert_equal(expected_labels)
 
+    def test_prune_duplicates_per_class(self):
+        # the second and third boxes overlap but have different classes, so
+        # neither is pruned
+        npboxes = np.array([[0., 0., 2., 2.], [2., 2., 4., 4.],
+                            [2.1, 2.1, 4.1, 4.1], [2., 2., 4., 4.]])
+        class_ids = np.array([0, 1, 0, 0])
+        scores = np.array([0.2, 0.9, 0.8, 0.7])
+        labels = ObjectDetectionLabels(npboxes, class_ids, scores=scores)
+        pruned_labels = ObjectDetectionLabels.prune_duplicates(
+            labels, score_thresh=0.5, merge_thresh=0.5, class_agnostic=False)
+        expected_labels = ObjectDetectionLabels(
+            npboxes[[1, 2]], class_ids[[1, 2]], scores=scores[[1, 2]])
+        pruned_labels.assert_equal(expected_labels)
+
     def test_filter_by_aoi(self):
         aois = [Box.make_square(0, 0, 2).to_shapely()]
         filt_labels = self.labels.filter_by_aoi(aois)
@@ -85,6 +85,35 @@ class TestSemanticSegmentationLabels(unittest.TestCase):
         exp_label_arr[10:-10, 10:-10] = 0
         np.testing.assert_array_equal(label_arr, exp_label_arr)
 
+    def test_from_predictions_in_background(self):
+        extent = Box(0, 0, 80, 80)
+        windows = extent.get_windows(20, stride=10, padding=0)
+        predictions = [np.random.randint(0, 3, size=(20, 20)) for _ in windows]
+        labels_bg = SemanticSegmentationLabels.from_predictions(
+            windows,
+            iter(predictions),
+            extent=extent,
+            num_classes=3,
+            batch_size=4,
+            accumulate_in_background=True)
+        labels_fg = SemanticSegmentationLabels.from_predictions(
+            windows, predictions, extent=extent, num_classes=3)
+        self.assertEqual(labels_bg, labels_fg)
+
+    def test_from_predictions_in_background_error(self):
+        extent = Box(0, 0, 40, 40)
+        windows = extent.get_windows(20, stride=20, padding=0)
+        # wrong size
+        predictions = [np.zeros((5, 5)) for _ in windows]
+        with self.assertRaises(Exception):
+            SemanticSegmentationLabels.from_predictions(
+                windows,
+                predictions,
+                extent=extent,
+                num_classes=2,
+                batch_size=1,
+                accumulate_in_background=True)
+
 
 class TestSemanticSegmentationDiscreteLabels(unittest.TestCase):
     def setUp(self):
@@ -151,6 +180,40 @@ class TestSemanticSegmentationDiscreteLabels(unittest.TestCase):
         label_arr = labels.get_label_arr(extent)
         np.testing.assert_array_equal(label_arr, np.eye(3))
 
+    def test_add_window_ignores_invalid_class_ids(self):
+        extent = Box(0, 0, 2, 2)
+        labels = SemanticSegmentationDiscreteLabels(extent, 2)
+        labels[extent] = np.array([[0, 1], [-1, 5]])
+        np.testing.assert_array_equal(labels.pixel_counts[0], [[1, 0], [0, 0]])
+        np.testing.assert_array_equal(labels.pixel_counts[1], [[0, 1], [0, 0]])
+
+    def test_add_windows(self):
+        extent = Box(0, 0, 10, 10)
+        num_classes = 4
+        # overlapping and non-overlapping batches, with a window that
+        # extends beyond the extent
+        windows_batches = [
+            [Box(0, 0, 4, 4), Box(0, 4, 4, 8)],
+            [Box(2, 2, 6, 6),
+             Box(3, 3, 7, 7),
+             Box(8, 8, 12, 12)],
+        ]
+        labels_batch = SemanticSegmentationDiscreteLabels(extent, num_classes)
+        labels_loop = SemanticSegmentationDiscreteLabels(extent, num_classes)
+        for windows in windows_batches:
+            arrs = [
+                np.random.randint(0, num_classes, size=w.size) for w in windows
+            ]
+            labels_batch.add_windows(windows, arrs)
+            for w, arr in zip(windows, arrs):
+                for class_id in range(num_classes):
+                    y0, x0, y1, x1 = labels_loop._to_local_coords(w)
+                    h, w_ = y1 - y0, x1 - x0
+                    mask = arr[:h, :w_] == class_id
+                    labels_loop.pixel_counts[class_id, y0:y1, x0:x1][mask] += 1
+                labels_loop.hit_mask[y0:y1, x0:x1] = True
+        self.assertEqual(labels_batch, labels_loop)
+
     def test_delitem(self):
         extent = Box(0, 0, 3, 3)
         labels = SemanticSegmentationDiscreteLabels(extent, 2)
@@ -0,0 +1,202 @@
+import unittest
+from os import listdir
+from os.path import join
+
+import numpy as np
+import rasterio as rio
+
+from rastervision.pipeline import rv_config
+from rastervision.core.box import Box
+from rastervision.core.data import (
+    ClassConfig, IdentityCRSTransformer, SemanticSegmentationLabels,
+    SemanticSegmentationDiscreteLabels, SemanticSegmentationSmoothLabels,
+    SemanticSegmentationTiledDiscreteLabels,
+    SemanticSegmentationTiledSmoothLabels)
+
+
+def make_random_scores(num_classes, h, w):
+    arr = np.random.uniform(size=(num_classes, h, w))
+    arr /= arr.sum(axis=0)
+    return arr.astype(np.float16)
+
+
+class TestSemanticSegmentationTiledDiscreteLabels(unittest.TestCase):
+    def setUp(self):
+        # non-zero and unequal ymin and xmin
+        self.extent = Box(5, 10, 105, 95)
+        self.num_classes = 3
+        self.windows = self.extent.get_windows(30, 20)
+        self.preds = [
+            np.random.randint(0, self.num_classes, size=w.size)
+            for w in self.windows
+        ]
+
+        self.dense = SemanticSegmentationDiscreteLabels(
+            self.extent, self.num_classes)
+        self.tiled = SemanticSegmentationTiledDiscreteLabels(
+            self.extent, self.num_classes, tile_size=16)
+        for w, p in zip(self.windows, self.preds):
+            self.dense[w] = p
+            self.tiled[w] = p
+
+    def test_make_empty(self):
+        labels = SemanticSegmentationLabels.make_empty(
+            self.extent, self.num_classes, tile_size=16)
+        self.assertIsInstance(labels, SemanticSegmentationTiledDiscreteLabels)
+        self.assertEqual(labels.num_tiles, 0)
+        labels = SemanticSegmentationLabels.make_empty(
+            self.extent, self.num_classes, smooth=True, tile_size=16)
+        self.assertIsInstance(labels, SemanticSegmentationTiledSmoothLabels)
+
+    def test_sparse(self):
+        labels = SemanticSegmentationTiledDiscreteLabels(
+            self.extent, self.num_classes, tile_size=16)
+        labels[Box(5, 10, 15, 20)] = np.ones((10, 10))
+        self.assertEqual(labels.num_tiles, 1)
+        label_arr = labels.get_label_arr(self.extent)
+        self.assertEqual(label_arr.shape, self.extent.size)
+        np.testing.assert_array_equal(label_arr[:10, :10], 1)
+        self.assertEqual((label_arr == -1).sum(), self.extent.area - 100)
+
+    def test_get_label_arr(self):
+        windows = [self.extent, Box(0, 0, 50, 50), Box(17, 33, 80, 200)]
+        for w in windows:
+            np.testing.assert_array_equal(
+                self.tiled.get_label_arr(w, null_class_id=7),
+                self.dense.get_label_arr(w, null_class_id=7))
+
+    def test_get_score_arr(self):
+        with np.errstate(invalid='ignore'):
+            np.testing.assert_array_equal(
+                self.tiled.get_score_arr(self.extent),
+                self.dense.get_score_arr(self.extent))
+
+    def test_delitem(self):
+        window = Box(20, 20, 60, 90)
+        del self.tiled[window]
+        del self.dense[window]
+        np.testing.assert_array_equal(
+            self.tiled.get_label_arr(self.extent),
+            self.dense.get_label_arr(self.extent))
+
+    def test_mask_fill(self):
+        window = Box(20, 20, 60, 90)
+        mask = np.random.randint(0, 2, size=window.size).astype(bool)
+        self.tiled.mask_fill(window, mask, 2)
+        self.dense.mask_fill(window, mask, 2)
+        np.testing.assert_array_equal(
+            self.tiled.get_label_arr(self.extent),
+            self.dense.get_label_arr(self.extent))
+
+    def test_add(self):
+        other = SemanticSegmentationTiledDiscreteLabels(
+            self.extent, self.num_classes, tile_size=16)
+        other[self.windows[0]] = self.preds[0]
+        self.tiled += other
+        self.tiled += self.dense
+
+        expected = SemanticSegmentationDiscreteLabels(self.extent,
+                                                      self.num_classes)
+        for w, p in zip(self.windows, self.preds):
+            expected[w] = p
+            expected[w] = p
+        expected[self.windows[0]] = self.preds[0]
+        np.testing.assert_array_equal(
+            self.tiled.get_label_arr(self.extent),
+            expected.get_label_arr(self.extent))
+
+    def test_eq(self):
+        other = SemanticSegmentationTiledDiscreteLabels(
+            self.extent, self.num_classes, tile_size=16)
+        self.assertNotEqual(self.tiled, other)
+        for w, p in zip(self.windows, self.preds):
+            other[w] = p
+        self.assertEqual(self.tiled, other)
+
+    def test_spill_dir(self):
+        with rv_config.get_tmp_dir() as tmp_dir:
+            labels = SemanticSegmentationTiledDiscreteLabels(
+                self.extent, self.num_classes, tile_size=16, spill_dir=tmp_dir)
+            for w, p in zip(self.windows, self.preds):
+                labels[w] = p
+            labels.flush()
+            self.assertEqual(len(listdir(tmp_dir)), 2 * labels.num_tiles)
+            np.testing.assert_array_equal(
+                labels.get_label_arr(self.extent),
+                self.dense.get_label_arr(self.extent))
+
+    def test_save(self):
+        class_config = ClassConfig(names=['a', 'b', 'c'], null_class='a')
+        extent = Box(0, 0, 50, 70)
+        labels = SemanticSegmentationTiledDiscreteLabels(
+            extent, self.num_classes, tile_size=16)
+        labels[Box(10, 10, 40, 40)] = np.ones((30, 30))
+        exp_arr = np.zeros(extent.size)
+        exp_arr[10:40, 10:40] = 1
+        with rv_config.get_tmp_dir() as tmp_dir:
+            uri = join(tmp_dir, 'test')
+            labels.save(
+                uri=uri,
+                crs_transformer=IdentityCRSTransformer(),
+                class_config=class_config,
+                rasterio_block_size=32)
+            with rio.open(join(uri, 'labels.tif'), 'r') as ds:
+                arr = ds.read(1)
+        np.testing.assert_array_equal(arr, exp_arr)
+
+
+class TestSemanticSegmentationTiledSmoothLabels(unittest.TestCase):
+    def setUp(self):
+        self.extent = Box(0, 0, 40, 70)
+        self.num_classes = 3
+        self.windows = self.extent.get_windows(20, 10)
+        self.preds = [
+            make_random_scores(self.num_classes, *w.size) for w in self.windows
+        ]
+
+        self.dense = SemanticSegmentationSmoothLabels(self.extent,
+                                                      self.num_classes)
+        self.tiled = SemanticSegmentationTiledSmoothLabels(
+            self.extent, self.num_classes, tile_size=16)
+        for w, p in zip(self.windows, self.preds):
+            self.dense[w] = p
+            self.tiled[w] = p
+
+    def test_get_score_arr(self):
+        window = Box(5, 5, 50, 50)
+        np.testing.assert_array_equal(
+            self.tiled.get_score_arr(window), self.dense.get_score_arr(window))
+        np.testing.assert_array_equal(
+            self.tiled.get_label_arr(window), self.dense.get_label_arr(window))
+
+    def test_pixel_hits(self):
+        np.testing.assert_array_equal(self.tiled.pixel_hits,
+                                      self.dense.pixel_hits)
+
+    def test_add_dense(self):
+        self.tiled += self.dense
+        self.dense += self.dense
+        np.testing.assert_array_equal(
+            self.tiled.get_score_arr(self.extent),
+            self.dense.get_score_arr(self.extent))
+        np.testing.assert_array_equal(self.tiled.pixel_hits,
+                                      self.dense.pixel_hits)
+
+    def test_save(self):
+        class_config = ClassConfig(names=['a', 'b', 'c'], null_class='a')
+        with rv_config.get_tmp_dir() as tmp_dir:
+            uri = join(tmp_dir, 'test')
+            self.tiled.save(
+                uri=uri,
+                crs_transformer=IdentityCRSTransformer(),
+                class_config=class_config)
+            with rio.open(join(uri, 'scores.tif'), 'r') as ds:
+                arr = ds.read()
+            hits = np.load(join(uri, 'pixel_hits.npy'))
+        exp_arr = self.dense.get_score_arr(self.extent).astype(np.float32)
+        np.testing.assert_array_equal(arr, exp_arr)
+        np.testing.assert_array_equal(hits, self.dense.pixel_hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,17 @@
 import unittest
-from os.path import realpath
+from os.path import join, realpath
 
+import numpy as np
+import rasterio as rio
+
+from rastervision.pipeline import rv_config
+from rastervision.pipeline.file_system import file_to_json
+from rastervision.core.box import Box
+from rastervision.core.data import (ClassConfig, IdentityCRSTransformer,
+                                    SemanticSegmentationLabels)
 from rastervision.core.data.label_store import (
     PolygonVectorOutputConfig, BuildingVectorOutputConfig,
-    SemanticSegmentationLabelStoreConfig)
+    SemanticSegmentationLabelStore, SemanticSegmentationLabelStoreConfig)
 
 
 class MockPipelineConfig():
@@ -68,3 +76,92 @@ class TestSemanticSegmentationLabelStoreConfig(unittest.TestCase):
 
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestSemanticSegmentationLabelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = rv_config.get_tmp_dir()
+        self.class_config = ClassConfig(names=['bg', 'fg'], null_class='bg')
+        self.extent = Box(0, 0, 50, 70)
+        # overlapping windows that do not cover the bottom rows
+        self.windows = self.extent.get_windows(20, stride=15)
+        self.windows = [w for w in self.windows if w.ymax <= 45]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _make_label_store(self, name: str, **kwargs):
+        return SemanticSegmentationLabelStore(
+            uri=join(self.tmp_dir.name, name),
+            extent=self.extent,
+            crs_transformer=IdentityCRSTransformer(),
+            class_config=self.class_config,
+            tmp_dir=self.tmp_dir.name,
+            rasterio_block_size=16,
+            **kwargs)
+
+    def test_save_streaming_discrete(self):
+        predictions = [
+            np.random.randint(0, 2, size=w.size) for w in self.windows
+        ]
+        vo = PolygonVectorOutputConfig(class_id=1, denoise=3)
+
+        # regular save
+        store = self._make_label_store('regular')
+        vo.uri = join(self.tmp_dir.name, 'regular.json')
+        store.vector_outputs = [vo.copy()]
+        labels = SemanticSegmentationLabels.from_predictions(
+            self.windows, predictions, self.extent, num_classes=2)
+        store.save(labels)
+
+        # streaming save
+        store_streaming = self._make_label_store('streaming')
+        vo.uri = join(self.tmp_dir.name, 'streaming.json')
+        store_streaming.vector_outputs = [vo.copy()]
+        store_streaming.save_streaming(self.windows, iter(predictions))
+
+        with rio.open(store.label_uri) as ds:
+            exp_label_arr = ds.read(1)
+        with rio.open(store_streaming.label_uri) as ds:
+            label_arr = ds.read(1)
+        np.testing.assert_array_equal(label_arr, exp_label_arr)
+
+        exp_geojson = file_to_json(join(self.tmp_dir.name, 'regular.json'))
+        geojson = file_to_json(join(self.tmp_dir.name, 'streaming.json'))
+        self.assertEqual(
+            len(geojson['features']), len(exp_geojson['features']))
+
+    def test_save_streaming_smooth(self):
+        predictions = [
+            np.random.dirichlet((1, 1), size=w.size).transpose(2, 0, 1)
+            for w in self.windows
+        ]
+        store = self._make_label_store('regular', smooth_output=True)
+        labels = SemanticSegmentationLabels.from_predictions(
+            self.windows,
+            predictions,
+            self.extent,
+            num_classes=2,
+            smooth=True,
+            crop_sz=2)
+        store.save(labels)
+
+        store_streaming = self._make_label_store(
+            'streaming', smooth_output=True)
+        store_streaming.save_streaming(
+            self.windows, iter(predictions), crop_sz=2)
+
+        with rio.open(store.score_uri) as ds:
+            exp_score_arr = ds.read()
+        with rio.open(store_streaming.score_uri) as ds:
+            score_arr = ds.read()
+        np.testing.assert_array_equal(score_arr, exp_score_arr)
+        np.testing.assert_array_equal(
+            np.load(store_streaming.hits_uri), np.load(store.hits_uri))
+
+        # merging with existing scores is not supported
+        store_streaming = self._make_label_store(
+            'streaming', smooth_output=True)
+        self.assertRaises(
+            ValueError, lambda: store_streaming.save_streaming(
+                self.windows, iter(predictions)))
@@ -9,7 +9,8 @@ from rasterio.enums import ColorInterp
 from rastervision.core import (Box, RasterStats)
 from rastervision.core.utils.misc import save_img
 from rastervision.core.data.raster_source import (
-    ChannelOrderError, RasterioSource, RasterioSourceConfig, fill_overflow)
+    BlockCache, ChannelOrderError, RasterioSource, RasterioSourceConfig,
+    fill_overflow)
 from rastervision.core.data.raster_transformer import StatsTransformerConfig
 from rastervision.pipeline import rv_config
 
@@ -275,6 +276,63 @@ class TestRasterioSource(unittest.TestCase):
         self.assertTrue(np.all(out[mask] == 1))
         self.assertTrue(np.all(out[~mask] == 0))
 
+    def test_block_cache(self):
+        img_path = join(self.tmp_dir, 'tiled.tif')
+        height, width, nb_channels = 100, 120, 2
+        im = np.random.randint(0, 100, (nb_channels, height, width))
+        im = im.astype(np.uint8)
+        im[0, :5, :5] = 7
+        with rasterio.open(
+                img_path,
+                'w',
+                driver='GTiff',
+                height=height,
+                width=width,
+                count=nb_channels,
+                dtype=np.uint8,
+                nodata=7,
+                tiled=True,
+                blockxsize=32,
+                blockysize=32) as ds:
+            ds.write(im)
+
+        rs_no_cache = RasterioSource(
+            uris=img_path, extent=Box(10, 10, 90, 110))
+        rs_cache = RasterioSource(
+            uris=img_path,
+            extent=Box(10, 10, 90, 110),
+            block_cache_size=10 * 32 * 32)
+        windows = Box(0, 0, 80, 100).get_windows(40, 20, padding=10)
+        windows.append(Box(-20, -20, 30, 30))
+        for window in windows:
+            np.testing.assert_equal(
+                rs_cache.get_chip(window), rs_no_cache.get_chip(window))
+            np.testing.assert_equal(
+                rs_cache.get_chip(window, bands=[1]),
+                rs_no_cache.get_chip(window, bands=[1]))
+
+        cache = rs_cache.block_cache
+        self.assertGreater(cache.hits, 0)
+        self.assertGreater(cache.misses, 0)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+
+    def test_block_cache_eviction(self):
+        cache = BlockCache(max_bytes=200)
+        cache.put('a', np.zeros(100, dtype=np.uint8))
+        cache.put('b', np.zeros(100, dtype=np.uint8))
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', np.zeros(100, dtype=np.uint8))
+        # 'b' is the least recently used block
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.nbytes, 200)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # blocks larger than the cache are not cached
+        cache.put('d', np.zeros(300, dtype=np.uint8))
+        self.assertNotIn('d', cache)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import os
 from os.path import join
 
 import numpy as np
@@ -43,14 +44,15 @@ class TestRasterizedSource(unittest.TestCase):
     def tearDown(self):
         self.tmp_dir_obj.cleanup()
 
-    def build_source(self, geojson, all_touched=False):
+    def build_source(self, geojson, all_touched=False, cache_dir=None):
         json_to_file(geojson, self.uri)
 
         config = RasterizedSourceConfig(
             vector_source=GeoJSONVectorSourceConfig(uri=self.uri),
             rasterizer_config=RasterizerConfig(
                 background_class_id=self.background_class_id,
-                all_touched=all_touched))
+                all_touched=all_touched,
+                cache_dir=cache_dir))
         config.update()
         source = config.build(self.class_config, self.crs_transformer,
                               self.extent)
@@ -135,6 +137,49 @@ class TestRasterizedSource(unittest.TestCase):
         expected_chip[0:1, 0:1, 0] = self.class_id
         np.testing.assert_array_equal(chip, expected_chip)
 
+    def test_get_chip_cached(self):
+        self.extent = Box.make_square(0, 0, 300)
+        rng = np.random.default_rng(0)
+        features = []
+        for y, x in rng.uniform(0, 290, size=(50, 2)):
+            coords = [[x, y], [x, y + 10], [x + 10, y + 10], [x + 10, y],
+                      [x, y]]
+            features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'Polygon',
+                    'coordinates': [coords]
+                },
+                'properties': {
+                    'class_id': self.class_id
+                }
+            })
+        geojson = {'type': 'FeatureCollection', 'features': features}
+
+        source = self.build_source(geojson)
+        cache_dir = join(self.tmp_dir, 'cache')
+        cached_source = self.build_source(geojson, cache_dir=cache_dir)
+        self.assertIsNotNone(cached_source.cache_path)
+        self.assertTrue(cached_source.cache_path.startswith(cache_dir))
+
+        windows = [
+            self.extent,
+            Box(10, 20, 60, 200),
+            Box(250, 250, 300, 300),
+            # partially outside the extent
+            Box(280, 280, 320, 320),
+        ]
+        for window in windows:
+            np.testing.assert_array_equal(
+                cached_source.get_chip(window), source.get_chip(window))
+
+        # the cache file is reused by new sources
+        mtime = os.path.getmtime(cached_source.cache_path)
+        cached_source = self.build_source(geojson, cache_dir=cache_dir)
+        np.testing.assert_array_equal(cached_source.get_image_array(),
+                                      source.get_image_array())
+        self.assertEqual(os.path.getmtime(cached_source.cache_path), mtime)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+from shapely.ops import unary_union
+
+from rastervision.core.data.utils import (mask_to_polygons,
+                                          mask_strips_to_polygons)
+
+
+class TestMaskStripsToPolygons(unittest.TestCase):
+    def test_same_as_full_mask(self):
+        mask = (np.random.random((100, 80)) > 0.45).astype(np.uint8)
+        strip_height = 16
+        strips = ((y, mask[y:y + strip_height])
+                  for y in range(0, mask.shape[0], strip_height))
+        polys = list(mask_strips_to_polygons(strips))
+        exp_polys = list(mask_to_polygons(mask))
+        self.assertEqual(len(polys), len(exp_polys))
+        self.assertListEqual(
+            sorted(p.area for p in polys), sorted(p.area for p in exp_polys))
+        diff = unary_union(polys).symmetric_difference(unary_union(exp_polys))
+        self.assertEqual(diff.area, 0)
+
+    def test_polygon_across_many_strips(self):
+        mask = np.zeros((30, 10), dtype=np.uint8)
+        # a ring spanning all strips
+        mask[2:28, 2:8] = 1
+        mask[5:25, 4:6] = 0
+        strips = ((y, mask[y:y + 4]) for y in range(0, 30, 4))
+        polys = list(mask_strips_to_polygons(strips))
+        self.assertEqual(len(polys), 1)
+        self.assertEqual(len(polys[0].interiors), 1)
+        self.assertEqual(polys[0].area, mask.sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
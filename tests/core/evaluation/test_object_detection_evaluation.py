@@ -1,8 +1,11 @@
 import unittest
+import json
 
 import numpy as np
 
 from rastervision.core.evaluation import ObjectDetectionEvaluation
+from rastervision.core.evaluation.classification_evaluation import (
+    ensure_json_serializable)
 from rastervision.core.data import ClassConfig, ObjectDetectionLabels
 from rastervision.core import Box
 
@@ -108,6 +111,77 @@ class TestObjectDetectionEvaluation(unittest.TestCase):
         self.assertEqual(avg_item['metrics']['recall'], 0.0)
         self.assertEqual(avg_item['metrics']['f1'], 0.0)
 
+    def test_compute_ap(self):
+        eval = ObjectDetectionEvaluation(
+            self.make_class_config(), ap_iou_threshs=[0.5, 0.9])
+        gt_labels = self.make_ground_truth_labels()
+        pred_labels = self.make_predicted_labels()
+        eval.compute(gt_labels, pred_labels)
+
+        # predictions match their ground truth boxes with an IOU of 0.82
+        eval_item = eval.class_to_eval_item[0]
+        self.assertEqual(eval_item.extra_info['ap'], 1.)
+        self.assertDictEqual(eval_item.extra_info['ap_by_iou_thresh'], {
+            '0.50': 1.,
+            '0.90': 0.
+        })
+        eval_item = eval.class_to_eval_item[1]
+        self.assertEqual(eval_item.extra_info['ap'], 0.5)
+        pr_curve = eval_item.extra_info['pr_curve']
+        self.assertEqual(len(pr_curve['recall']), 101)
+        self.assertEqual(pr_curve['precision'][50], 1.)
+        self.assertEqual(pr_curve['precision'][51], 0.)
+        self.assertEqual(eval.avg_item['map'], 0.75)
+        self.assertDictEqual(eval.avg_item['map_by_iou_thresh'], {
+            '0.50': 0.75,
+            '0.90': 0.
+        })
+        self.assertEqual(eval.avg_item['map_averaged_over_iou_threshs'], 0.375)
+
+    def test_match_by_score(self):
+        # both predictions overlap the same ground truth box, but only the
+        # one with the higher score is matched, even though the other one
+        # has a higher IOU
+        gt_labels = ObjectDetectionLabels(
+            Box.to_npboxes([Box(0, 0, 10, 10)]), np.array([0]))
+        pred_labels = ObjectDetectionLabels(
+            Box.to_npboxes([Box(0, 0, 10, 10),
+                            Box(0, 1, 10, 11)]),
+            np.array([0, 0]),
+            scores=np.array([0.5, 0.9]))
+        eval = ObjectDetectionEvaluation(self.make_class_config())
+        eval.compute(gt_labels, pred_labels)
+        np.testing.assert_array_equal(eval.class_to_is_tp[0][:, 0],
+                                      [False, True])
+        eval_item = eval.class_to_eval_item[0]
+        self.assertEqual(eval_item.true_pos, 1)
+        self.assertEqual(eval_item.false_pos, 1)
+        self.assertEqual(eval_item.false_neg, 0)
+        self.assertEqual(eval_item.extra_info['ap'], 1.)
+
+    def test_merge(self):
+        class_config = self.make_class_config()
+        gt_labels = self.make_ground_truth_labels()
+        pred_labels = self.make_predicted_labels()
+
+        eval1 = ObjectDetectionEvaluation(class_config)
+        eval1.compute(gt_labels, pred_labels)
+        eval2 = ObjectDetectionEvaluation(class_config)
+        eval2.compute(gt_labels, ObjectDetectionLabels.make_empty())
+        eval_global = ObjectDetectionEvaluation(class_config)
+        eval_global.merge(eval1, scene_id='1')
+        eval_global.merge(eval2, scene_id='2')
+
+        eval_item = eval_global.class_to_eval_item[0]
+        self.assertEqual(eval_item.gt_count, 4)
+        self.assertEqual(eval_item.true_pos, 2)
+        self.assertEqual(eval_item.false_neg, 2)
+        self.assertEqual(eval_item.extra_info['ap'], 0.5)
+        self.assertEqual(
+            eval_global.scene_to_eval['1'].class_to_eval_item[0].extra_info[
+                'ap'], 1.)
+        json.dumps(ensure_json_serializable(eval_global.to_json()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,10 +5,20 @@ import numpy as np
 from rastervision.core.data import (ClassConfig,
                                     SemanticSegmentationLabelSource)
 from rastervision.core.evaluation import SemanticSegmentationEvaluation
+from rastervision.core.evaluation.semantic_segmentation_evaluation import (
+    compute_conf_mat)
 from tests.core.data.mock_raster_source import MockRasterSource
 
 
 class TestSemanticSegmentationEvaluation(unittest.TestCase):
+    def test_compute_conf_mat(self):
+        gt_arr = np.array([[0, 1, 2], [2, 2, 5]])
+        pred_arr = np.array([[0, 2, 2], [1, -1, 2]])
+        conf_mat = compute_conf_mat(gt_arr, pred_arr, num_classes=3)
+        # pixels with out-of-range class IDs are ignored
+        exp_conf_mat = np.array([[1, 0, 0], [0, 0, 1], [0, 1, 1]])
+        np.testing.assert_array_equal(conf_mat, exp_conf_mat)
+
     def test_compute(self):
         class_config = ClassConfig(names=['one', 'two'])
         class_config.update()
@@ -1,4 +1,5 @@
 import unittest
+import json
 from os.path import join
 
 import numpy as np
@@ -22,6 +23,17 @@ class MockRVPipelineConfig:
     eval_uri = '/abc/def/eval'
 
 
+class MockLabelStore:
+    """Label store with discrete predictions in a label source."""
+
+    def __init__(self, label_source: SemanticSegmentationLabelSource):
+        self.label_source = label_source
+        self.vector_outputs = None
+
+    def get_labels(self):
+        return self.label_source.get_labels()
+
+
 class TestSemanticSegmentationEvaluator(unittest.TestCase):
     def setUp(self):
         self.tmp_dir = rv_config.get_tmp_dir()
@@ -70,6 +82,59 @@ class TestSemanticSegmentationEvaluator(unittest.TestCase):
         exp_eval_json = file_to_json(data_file_path('expected-eval.json'))
         self.assertDictEqual(eval_json, exp_eval_json)
 
+    def assertEvaluationsEqual(self, eval1, eval2):
+        np.testing.assert_array_equal(eval1.conf_mat, eval2.conf_mat)
+        self.assertEqual(
+            json.dumps(eval1.to_json()), json.dumps(eval2.to_json()))
+
+    def test_evaluate_scene_streaming(self):
+        evaluator = SemanticSegmentationEvaluator(
+            self.class_config, tile_size=3)
+        for class_id in [0, 1]:
+            scene = self.get_scene(class_id)
+            scene.label_store.vector_outputs = None
+            eval_in_memory = evaluator.evaluate_scene(scene)
+            scene.label_store = MockLabelStore(scene.label_store)
+            eval_streaming = evaluator.evaluate_scene(scene)
+            self.assertEvaluationsEqual(eval_streaming, eval_in_memory)
+            self.assertEqual(eval_streaming.conf_mat.sum(), 100)
+
+    def test_evaluate_scene_streaming_with_aoi(self):
+        evaluator = SemanticSegmentationEvaluator(
+            self.class_config, tile_size=3)
+        scene = self.get_scene(1)
+        scene.label_store.vector_outputs = None
+        scene.aoi_polygons = [Box(2, 2, 7, 9).to_shapely()]
+        eval_in_memory = evaluator.evaluate_scene(scene)
+        scene.label_store = MockLabelStore(scene.label_store)
+        eval_streaming = evaluator.evaluate_scene(scene)
+        self.assertEvaluationsEqual(eval_streaming, eval_in_memory)
+        # pixels outside the AOI are counted as null class
+        null_class_id = self.class_config.null_class_id
+        self.assertEqual(eval_streaming.conf_mat[null_class_id, null_class_id],
+                         100 - 35)
+
+    def test_process_parallel(self):
+        output_uri = join(self.tmp_dir.name, 'out.json')
+        scenes = [self.get_scene(0), self.get_scene(1)]
+        for scene in scenes:
+            scene.label_store = MockLabelStore(scene.label_store)
+        evaluator = SemanticSegmentationEvaluator(
+            self.class_config, output_uri, tile_size=4, num_workers=2)
+        evaluator.process(scenes, self.tmp_dir.name)
+        eval_json = file_to_json(output_uri)
+        exp_eval_json = file_to_json(data_file_path('expected-eval.json'))
+        self.assertDictEqual(eval_json, exp_eval_json)
+
+    def test_get_tiles(self):
+        evaluator = SemanticSegmentationEvaluator(
+            self.class_config, tile_size=4)
+        extent = Box(0, 0, 10, 6)
+        tiles = evaluator.get_tiles(extent)
+        self.assertEqual(sum(tile.area for tile in tiles), extent.area)
+        for tile in tiles:
+            self.assertEqual(tile.intersection(extent), tile)
+
     def get_vector_scene(self, class_id, use_aoi=False):
         gt_uri = data_file_path('{}-gt-polygons.geojson'.format(class_id))
         pred_uri = data_file_path('{}-pred-polygons.geojson'.format(class_id))
@@ -0,0 +1,149 @@
+import unittest
+from unittest.mock import patch
+from os.path import join, isfile
+
+import numpy as np
+import rasterio
+
+from rastervision.pipeline import rv_config
+from rastervision.core.backend import SampleWriter
+from rastervision.core.data import (ClassConfig, DatasetConfig,
+                                    RasterioSourceConfig, SceneConfig,
+                                    SemanticSegmentationLabelSourceConfig)
+from rastervision.core.rv_pipeline import (TRAIN, VALIDATION,
+                                           SemanticSegmentationConfig)
+from rastervision.core.rv_pipeline.rv_pipeline import ChipWorkerError
+from rastervision.pytorch_backend import PyTorchSemanticSegmentationConfig
+from rastervision.pytorch_learner import (SemanticSegmentationModelConfig,
+                                          SolverConfig,
+                                          SemanticSegmentationImageDataConfig)
+
+from tests import data_file_path
+
+
+class MemorySampleWriter(SampleWriter):
+    def __init__(self):
+        self.samples = []
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+    def write_sample(self, sample):
+        self.samples.append(sample)
+
+
+class TestRVPipelineChip(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir_obj = rv_config.get_tmp_dir()
+        self.tmp_dir = self.tmp_dir_obj.name
+
+        label_path = join(self.tmp_dir, 'labels.tif')
+        label_arr = np.zeros((256, 256), dtype=np.uint8)
+        label_arr[128:] = 1
+        with rasterio.open(
+                label_path,
+                'w',
+                driver='GTiff',
+                height=256,
+                width=256,
+                count=1,
+                dtype=np.uint8) as ds:
+            ds.write_band(1, label_arr)
+
+        def make_scene(scene_id):
+            return SceneConfig(
+                id=scene_id,
+                raster_source=RasterioSourceConfig(
+                    uris=[data_file_path('small-rgb-tile.tif')]),
+                label_source=SemanticSegmentationLabelSourceConfig(
+                    raster_source=RasterioSourceConfig(uris=[label_path])))
+
+        class_config = ClassConfig(names=['bg', 'fg'])
+        dataset = DatasetConfig(
+            class_config=class_config,
+            train_scenes=[make_scene('0'), make_scene('1')],
+            validation_scenes=[make_scene('2')])
+        backend = PyTorchSemanticSegmentationConfig(
+            data=SemanticSegmentationImageDataConfig(),
+            model=SemanticSegmentationModelConfig(),
+            solver=SolverConfig())
+        self.cfg = SemanticSegmentationConfig(
+            root_uri=self.tmp_dir,
+            dataset=dataset,
+            backend=backend,
+            train_chip_sz=100)
+        self.cfg.update()
+
+    def tearDown(self):
+        self.tmp_dir_obj.cleanup()
+
+    def test_chip_in_parallel(self):
+        pipeline = self.cfg.build(self.tmp_dir)
+        dataset = self.cfg.dataset
+        tasks = [(s, TRAIN) for s in dataset.train_scenes]
+        tasks += [(s, VALIDATION) for s in dataset.validation_scenes]
+
+        expected = {}
+        for scene_cfg, split in tasks:
+            scene = scene_cfg.build(dataset.class_config, self.tmp_dir)
+            samples = pipeline.get_train_samples(scene, split)
+            expected[scene_cfg.id] = [s.window for s in samples]
+
+        writer = MemorySampleWriter()
+        pipeline._chip_in_parallel(tasks, writer, num_workers=2)
+
+        actual = {}
+        for sample in writer.samples:
+            actual.setdefault(sample.scene_id, []).append(sample.window)
+            self.assertEqual(sample.is_train, sample.scene_id != '2')
+            self.assertEqual(sample.chip.shape, (100, 100, 3))
+        self.assertDictEqual(actual, expected)
+
+    def test_chip_in_parallel_error(self):
+        pipeline = self.cfg.build(self.tmp_dir)
+        scene_cfg = self.cfg.dataset.train_scenes[0].copy()
+        scene_cfg.raster_source.uris = [join(self.tmp_dir, 'missing.tif')]
+        writer = MemorySampleWriter()
+        with self.assertRaises(ChipWorkerError):
+            pipeline._chip_in_parallel(
+                [(scene_cfg, TRAIN)], writer, num_workers=1)
+
+    def test_window_manifest(self):
+        pipeline = self.cfg.build(self.tmp_dir)
+        class_cfg = self.cfg.dataset.class_config
+        scene_cfg = self.cfg.dataset.train_scenes[0]
+        manifest_uri = self.cfg.get_window_manifest_uri(scene_cfg)
+        self.assertFalse(isfile(manifest_uri))
+
+        samples = pipeline.get_scene_train_samples(scene_cfg, class_cfg, TRAIN)
+        expected = [s.window for s in samples]
+        self.assertTrue(isfile(manifest_uri))
+
+        with patch.object(pipeline, 'get_train_samples') as mock:
+            samples = pipeline.get_scene_train_samples(scene_cfg, class_cfg,
+                                                       TRAIN)
+            samples = list(samples)
+            mock.assert_not_called()
+        self.assertListEqual([s.window for s in samples], expected)
+        for sample in samples:
+            self.assertEqual(sample.chip.shape, (100, 100, 3))
+            self.assertTrue(sample.is_train)
+
+        # changing the chip options changes the key
+        self.cfg.chip_options.negative_survival_prob = 0.5
+        self.assertNotEqual(
+            self.cfg.get_window_manifest_uri(scene_cfg), manifest_uri)
+
+    def test_window_manifest_disabled(self):
+        self.cfg.cache_train_windows = False
+        pipeline = self.cfg.build(self.tmp_dir)
+        scene_cfg = self.cfg.dataset.train_scenes[0]
+        samples = pipeline.get_scene_train_samples(
+            scene_cfg, self.cfg.dataset.class_config, TRAIN)
+        self.assertGreater(len(list(samples)), 0)
+        manifest_uri = self.cfg.get_window_manifest_uri(scene_cfg)
+        self.assertFalse(isfile(manifest_uri))
+
+
+if __name__ == '__main__':
+    unittest.main()
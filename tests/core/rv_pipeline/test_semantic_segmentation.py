@@ -0,0 +1,99 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.data import (ClassConfig, Scene,
+                                    SemanticSegmentationLabelSource)
+from rastervision.core.rv_pipeline.semantic_segmentation import (
+    get_train_samples, get_train_windows)
+from rastervision.core.rv_pipeline.semantic_segmentation_config import (
+    SemanticSegmentationChipOptions, SemanticSegmentationWindowMethod)
+
+from tests.core.data.mock_raster_source import MockRasterSource
+
+
+class TestGetTrainSamples(unittest.TestCase):
+    def setUp(self):
+        self.class_config = ClassConfig(names=['bg', 'fg'])
+        self.class_config.ensure_null_class()
+        null_class_id = self.class_config.null_class_id
+
+        img = np.ones((20, 20, 3), dtype=np.uint8)
+        # top-left window is all NODATA
+        img[:10, :10] = 0
+        label_arr = np.zeros((20, 20, 1), dtype=np.uint8)
+        label_arr[10:, 10:] = 1
+        # top-right window only has null labels
+        label_arr[:10, 10:] = null_class_id
+
+        self.rs = MockRasterSource(channel_order=[0, 1, 2], num_channels_raw=3)
+        self.rs.set_raster(img)
+        self.label_rs = MockRasterSource(channel_order=[0], num_channels_raw=1)
+        self.label_rs.set_raster(label_arr)
+        label_source = SemanticSegmentationLabelSource(self.label_rs,
+                                                       self.class_config)
+        self.scene = Scene('s', self.rs, label_source)
+        self.chip_options = SemanticSegmentationChipOptions(
+            window_method=SemanticSegmentationWindowMethod.sliding, stride=10)
+
+    def test_sliding(self):
+        samples = list(
+            get_train_samples(
+                self.scene,
+                self.class_config,
+                10,
+                self.chip_options,
+                chip_nodata_threshold=0.5))
+        windows = [w for w, _, _ in samples]
+        self.assertListEqual(
+            windows,
+            [Box(10, 0, 20, 10), Box(10, 10, 20, 20)])
+
+        # each candidate window is read exactly once
+        num_candidates = len(self.rs.extent.get_windows(10, 10))
+        self.assertEqual(self.rs.mock._get_chip.call_count, num_candidates)
+        self.assertEqual(self.label_rs.mock._get_chip.call_count,
+                         num_candidates)
+
+        for window, chip, label_arr in samples:
+            np.testing.assert_equal(chip, self.rs.get_chip(window))
+        np.testing.assert_equal(samples[1][2], 1)
+
+    def test_sliding_target_classes(self):
+        chip_options = self.chip_options.copy(
+            update=dict(
+                negative_survival_prob=0.,
+                target_class_ids=[1],
+                target_count_threshold=100))
+        windows = get_train_windows(
+            self.scene,
+            self.class_config,
+            10,
+            chip_options,
+            chip_nodata_threshold=0.5)
+        self.assertListEqual(windows, [Box(10, 10, 20, 20)])
+
+    def test_sliding_no_valid_windows(self):
+        windows = get_train_windows(
+            self.scene,
+            self.class_config,
+            10,
+            self.chip_options,
+            chip_nodata_threshold=0.)
+        self.assertListEqual(windows, [Box(0, 0, 10, 10)])
+
+    def test_random_sample(self):
+        chip_options = SemanticSegmentationChipOptions(
+            window_method=SemanticSegmentationWindowMethod.random_sample,
+            chips_per_scene=5)
+        samples = list(
+            get_train_samples(self.scene, self.class_config, 5, chip_options))
+        self.assertEqual(len(samples), 5)
+        for window, chip, label_arr in samples:
+            self.assertEqual(chip.shape, (5, 5, 3))
+            self.assertEqual(label_arr.shape, (5, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 import numpy as np
-from shapely.geometry import box as ShapelyBox
+from shapely.geometry import Point, Polygon, box as ShapelyBox
 
 from rastervision.core.box import Box, BoxSizeError, RioWindow
 
@@ -379,6 +379,58 @@ class TestBox(unittest.TestCase):
         filt_windows = Box.filter_by_aoi(windows, aoi_polygons, within=True)
         self.assertListEqual(filt_windows, windows[0:1])
 
+    def test_within_aoi(self):
+        aoi_polygons = [Box.make_square(0, 0, 3).to_shapely()]
+        self.assertTrue(Box.within_aoi(Box.make_square(0, 0, 2), aoi_polygons))
+        self.assertFalse(
+            Box.within_aoi(Box.make_square(0, 2, 2), aoi_polygons))
+        self.assertFalse(Box.within_aoi(Box.make_square(0, 0, 2), []))
+
+    def test_get_aoi_mask(self):
+        aoi_polygons = [
+            Point(50, 50).buffer(30),
+            Polygon([(60, 0), (100, 0), (100, 40)]),
+        ]
+        windows = Box(0, 0, 100, 100).get_windows(10, 5)
+        for within in [True, False]:
+            mask = Box.get_aoi_mask(windows, aoi_polygons, within=within)
+            # compare with checking each window against each polygon
+            expected = [
+                any(w.to_shapely().within(p)
+                    if within else w.to_shapely().intersects(p)
+                    for p in aoi_polygons) for w in windows
+            ]
+            np.testing.assert_array_equal(mask, expected)
+            self.assertTrue(0 < mask.sum() < len(windows))
+
+            npboxes = np.array([w.tuple_format() for w in windows])
+            mask_np = Box.get_aoi_mask(npboxes, aoi_polygons, within=within)
+            np.testing.assert_array_equal(mask_np, mask)
+
+    def test_get_aoi_mask_raster(self):
+        # polygons aligned to the pixel grid give exact results
+        aoi_polygons = [
+            Box(10, 10, 50, 60).to_shapely(),
+            Box(40, 55, 90, 70).to_shapely(),
+        ]
+        windows = Box(0, 0, 100, 100).get_windows(10, 5)
+        for within in [True, False]:
+            mask = Box.get_aoi_mask(
+                windows, aoi_polygons, within=within, use_raster_mask=True)
+            expected = [
+                any(w.to_shapely().within(p)
+                    if within else w.to_shapely().intersection(p).area > 0
+                    for p in aoi_polygons) for w in windows
+            ]
+            if within:
+                # windows within the union but not within any single polygon
+                # are also counted as within by the raster mask
+                self.assertTrue(np.all(mask[expected]))
+            else:
+                np.testing.assert_array_equal(mask, expected)
+        mask = Box.get_aoi_mask([], aoi_polygons, use_raster_mask=True)
+        self.assertEqual(len(mask), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
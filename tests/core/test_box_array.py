@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.box_array import BoxArray
+
+
+class TestBoxArray(unittest.TestCase):
+    def setUp(self):
+        self.boxes = [
+            Box(0, 0, 10, 10),
+            Box(5, 8, 20, 30),
+            Box(40, 40, 50, 60),
+        ]
+        self.box_array = BoxArray.from_boxes(self.boxes)
+
+    def test_sequence(self):
+        self.assertEqual(len(self.box_array), 3)
+        self.assertEqual(self.box_array.npboxes.dtype, np.int32)
+        self.assertListEqual(list(self.box_array), self.boxes)
+        self.assertListEqual(self.box_array.to_boxes(), self.boxes)
+        self.assertEqual(self.box_array[1], self.boxes[1])
+        self.assertIsInstance(self.box_array[1].ymin, int)
+        self.assertEqual(self.box_array[-1], self.boxes[-1])
+        self.assertListEqual(list(self.box_array[1:]), self.boxes[1:])
+        self.assertEqual(self.box_array[[0, 2]],
+                         BoxArray.from_boxes(self.boxes[::2]))
+        np.testing.assert_array_equal(
+            np.asarray(self.box_array), [b.tuple_format() for b in self.boxes])
+
+    def test_properties(self):
+        np.testing.assert_array_equal(self.box_array.height,
+                                      [b.height for b in self.boxes])
+        np.testing.assert_array_equal(self.box_array.width,
+                                      [b.width for b in self.boxes])
+        np.testing.assert_array_equal(self.box_array.area,
+                                      [b.area for b in self.boxes])
+
+    def test_get_windows(self):
+        extent = Box(0, 0, 100, 77)
+        args = [
+            dict(size=10, stride=5),
+            dict(size=(10, 20), stride=(7, 3), padding=0),
+            dict(size=30, stride=30, padding=5, pad_direction='both'),
+            dict(size=30, stride=30, padding=(5, 2), pad_direction='start'),
+            dict(size=200, stride=5, padding=0),
+        ]
+        for kwargs in args:
+            windows = BoxArray.get_windows(extent, **kwargs)
+            self.assertListEqual(
+                list(windows), extent.get_windows(**kwargs), msg=kwargs)
+
+        with self.assertRaises(ValueError):
+            BoxArray.get_windows(extent, size=0, stride=5)
+        with self.assertRaises(ValueError):
+            BoxArray.get_windows(extent, size=10, stride=5, padding=-1)
+        with self.assertRaises(ValueError):
+            BoxArray.get_windows(
+                extent, size=10, stride=5, pad_direction='abc')
+
+    def test_vectorized_ops(self):
+        other = Box(3, 3, 25, 25)
+        extent = Box(2, 4, 35, 45)
+        ops = [
+            lambda b: b.intersection(other),
+            lambda b: b.shift_origin(extent),
+            lambda b: b.to_offsets(extent),
+            lambda b: b.translate(3, -2),
+            lambda b: b.center_crop(2, 1),
+            lambda b: b.buffer(0.5, extent),
+            lambda b: b.buffer(3, extent),
+        ]
+        for op in ops:
+            expected = [op(b) for b in self.boxes]
+            self.assertListEqual(list(op(self.box_array)), expected)
+        np.testing.assert_array_equal(
+            self.box_array.intersects(other),
+            [b.intersects(other) for b in self.boxes])
+
+    def test_filter_by_aoi(self):
+        aoi_polygons = [Box(0, 0, 25, 35).to_shapely()]
+        for within in [True, False]:
+            filtered = self.box_array.filter_by_aoi(
+                aoi_polygons, within=within)
+            expected = Box.filter_by_aoi(
+                self.boxes, aoi_polygons, within=within)
+            self.assertListEqual(list(filtered), expected)
+
+    def test_empty(self):
+        box_array = BoxArray(np.zeros((0, 4)))
+        self.assertEqual(len(box_array), 0)
+        self.assertListEqual(list(box_array), [])
+        self.assertEqual(len(box_array.intersection(Box(0, 0, 1, 1))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
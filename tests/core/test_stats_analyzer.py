@@ -33,7 +33,8 @@ class TestStatsAnalyzer(unittest.TestCase):
 
     def _test(self, is_random=False):
         sample_prob = 0.5
-        scenes, raster_sources, imgs = zip(*[make_scene(i) for i in range(3)])
+        scenes, raster_sources, imgs = zip(
+            *[make_scene(i, is_random=is_random) for i in range(3)])
 
         channel_vals = list(map(lambda x: np.expand_dims(x, axis=0), imgs))
         channel_vals = np.concatenate(channel_vals, axis=0)
@@ -77,5 +78,79 @@ class TestStatsAnalyzer(unittest.TestCase):
         self.assertTrue(file_exists(expected_stats_path, include_dir=False))
 
 
+class TestRasterStats(unittest.TestCase):
+    def test_nodata_weighting(self):
+        # chips with different amounts of NODATA should be weighted by the
+        # number of valid pixels in them
+        img = np.random.randint(1, 100, size=(600, 600, 3)).astype(np.uint16)
+        img[:300, :300] = 0
+        img[:100, 300:, 0] = 0
+        rs = MockRasterSource([0, 1, 2], 3)
+        rs.set_raster(img)
+
+        stats = RasterStats()
+        stats.compute([rs], sample_prob=None)
+
+        vals = np.where(img == 0, np.nan, img.astype(float))
+        np.testing.assert_array_almost_equal(stats.means,
+                                             np.nanmean(vals, axis=(0, 1)))
+        np.testing.assert_array_almost_equal(stats.stds,
+                                             np.nanstd(vals, axis=(0, 1)))
+
+    def test_histograms(self):
+        imgs = [
+            np.random.randint(0, 256, size=(300, 600, 2)).astype(np.uint8)
+            for _ in range(3)
+        ]
+        raster_sources = []
+        for img in imgs:
+            rs = MockRasterSource([0, 1], 2)
+            rs.set_raster(img)
+            raster_sources.append(rs)
+
+        stats = RasterStats()
+        stats.compute(
+            raster_sources,
+            sample_prob=None,
+            num_workers=2,
+            compute_histograms=True)
+
+        vals = np.stack([img.reshape(-1, 2) for img in imgs])
+        vals = vals.reshape(-1, 2).astype(float)
+        vals[vals == 0] = np.nan
+        np.testing.assert_array_almost_equal(stats.means,
+                                             np.nanmean(vals, axis=0))
+        self.assertEqual(len(stats.histograms), 2)
+        q = [1, 50, 99]
+        exp_percentiles = np.nanpercentile(
+            vals, q, axis=0, method='inverted_cdf').T
+        np.testing.assert_array_equal(
+            stats.get_percentiles(q), exp_percentiles)
+
+        # round trip
+        with rv_config.get_tmp_dir() as tmp_dir:
+            path = join(tmp_dir, 'stats.json')
+            stats.save(path)
+            stats2 = RasterStats.load(path)
+        np.testing.assert_array_equal(
+            stats2.get_percentiles(q), exp_percentiles)
+
+    def test_histograms_float(self):
+        img = np.random.uniform(1, 2, size=(300, 300, 1)).astype(np.float32)
+        rs = MockRasterSource([0], 1)
+        rs.set_raster(img)
+
+        stats = RasterStats()
+        self.assertRaises(ValueError,
+                          lambda: stats.compute([rs], compute_histograms=True))
+
+        stats.compute(
+            [rs], compute_histograms=True, hist_range=(1, 2), hist_bins=1000)
+        np.testing.assert_array_almost_equal(
+            stats.get_percentiles([50])[0],
+            np.percentile(img, [50]),
+            decimal=2)
+
+
 if __name__ == '__main__':
     unittest.main()
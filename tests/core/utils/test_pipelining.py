@@ -0,0 +1,68 @@
+import unittest
+import time
+
+from rastervision.core.utils.pipelining import (BackgroundConsumer, StageStats,
+                                                prefetch)
+
+
+class TestStageStats(unittest.TestCase):
+    def test_timer(self):
+        stats = StageStats('test')
+        self.assertEqual(stats.throughput, 0)
+        with stats.timer(4):
+            time.sleep(0.01)
+        self.assertEqual(stats.num_items, 4)
+        self.assertGreater(stats.seconds, 0)
+        self.assertGreater(stats.throughput, 0)
+        self.assertIn('test', repr(stats))
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_order(self):
+        stats = StageStats('read')
+        out = list(prefetch(range(10), buffer_size=2, stats=stats))
+        self.assertListEqual(out, list(range(10)))
+        self.assertEqual(stats.num_items, 10)
+
+    def test_error(self):
+        def gen():
+            yield 1
+            raise ValueError('oops')
+
+        it = prefetch(gen())
+        self.assertEqual(next(it), 1)
+        self.assertRaises(ValueError, lambda: next(it))
+
+    def test_early_stop(self):
+        it = prefetch(range(1000), buffer_size=1)
+        self.assertEqual(next(it), 0)
+        # should stop the producer thread without hanging
+        it.close()
+
+
+class TestBackgroundConsumer(unittest.TestCase):
+    def test_consume(self):
+        out = []
+        stats = StageStats('consume')
+        with BackgroundConsumer(out.append, stats=stats) as consumer:
+            for i in range(10):
+                consumer.put(i)
+        self.assertListEqual(out, list(range(10)))
+        self.assertEqual(stats.num_items, 10)
+
+    def test_error(self):
+        def fn(x):
+            raise ValueError('oops')
+
+        consumer = BackgroundConsumer(fn, buffer_size=1)
+
+        def put_all():
+            for i in range(10):
+                consumer.put(i)
+            consumer.close()
+
+        self.assertRaises(ValueError, put_all)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,8 @@ from moto import mock_s3
 from rastervision.pipeline.file_system import (
     file_to_str, str_to_file, download_if_needed, upload_or_copy, make_dir,
     get_local_path, file_exists, sync_from_dir, sync_to_dir, list_paths,
-    NotReadableError, NotWritableError, FileSystem)
+    NotReadableError, NotWritableError, FileSystem, LocalFileSystem,
+    DownloadCache)
 from rastervision.pipeline import rv_config
 
 LOREM = """ Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do
@@ -222,6 +223,75 @@ class TestDownloadIfNeeded(unittest.TestCase):
             upload_or_copy(local_path, wrong_path)
 
 
+class TestDownloadCache(unittest.TestCase):
+    """Test DownloadCache, using local files as the "remote" files."""
+
+    def setUp(self):
+        self.tmp_dir = rv_config.get_tmp_dir()
+        self.src_dir = os.path.join(self.tmp_dir.name, 'src')
+        self.cache = DownloadCache(os.path.join(self.tmp_dir.name, 'cache'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _make_file(self, name: str, content: str, mtime: float) -> str:
+        path = os.path.join(self.src_dir, name)
+        str_to_file(content, path)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_get(self):
+        uri = self._make_file('a.tif', 'abc', mtime=1000)
+        path = self.cache.get(uri, LocalFileSystem)
+        self.assertNotEqual(path, uri)
+        self.assertEqual(os.path.basename(path), 'a.tif')
+        self.assertEqual(file_to_str(path), 'abc')
+        self.assertEqual(self.cache.nbytes, 3)
+
+        # same version: reuse the cached file
+        uri = self._make_file('a.tif', 'xyz', mtime=1000)
+        self.assertEqual(self.cache.get(uri, LocalFileSystem), path)
+        self.assertEqual(file_to_str(path), 'abc')
+
+        # new version: download again
+        uri = self._make_file('a.tif', 'abcd', mtime=2000)
+        new_path = self.cache.get(uri, LocalFileSystem)
+        self.assertNotEqual(new_path, path)
+        self.assertEqual(file_to_str(new_path), 'abcd')
+
+    def test_get_failed_download(self):
+        uri = os.path.join(self.src_dir, 'missing.tif')
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get(uri, LocalFileSystem)
+        self.assertEqual(self.cache.nbytes, 0)
+
+    def test_prune(self):
+        self.cache.max_bytes = 10
+        uris = [
+            self._make_file(f'{i}.tif', 'x' * 4, mtime=1000 + i)
+            for i in range(3)
+        ]
+        paths = []
+        for i, uri in enumerate(uris):
+            paths.append(self.cache.get(uri, LocalFileSystem))
+            # make sure last-used times are distinct
+            os.utime(os.path.dirname(paths[-1]), (i, i))
+        # 12 bytes > 10, so the least recently used entry is evicted
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertTrue(os.path.exists(paths[2]))
+        self.assertEqual(self.cache.nbytes, 8)
+
+        # the entry being downloaded is kept even if it doesn't fit
+        uri = self._make_file('big.tif', 'x' * 20, mtime=1000)
+        path = self.cache.get(uri, LocalFileSystem)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(self.cache.nbytes, 20)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.nbytes, 0)
+
+
 @mock_s3
 class TestS3Misc(unittest.TestCase):
     def setUp(self):
@@ -1,5 +1,6 @@
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 import unittest
+from itertools import islice
 from os.path import join
 from uuid import uuid4
 import logging
@@ -78,10 +79,20 @@ class TestClassificationLearner(unittest.TestCase):
         self.assertNoError(
             lambda: self._test_learner(6, [(0, 1, 2), (3, 4, 5)]))
 
+    def test_learner_amp(self):
+        solver_cfg = SolverConfig(
+            batch_sz=2,
+            amp=True,
+            grad_accumulation_steps=2,
+            channels_last=True)
+        self.assertNoError(
+            lambda: self._test_learner(3, None, solver_cfg=solver_cfg))
+
     def _test_learner(self,
                       num_channels: int,
                       channel_display_groups: Any,
-                      num_classes: int = 5):
+                      num_classes: int = 5,
+                      solver_cfg: Optional[SolverConfig] = None):
         """Tests whether the learner can be instantiated correctly and
         produce plots."""
         logging.disable(logging.CRITICAL)
@@ -111,13 +122,18 @@ class TestClassificationLearner(unittest.TestCase):
             backend_cfg = PyTorchChipClassificationConfig(
                 data=data_cfg,
                 model=ClassificationModelConfig(pretrained=False),
-                solver=SolverConfig(),
+                solver=solver_cfg or SolverConfig(),
                 log_tensorboard=False)
             pipeline_cfg = ChipClassificationConfig(
                 root_uri=tmp_dir, dataset=dataset_cfg, backend=backend_cfg)
             pipeline_cfg.update()
             backend = backend_cfg.build(pipeline_cfg, tmp_dir)
             learner = backend.learner_cfg.build(tmp_dir, training=True)
+            if solver_cfg is not None:
+                # only a few batches to keep the test fast
+                learner.train_dl = list(islice(learner.train_dl, 3))
+                learner.train_epoch(learner.opt, learner.step_scheduler)
+                learner.validate_epoch(list(islice(learner.valid_dl, 1)))
             learner.plot_dataloaders()
             learner.plot_predictions(split='valid')
 
@@ -1,4 +1,4 @@
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 import unittest
 from os.path import join
 from uuid import uuid4
@@ -57,10 +57,20 @@ class TestRegressionLearner(unittest.TestCase):
         self.assertNoError(
             lambda: self._test_learner(6, [(0, 1, 2), (3, 4, 5)]))
 
+    def test_learner_amp(self):
+        solver_cfg = SolverConfig(
+            batch_sz=2,
+            amp=True,
+            grad_accumulation_steps=2,
+            channels_last=True)
+        self.assertNoError(
+            lambda: self._test_learner(3, None, solver_cfg=solver_cfg))
+
     def _test_learner(self,
                       num_channels: int,
                       channel_display_groups: Any,
-                      num_classes: int = 5):
+                      num_classes: int = 5,
+                      solver_cfg: Optional[SolverConfig] = None):
         """Tests whether the learner can be instantiated correctly and
         produce plots."""
         logging.disable(logging.CRITICAL)
@@ -93,10 +103,18 @@ class TestRegressionLearner(unittest.TestCase):
                 output_uri=tmp_dir,
                 data=data_cfg,
                 model=RegressionModelConfig(pretrained=False),
-                solver=SolverConfig(),
+                solver=solver_cfg or SolverConfig(),
                 log_tensorboard=False)
 
             learner = learner_cfg.build(tmp_dir, training=True)
+            if solver_cfg is not None:
+                # the scenes above have no labels, so use random batches
+                batches = [(torch.rand((2, num_channels, 20, 20)),
+                            torch.rand((2, num_classes))) for _ in range(3)]
+                learner.train_dl = batches
+                learner.on_train_start()
+                learner.train_epoch(learner.opt, learner.step_scheduler)
+                learner.validate_epoch(batches)
             x = torch.rand((4, num_channels, 100, 100))
             y = torch.rand((4, num_classes))
             z = torch.rand((4, num_classes))
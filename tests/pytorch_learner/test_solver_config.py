@@ -1,6 +1,7 @@
 from typing import Callable
 import unittest
 
+import torch
 from torch import nn
 
 from rastervision.pytorch_learner import (SolverConfig, solver_config_upgrader,
@@ -85,5 +86,24 @@ class TestSolverConfig(unittest.TestCase):
         loss = cfg.build_loss(num_classes=10)
         self.assertEqual(loss.ignore_index, 5)
 
+    def test_get_amp_dtype(self):
+        cfg = SolverConfig(amp=True)
+        self.assertEqual(cfg.get_amp_dtype('cuda'), torch.float16)
+        self.assertEqual(cfg.get_amp_dtype('cpu'), torch.bfloat16)
+        cfg = SolverConfig(amp=True, amp_dtype='bfloat16')
+        self.assertEqual(cfg.get_amp_dtype('cuda'), torch.bfloat16)
+
+    def test_build_step_scheduler_grad_accumulation(self):
+        model = nn.Linear(1, 1)
+        cfg = SolverConfig(num_epochs=2, batch_sz=4)
+        opt = cfg.build_optimizer(model)
+        scheduler = cfg.build_step_scheduler(opt, train_ds_sz=32)
+        self.assertEqual(scheduler.total_size, 16)
+
+        cfg = SolverConfig(num_epochs=2, batch_sz=4, grad_accumulation_steps=4)
+        opt = cfg.build_optimizer(model)
+        scheduler = cfg.build_step_scheduler(opt, train_ds_sz=32)
+        self.assertEqual(scheduler.total_size, 4)
+
     def test_build(self):
         pass